@@ -1,5 +1,6 @@
 from database import init_db, SessionLocal
 from db_models import ProviderDB, AppointmentDB
+from provider_registry import invalidate_providers
 
 
 def seed_providers():
@@ -30,6 +31,9 @@ def seed_providers():
             db.add(provider)
 
         db.commit()
+        # Make running workers reload the provider directory; this reaches
+        # other processes only through SHARED_CACHE_PATH (see provider_registry)
+        invalidate_providers()
         print("Providers seeded successfully!")
     except Exception as e:
         db.rollback()
@@ -0,0 +1,158 @@
+"""
+Async variants of the repository functions, built on AsyncSession.
+
+Statements and row mapping are shared with repository.py so both paths
+return identical results.
+"""
+from typing import Optional, Dict, Any
+from datetime import date, datetime
+from sqlalchemy.ext.asyncio import AsyncSession
+from config import settings
+from db_models import AppointmentDB
+from slots import booked_bitmaps
+from repository import (
+    providers_query,
+    provider_query,
+    insert_appointment_query,
+    mark_slot_booked_query,
+    booked_start_times_query,
+    booked_start_times_by_provider_query,
+    group_booked_bitmaps,
+    open_slots_query,
+    idempotency_record_query,
+    save_idempotency_record_query,
+    purge_idempotency_records_query,
+    idempotency_record_to_dict,
+    providers_filter_query,
+    provider_appointments_query,
+    provider_to_dict,
+    appointment_values,
+    appointment_to_dict,
+    provider_appointment_to_dict,
+    decode_cursor,
+    page_of_appointments
+)
+
+
+async def get_providers(db: AsyncSession) -> list[Dict[str, Any]]:
+    """
+    Get all providers from the database.
+    """
+    providers = (await db.scalars(providers_query())).all()
+    return [provider_to_dict(p) for p in providers]
+
+
+async def find_providers(db: AsyncSession, provider_ids: Optional[list[str]] = None, specialty: Optional[str] = None) -> list[Dict[str, Any]]:
+    """
+    Get the providers matching a list of IDs and/or a specialty.
+    """
+    providers = (await db.scalars(providers_filter_query(provider_ids, specialty))).all()
+    return [provider_to_dict(p) for p in providers]
+
+
+async def get_provider_by_id(db: AsyncSession, provider_id: str) -> Optional[Dict[str, Any]]:
+    """
+    Get a single provider by ID.
+    """
+    provider = (await db.scalars(provider_query(provider_id))).first()
+    return provider_to_dict(provider) if provider else None
+
+
+async def create_appointment(db: AsyncSession, appointment_data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """
+    Insert a new appointment in the session's transaction.
+    Stores datetimes in UTC, returns in local timezone for API response,
+    or None if the provider already has an appointment at that time.
+    The caller commits the unit of work.
+    """
+    values = appointment_values(appointment_data)
+    result = await db.execute(insert_appointment_query(values))
+    if result.rowcount == 0:
+        return None
+    if settings.SLOT_TABLE_ENABLED:
+        await db.execute(mark_slot_booked_query(values["provider_id"], values["start_time"]))
+    return appointment_to_dict(AppointmentDB(**values))
+
+
+async def get_idempotency_record(db: AsyncSession, key: str, now: datetime) -> Optional[Dict[str, Any]]:
+    """
+    Get the unexpired stored response for an idempotency key.
+    """
+    row = (await db.execute(idempotency_record_query(key, now))).first()
+    return idempotency_record_to_dict(row) if row else None
+
+
+async def save_idempotency_record(db: AsyncSession, values: Dict[str, Any], now: datetime, purge: bool = False) -> bool:
+    """
+    Store a response for an idempotency key in the session's transaction.
+    Returns False if another unexpired record holds the key. With purge,
+    expired records are deleted first.
+    """
+    if purge:
+        await db.execute(purge_idempotency_records_query(now))
+    return (await db.execute(save_idempotency_record_query(values, now))).rowcount == 1
+
+
+async def commit(db: AsyncSession) -> None:
+    """
+    Commit the session's unit of work.
+    """
+    await db.commit()
+
+
+async def rollback(db: AsyncSession) -> None:
+    """
+    Discard the session's unit of work.
+    """
+    await db.rollback()
+
+
+async def get_booked_bitmaps(db: AsyncSession, provider_id: str, start_date: str, end_date: str, from_slots: bool = False) -> Dict[date, int]:
+    """
+    Get a provider's booked-slot bitmaps per local day within a date range.
+    Only start_time is selected, from appointments or, with from_slots, from
+    the materialized slots table.
+    """
+    result = await db.scalars(booked_start_times_query(provider_id, start_date, end_date, from_slots))
+    return booked_bitmaps(result)
+
+
+async def iter_provider_appointments(db: AsyncSession, provider_id: str, start_date: str, end_date: str, batch_size: int = 500):
+    """
+    Yield a provider's appointments within a date range in batches (lists),
+    fetching batch_size rows at a time so memory stays flat for long ranges.
+    """
+    query = provider_appointments_query(provider_id, start_date, end_date) \
+        .execution_options(yield_per=batch_size)
+    async for rows in (await db.stream(query)).partitions():
+        yield [provider_appointment_to_dict(apt) for apt in rows]
+
+
+async def get_booked_bitmaps_by_provider(db: AsyncSession, provider_ids: list[str], start_date: str, end_date: str, from_slots: bool = False) -> Dict[str, Dict[date, int]]:
+    """
+    Get booked-slot bitmaps per provider and local day within a date range,
+    in one query.
+    """
+    return group_booked_bitmaps(await db.execute(
+        booked_start_times_by_provider_query(provider_ids, start_date, end_date, from_slots)))
+
+
+async def get_open_slot_starts(db: AsyncSession, provider_ids: list[str], after_utc: datetime, before_utc: datetime, limit: int) -> list[tuple[str, datetime]]:
+    """
+    Get the earliest open (provider_id, start_time) pairs from the slots
+    table, in start time order.
+    """
+    return [tuple(row) for row in await db.execute(
+        open_slots_query(provider_ids, after_utc, before_utc, limit))]
+
+
+async def get_provider_appointments(db: AsyncSession, provider_id: str, start_date: str, end_date: str,
+                                    limit: int, cursor: Optional[str] = None) -> tuple[list[Dict[str, Any]], Optional[str]]:
+    """
+    Get one page of a provider's appointments within a date range.
+    Returns the page and the cursor of the next page (None on the last page).
+    """
+    after = decode_cursor(cursor) if cursor else None
+    rows = await db.execute(provider_appointments_query(
+        provider_id, start_date, end_date, after=after, limit=limit + 1))
+    return page_of_appointments(rows, limit)
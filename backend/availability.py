@@ -0,0 +1,251 @@
+"""
+Provider availability backed by the per-day cache.
+
+Each (provider_id, local date) entry holds the day's slot grid and a bitmap
+of booked slots (bit i set when grid slot i is taken), derived from booked
+start times. Days missing from the cache are loaded with a single
+start_time-only query covering the missing span, grouped by provider when
+several providers are requested at once. The query reads the materialized
+slots table instead of appointments while its horizon covers the span.
+
+With several workers, days are first looked up in the shared store and
+booking changes are broadcast through shared_cache.
+
+Identical concurrent availability requests share one computation and one
+serialized body (availability_flights).
+"""
+from datetime import date, datetime, timedelta, timezone
+from typing import Any, Dict, Optional
+
+import shared_cache
+from config import settings
+from metrics import span
+from responses import dumps
+from singleflight import SingleFlight
+from cache import availability_cache
+from conditional import make_etag
+from data_access import get_booked_bitmaps, get_booked_bitmaps_by_provider
+from slot_table import covers
+from slots import SlotGrid, day_grid, is_booked
+from utils import get_local_now
+
+# Last booking change per provider, for Last-Modified
+_changed_at: dict[str, datetime] = {}
+
+
+def _days(start_day: date, end_day: date) -> list[date]:
+    days = []
+    day = start_day
+    while day <= end_day:
+        days.append(day)
+        day += timedelta(days=1)
+    return days
+
+
+async def _from_store(provider_id: str, days: list[date]) -> dict[date, tuple[SlotGrid, int]]:
+    """Entries found in the shared store, copied into the local cache"""
+    generations = {day: availability_cache.generation((provider_id, day)) for day in days}
+    found = {}
+    for day, bitmap in (await shared_cache.get_bitmaps(provider_id, days)).items():
+        entry = (day_grid(day), bitmap)
+        availability_cache.set_if_current((provider_id, day), entry, generations[day])
+        found[day] = entry
+    return found
+
+
+async def get_providers_day_availability(db, provider_ids: list[str], start_day: date, end_day: date) -> dict[str, list[tuple[SlotGrid, int]]]:
+    """
+    Return (grid, booked bitmap) per provider for every day from start_day
+    to end_day inclusive.
+
+    Cache misses for all providers are loaded through the request's session
+    db with one grouped query over the missing span.
+    """
+    await shared_cache.poll()
+    days = _days(start_day, end_day)
+    entries = {
+        (provider_id, day): availability_cache.get((provider_id, day))
+        for provider_id in provider_ids
+        for day in days
+    }
+    missing = [key for key, entry in entries.items() if entry is None]
+
+    if missing and shared_cache.shared_cache is not None:
+        missing_days: dict[str, list[date]] = {}
+        for provider_id, day in missing:
+            missing_days.setdefault(provider_id, []).append(day)
+        for provider_id, provider_days in missing_days.items():
+            for day, entry in (await _from_store(provider_id, provider_days)).items():
+                entries[(provider_id, day)] = entry
+        missing = [key for key in missing if entries[key] is None]
+    if missing:
+        generations = {key: availability_cache.generation(key) for key in missing}
+        after_seq = await shared_cache.head()
+        missing_providers = sorted({provider_id for provider_id, _ in missing})
+        first_day = min(day for _, day in missing)
+        last_day = max(day for _, day in missing)
+        bitmaps_by_provider = await get_booked_bitmaps_by_provider(
+            db, missing_providers, first_day.isoformat(), last_day.isoformat(),
+            covers(first_day, last_day))
+        loaded = {}
+        for provider_id, day in missing:
+            bitmaps = bitmaps_by_provider.get(provider_id, {})
+            entry = (day_grid(day), bitmaps.get(day, 0))
+            entries[(provider_id, day)] = entry
+            # A booking invalidated the day during the query: keep it uncached
+            if availability_cache.set_if_current(
+                    (provider_id, day), entry, generations[(provider_id, day)]):
+                loaded[(provider_id, day)] = entry[1]
+        await shared_cache.put_bitmaps(loaded, after_seq)
+
+    return {
+        provider_id: [entries[(provider_id, day)] for day in days]
+        for provider_id in provider_ids
+    }
+
+
+async def get_day_availability(db, provider_id: str, start_day: date, end_day: date) -> list[tuple[SlotGrid, int]]:
+    """
+    Return (grid, booked bitmap) for every day from start_day to end_day inclusive.
+    Cache misses are loaded through the request's session db.
+    """
+    await shared_cache.poll()
+    days = _days(start_day, end_day)
+    entries = {day: availability_cache.get((provider_id, day)) for day in days}
+    missing = [day for day, entry in entries.items() if entry is None]
+
+    if missing:
+        entries.update(await _from_store(provider_id, missing))
+        missing = [day for day in missing if entries[day] is None]
+    if missing:
+        generations = {day: availability_cache.generation((provider_id, day)) for day in missing}
+        after_seq = await shared_cache.head()
+        bitmaps = await get_booked_bitmaps(
+            db, provider_id, missing[0].isoformat(), missing[-1].isoformat(),
+            covers(missing[0], missing[-1]))
+        loaded = {}
+        for day in missing:
+            entry = (day_grid(day), bitmaps.get(day, 0))
+            entries[day] = entry
+            # A booking invalidated the day during the query: keep it uncached
+            if availability_cache.set_if_current((provider_id, day), entry, generations[day]):
+                loaded[(provider_id, day)] = entry[1]
+        await shared_cache.put_bitmaps(loaded, after_seq)
+
+    return [entries[day] for day in days]
+
+
+def build_time_slots(provider_id: str, day_entries: list[tuple[SlotGrid, int]], after_ms: int) -> list[Dict[str, Any]]:
+    """
+    Build the slot list for a provider as plain TimeSlot-shaped dicts,
+    keeping slots after after_ms. The grid already holds valid values, so
+    the dicts are serialized without model validation.
+    """
+    slots = []
+    for grid, booked in day_entries:
+        for index, (slot_ms, slot_id, start_time, end_time) in enumerate(zip(
+                grid.start_ms, grid.slot_ids(provider_id),
+                grid.start_times, grid.end_times)):
+            if slot_ms > after_ms:
+                slots.append({
+                    "id": slot_id,
+                    "start_time": start_time,
+                    "end_time": end_time,
+                    "available": not is_booked(booked, index)
+                })
+    return slots
+
+
+def availability_payload(provider: Dict[str, Any], day_entries: list[tuple[SlotGrid, int]], after_ms: int) -> Dict[str, Any]:
+    """AvailabilityResponse-shaped dict for a provider"""
+    with span("slots"):
+        slots = build_time_slots(provider["id"], day_entries, after_ms)
+    return {
+        "provider": {
+            "id": provider["id"],
+            "name": provider["name"],
+            "specialty": provider["specialty"]
+        },
+        "slots": slots
+    }
+
+
+def _drop_day(provider_id: str, day: date) -> None:
+    availability_cache.invalidate((provider_id, day))
+    _changed_at[provider_id] = datetime.now(timezone.utc).replace(microsecond=0)
+
+
+class AvailabilitySnapshot:
+    """
+    A provider's day entries as of now_ms, shared by coalesced requests.
+    The JSON body is rendered once, by the first request that needs it.
+    """
+
+    __slots__ = ("day_entries", "now_ms", "_body")
+
+    def __init__(self, day_entries: list[tuple[SlotGrid, int]], now_ms: int):
+        self.day_entries = day_entries
+        self.now_ms = now_ms
+        self._body: Optional[bytes] = None
+
+    def body(self, provider: Dict[str, Any]) -> bytes:
+        if self._body is None:
+            payload = availability_payload(provider, self.day_entries, self.now_ms)
+            with span("serialize"):
+                self._body = dumps(payload)
+        return self._body
+
+
+# Coalesces concurrent requests for the same provider and date range
+availability_flights = SingleFlight()
+
+
+async def get_availability_snapshot(db, provider_id: str, start_day: date, end_day: date) -> AvailabilitySnapshot:
+    """
+    Load a provider's availability, joining an identical request already in
+    flight instead of repeating the cache lookups and queries.
+    """
+    async def load() -> AvailabilitySnapshot:
+        day_entries = await get_day_availability(db, provider_id, start_day, end_day)
+        return AvailabilitySnapshot(
+            day_entries, int(get_local_now().timestamp() * 1000))
+
+    if not settings.AVAILABILITY_COALESCING:
+        return await load()
+    return await availability_flights.do((provider_id, start_day, end_day), load)
+
+
+def invalidate_day(provider_id: str, day: date) -> None:
+    """Drop a provider's cached day after its bookings change, in every worker"""
+    _drop_day(provider_id, day)
+    shared_cache.publish(shared_cache.DAY_CHANGED, provider_id, day)
+
+
+async def invalidate_day_async(provider_id: str, day: date) -> None:
+    """invalidate_day() for the event loop"""
+    _drop_day(provider_id, day)
+    await shared_cache.publish_async(shared_cache.DAY_CHANGED, provider_id, day)
+
+
+def _on_shared_event(kind: str, provider_id: Optional[str], day: Optional[date]) -> None:
+    if kind == shared_cache.DAY_CHANGED:
+        _drop_day(provider_id, day)
+
+
+shared_cache.subscribe(_on_shared_event)
+
+
+def last_changed(provider_id: str) -> Optional[datetime]:
+    """When this process last saw a provider's bookings change"""
+    return _changed_at.get(provider_id)
+
+
+def availability_etag(provider_id: str, day_entries: list[tuple[SlotGrid, int]], after_ms: int, *extra) -> str:
+    """
+    ETag for an availability response: it changes when a booking changes a
+    day's bitmap or when the earliest slot moves into the past.
+    """
+    first_future_ms = next(
+        (ms for grid, _ in day_entries for ms in grid.start_ms if ms > after_ms), None)
+    return make_etag(provider_id, first_future_ms,
+                     tuple(booked for _, booked in day_entries), *extra)
@@ -0,0 +1,5 @@
+"""
+Benchmarks for the appointment API.
+
+Run from the backend directory, e.g. `python -m benchmarks.bench_slots`.
+"""
@@ -0,0 +1,121 @@
+"""
+Booked-slot representation benchmark.
+
+Compares the previous set-of-slot-ID-strings path (full AppointmentDB rows,
+string membership per slot) with start_time-only queries folded into
+per-day bitmaps (bit tests per slot). Reports latency and peak Python
+memory for marking availability over a range with most slots booked.
+
+Usage: python -m benchmarks.bench_bitmaps [--weeks N] [--booked-ratio R] [--repeat N]
+"""
+import argparse
+import random
+import timeit
+import tracemalloc
+from datetime import datetime, timedelta
+
+from benchmarks.common import use_temp_database
+
+PROVIDER_ID = "provider-1"
+
+
+def seed(weeks: int, booked_ratio: float) -> tuple[str, str]:
+    from sqlalchemy import insert
+
+    from __init__db import seed_providers
+    from database import SessionLocal, init_db
+    from db_models import AppointmentDB
+    from slots import build_slot_grid
+    from utils import get_local_now
+
+    init_db()
+    seed_providers()
+
+    start_day = get_local_now().date() + timedelta(days=1)
+    end_day = start_day + timedelta(weeks=weeks)
+    grid = build_slot_grid(start_day, end_day)
+    rows = []
+    for n, (slot_ms, slot_id) in enumerate(zip(grid.start_ms, grid.slot_ids(PROVIDER_ID))):
+        if random.random() >= booked_ratio:
+            continue
+        start = datetime(1970, 1, 1) + timedelta(milliseconds=slot_ms)
+        rows.append({
+            "id": f"appointment-{n}",
+            "reference_number": f"REF-{n}",
+            "slot_id": slot_id,
+            "provider_id": PROVIDER_ID,
+            "patient_first_name": "Bench",
+            "patient_last_name": "Mark",
+            "patient_email": "bench@example.com",
+            "patient_phone": "555-555-5555",
+            "reason": "Benchmark visit " * 8,
+            "start_time": start,
+            "end_time": start + timedelta(minutes=30),
+            "status": "confirmed",
+            "created_at": datetime(2024, 1, 1)
+        })
+
+    with SessionLocal() as db:
+        db.execute(insert(AppointmentDB), rows)
+        db.commit()
+    return start_day.isoformat(), end_day.isoformat()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--weeks", type=int, default=52)
+    parser.add_argument("--booked-ratio", type=float, default=0.8)
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+
+    use_temp_database()
+    start_date, end_date = seed(args.weeks, args.booked_ratio)
+
+    from database import SessionLocal
+    from db_models import AppointmentDB
+    from repository import get_booked_bitmaps, local_range_to_utc
+    from slots import build_slot_grid, day_grid, is_booked
+
+    start_day = datetime.strptime(start_date, "%Y-%m-%d").date()
+    end_day = datetime.strptime(end_date, "%Y-%m-%d").date()
+    days = [start_day + timedelta(days=n)
+            for n in range((end_day - start_day).days + 1)]
+
+    def string_set_path():
+        with SessionLocal() as db:
+            start_utc, end_utc = local_range_to_utc(start_date, end_date)
+            appointments = db.query(AppointmentDB).filter(
+                AppointmentDB.provider_id == PROVIDER_ID,
+                AppointmentDB.start_time >= start_utc,
+                AppointmentDB.start_time <= end_utc,
+                AppointmentDB.status == "confirmed"
+            ).all()
+            booked = {apt.slot_id for apt in appointments}
+        grid = build_slot_grid(start_day, end_day)
+        return [slot_id not in booked for slot_id in grid.slot_ids(PROVIDER_ID)]
+
+    def bitmap_path():
+        with SessionLocal() as db:
+            bitmaps = get_booked_bitmaps(db, PROVIDER_ID, start_date, end_date)
+        available = []
+        for day in days:
+            bitmap = bitmaps.get(day, 0)
+            available.extend(
+                not is_booked(bitmap, index) for index in range(len(day_grid(day))))
+        return available
+
+    assert string_set_path() == bitmap_path()
+
+    print(f"{args.weeks} weeks, {sum(not a for a in bitmap_path())} booked slots")
+    print(f"{'path':<12} {'ms':>9} {'peak KiB':>10}")
+    for name, path in (("string set", string_set_path), ("bitmap", bitmap_path)):
+        seconds = min(timeit.repeat(path, number=1, repeat=args.repeat))
+        tracemalloc.start()
+        path()
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        print(f"{name:<12} {seconds * 1000:>9.2f} {peak / 1024:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+"""
+Change feed vs polling benchmark.
+
+Starts serve.py with one worker on a fresh SQLite database and keeps N
+dashboards watching provider-1 for a fixed time, first by polling its week
+of availability and its schedule every --interval seconds, then through
+/api/events streams. Reports the server's CPU time and resident memory for
+each, and for the streams the time from a booking to its slot-taken event
+reaching every subscriber. Reads the server's usage from /proc (Linux).
+
+Usage: python -m benchmarks.bench_change_feed [--dashboards N] [--seconds S]
+                                              [--interval S]
+"""
+import argparse
+import asyncio
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import timedelta
+
+from benchmarks.bench_workers import free_port, wait_ready
+from benchmarks.common import booking_payload, future_slot_ids
+
+PROVIDER = "provider-1"
+
+
+def server_usage(pid: int) -> tuple[float, int]:
+    """(CPU seconds, resident MB) of a process"""
+    with open(f"/proc/{pid}/stat") as f:
+        fields = f.read().rsplit(")", 1)[1].split()
+    cpu = (int(fields[11]) + int(fields[12])) / os.sysconf("SC_CLK_TCK")
+    with open(f"/proc/{pid}/status") as f:
+        rss_kb = next(int(line.split()[1]) for line in f if line.startswith("VmRSS"))
+    return cpu, rss_kb // 1024
+
+
+async def poll(base_url: str, dashboards: int, seconds: float, interval: float) -> int:
+    """Every dashboard refetches availability and schedule each interval"""
+    import httpx
+    from utils import get_local_now
+
+    today = get_local_now().date()
+    week = {"start_date": today.isoformat(),
+            "end_date": (today + timedelta(days=7)).isoformat()}
+    limits = httpx.Limits(max_connections=dashboards)
+    requests = 0
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=60) as client:
+        async def dashboard(offset: float):
+            nonlocal requests
+            await asyncio.sleep(offset)
+            deadline = time.monotonic() + seconds - offset
+            while time.monotonic() < deadline:
+                await client.get("/api/availability",
+                                 params={"provider_id": PROVIDER, **week})
+                await client.get(f"/api/providers/{PROVIDER}/appointments", params=week)
+                requests += 2
+                await asyncio.sleep(interval)
+
+        await asyncio.gather(*(dashboard(interval * i / dashboards)
+                               for i in range(dashboards)))
+    return requests
+
+
+async def stream(base_url: str, pid: int, dashboards: int, seconds: float) -> dict:
+    """Hold a stream per dashboard, then time one booking's fan-out"""
+    import httpx
+
+    limits = httpx.Limits(max_connections=dashboards + 1)
+    received: list[float] = []
+    connected = 0
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=None) as client:
+        async def dashboard():
+            nonlocal connected
+            async with client.stream("GET", "/api/events",
+                                     params={"provider_id": PROVIDER, "kind": "schedule"}) as response:
+                connected += 1
+                async for line in response.aiter_lines():
+                    if line == "event: slot-taken":
+                        received.append(time.perf_counter())
+                        return
+
+        tasks = [asyncio.create_task(dashboard()) for _ in range(dashboards)]
+        while connected < dashboards:
+            await asyncio.sleep(0.05)
+        cpu_before, _ = server_usage(pid)
+        await asyncio.sleep(seconds)
+        cpu_after, rss = server_usage(pid)
+
+        booked = time.perf_counter()
+        response = await client.post("/api/appointments", json=booking_payload(
+            future_slot_ids(PROVIDER)[0], PROVIDER))
+        response.raise_for_status()
+        await asyncio.wait_for(asyncio.gather(*tasks), timeout=60)
+    return {
+        "cpu_s": cpu_after - cpu_before,
+        "rss_mb": rss,
+        "fan_out_ms": (max(received) - booked) * 1000
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--dashboards", type=int, default=500)
+    parser.add_argument("--seconds", type=float, default=20.0)
+    parser.add_argument("--interval", type=float, default=5.0)
+    args = parser.parse_args()
+
+    port = free_port()
+    base_url = f"http://127.0.0.1:{port}"
+    directory = tempfile.mkdtemp(prefix="bench-feed-")
+    env = dict(os.environ, DATABASE_URL=f"sqlite:///{directory}/appointments.db")
+    server = subprocess.Popen(
+        [sys.executable, "serve.py", "--host", "127.0.0.1", "--port", str(port),
+         "--workers", "1"],
+        env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        wait_ready(base_url)
+        cpu_before, _ = server_usage(server.pid)
+        requests = asyncio.run(poll(base_url, args.dashboards, args.seconds, args.interval))
+        cpu_after, rss = server_usage(server.pid)
+        streamed = asyncio.run(stream(base_url, server.pid, args.dashboards, args.seconds))
+    finally:
+        server.terminate()
+        server.wait(timeout=30)
+
+    print(f"{args.dashboards} dashboards watching {PROVIDER} for {args.seconds:g}s")
+    print(f"polling every {args.interval:g}s: {requests} requests, "
+          f"{cpu_after - cpu_before:.2f} CPU s, {rss} MB resident")
+    print(f"change feed:         {streamed['cpu_s']:.2f} CPU s, "
+          f"{streamed['rss_mb']} MB resident, booking reached all streams "
+          f"in {streamed['fan_out_ms']:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
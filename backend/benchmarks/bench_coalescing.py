@@ -0,0 +1,93 @@
+"""
+Thundering-herd benchmark for availability request coalescing.
+
+Fires bursts of identical /api/availability requests (a popular provider's
+week) at the ASGI app with the availability cache disabled, so every
+uncoalesced request runs its own query and slot generation, and reports
+latency, database queries and the deduplication counters with
+AVAILABILITY_COALESCING on and off. Each setting runs in its own process.
+
+Usage: python -m benchmarks.bench_coalescing [--burst N] [--bursts N]
+"""
+import argparse
+import asyncio
+import json
+import re
+import subprocess
+import sys
+from datetime import timedelta
+
+from benchmarks.common import Timer, percentile, use_temp_database
+
+_QUERIES = re.compile(r'desc="(\d+) queries"')
+
+
+async def run_bursts(burst: int, bursts: int) -> dict:
+    import httpx
+    import main
+    from utils import get_local_now
+
+    await main.startup_event()
+    start = get_local_now().date() + timedelta(days=1)
+    params = {"provider_id": "provider-1", "start_date": start.isoformat(),
+              "end_date": (start + timedelta(days=6)).isoformat()}
+
+    samples = []
+    queries = 0
+    transport = httpx.ASGITransport(app=main.app, raise_app_exceptions=False)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        async def one():
+            nonlocal queries
+            with Timer() as timer:
+                response = await client.get("/api/availability", params=params)
+            samples.append(timer.elapsed)
+            match = _QUERIES.search(response.headers.get("server-timing", ""))
+            queries += int(match.group(1)) if match else 0
+
+        with Timer() as total:
+            for _ in range(bursts):
+                await asyncio.gather(*(one() for _ in range(burst)))
+        stats = (await client.get("/api/cache/stats")).json()
+    return {
+        "p50_ms": round(percentile(samples, 50) * 1000, 2),
+        "p99_ms": round(percentile(samples, 99) * 1000, 2),
+        "burst_ms": round(total.elapsed / bursts * 1000, 2),
+        "queries": queries,
+        "coalescing": stats["availability_coalescing"]
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--burst", type=int, default=200)
+    parser.add_argument("--bursts", type=int, default=10)
+    parser.add_argument("--coalescing", choices=("on", "off"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.coalescing:
+        use_temp_database(
+            AVAILABILITY_COALESCING="true" if args.coalescing == "on" else "false",
+            AVAILABILITY_CACHE_TTL="0",
+            METRICS_ENABLED="true",
+            SERVER_TIMING_ENABLED="true"
+        )
+        print(json.dumps(asyncio.run(run_bursts(args.burst, args.bursts))))
+        return
+
+    print(f"{args.bursts} bursts of {args.burst} identical requests")
+    print(f"{'coalescing':<11} {'p50 ms':>8} {'p99 ms':>8} {'burst ms':>9} "
+          f"{'queries':>8} {'deduplicated':>13}")
+    for setting in ("off", "on"):
+        output = subprocess.run(
+            [sys.executable, "-m", "benchmarks.bench_coalescing",
+             "--coalescing", setting, "--burst", str(args.burst),
+             "--bursts", str(args.bursts)],
+            check=True, capture_output=True, text=True).stdout
+        result = json.loads(output.strip().splitlines()[-1])
+        print(f"{setting:<11} {result['p50_ms']:>8} {result['p99_ms']:>8} "
+              f"{result['burst_ms']:>9} {result['queries']:>8} "
+              f"{result['coalescing']['deduplicated']:>13}")
+
+
+if __name__ == "__main__":
+    main()
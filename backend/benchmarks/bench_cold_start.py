@@ -0,0 +1,111 @@
+"""
+Cold start regression benchmark.
+
+For each startup mode, repeatedly:
+- imports main in a fresh interpreter and reports the import time;
+- launches uvicorn on an already-migrated SQLite database and measures
+  the wall time from spawning the process to the first 200 response from
+  /api/providers (time to first request).
+
+Modes: "init" runs create_all, the provider count and the directory load
+in the startup event (DB_INIT_ON_STARTUP=true); "lean" skips them and
+loads the provider directory on the first request.
+
+With --max-first-request-ms the script exits 1 when the lean median
+exceeds the budget, so it can guard against regressions in CI.
+
+Usage: python -m benchmarks.bench_cold_start [--runs N]
+                                             [--max-first-request-ms MS]
+"""
+import argparse
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+MODES = {"init": "true", "lean": "false"}
+
+IMPORT_SNIPPET = (
+    "import time; t = time.perf_counter(); import main; "
+    "print(time.perf_counter() - t)"
+)
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def migrated_database() -> dict:
+    """Environment for a fresh SQLite database created by __init__db.py"""
+    directory = tempfile.mkdtemp(prefix="bench-cold-")
+    env = dict(os.environ,
+               DATABASE_URL=f"sqlite:///{directory}/appointments.db")
+    subprocess.run([sys.executable, "__init__db.py"], env=env, check=True,
+                   stdout=subprocess.DEVNULL)
+    return env
+
+
+def import_seconds(env: dict) -> float:
+    output = subprocess.run([sys.executable, "-c", IMPORT_SNIPPET], env=env,
+                            check=True, capture_output=True, text=True).stdout
+    return float(output.strip().splitlines()[-1])
+
+
+def first_request_seconds(env: dict) -> float:
+    import httpx
+
+    port = free_port()
+    url = f"http://127.0.0.1:{port}/api/providers"
+    started = time.perf_counter()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--host", "127.0.0.1",
+         "--port", str(port), "--log-level", "warning"],
+        env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        while True:
+            try:
+                if httpx.get(url, timeout=5.0).status_code == 200:
+                    return time.perf_counter() - started
+            except httpx.TransportError:
+                pass
+            if server.poll() is not None:
+                raise RuntimeError("server exited during startup")
+            if time.perf_counter() - started > 60:
+                raise RuntimeError("server did not start")
+            time.sleep(0.005)
+    finally:
+        server.terminate()
+        server.wait(timeout=30)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--max-first-request-ms", type=float, default=None)
+    args = parser.parse_args()
+
+    base_env = migrated_database()
+    print(f"{'mode':>6} {'import ms':>10} {'first request ms':>17}")
+    medians = {}
+    for mode, init in MODES.items():
+        env = dict(base_env, DB_INIT_ON_STARTUP=init)
+        imports = [import_seconds(env) for _ in range(args.runs)]
+        firsts = [first_request_seconds(env) for _ in range(args.runs)]
+        medians[mode] = statistics.median(firsts) * 1000
+        print(f"{mode:>6} {statistics.median(imports) * 1000:>10.1f} "
+              f"{medians[mode]:>17.1f}")
+
+    if args.max_first_request_ms is not None and \
+            medians["lean"] > args.max_first_request_ms:
+        print(f"FAIL: lean first request {medians['lean']:.1f} ms > "
+              f"{args.max_first_request_ms:.1f} ms")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""
+Group commit benchmark for bookings.
+
+Books --bookings distinct slots across every provider from --concurrency
+clients at once through the ASGI app, and reports bookings per second and
+latency with BOOKING_GROUP_COMMIT off and on, under SQLite synchronous
+NORMAL and FULL (an fsync per commit). Each combination runs in its own
+process on a fresh database.
+
+Usage: python -m benchmarks.bench_group_commit [--bookings N] [--concurrency N]
+"""
+import argparse
+import asyncio
+import json
+import subprocess
+import sys
+from collections import Counter
+
+from benchmarks.common import (
+    Timer, booking_payload, future_slot_ids, percentile, use_temp_database
+)
+
+
+async def run_bookings(bookings: int, concurrency: int) -> dict:
+    import httpx
+    import main
+    from provider_registry import provider_registry
+
+    await main.startup_event()
+    slots = [(slot_id, provider_id)
+             for provider_id in sorted(p["id"] for p in provider_registry.all())
+             for slot_id in future_slot_ids(provider_id, weeks=8)]
+    pending = iter(slots[:bookings])
+    statuses: Counter = Counter()
+    samples = []
+
+    transport = httpx.ASGITransport(app=main.app, raise_app_exceptions=False)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        async def booker():
+            for slot_id, provider_id in pending:
+                with Timer() as timer:
+                    response = await client.post(
+                        "/api/appointments", json=booking_payload(slot_id, provider_id))
+                samples.append(timer.elapsed)
+                statuses[str(response.status_code)] += 1
+
+        with Timer() as total:
+            await asyncio.gather(*(booker() for _ in range(concurrency)))
+        stats = (await client.get("/api/cache/stats")).json()
+    return {
+        "per_second": round(len(samples) / total.elapsed, 1),
+        "p50_ms": round(percentile(samples, 50) * 1000, 2),
+        "p99_ms": round(percentile(samples, 99) * 1000, 2),
+        "statuses": dict(sorted(statuses.items())),
+        "avg_batch": stats["group_commit"]["avg_batch"]
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--bookings", type=int, default=1000)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--group-commit", choices=("on", "off"), help=argparse.SUPPRESS)
+    parser.add_argument("--synchronous", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.group_commit:
+        use_temp_database(
+            BOOKING_GROUP_COMMIT="true" if args.group_commit == "on" else "false",
+            SQLITE_SYNCHRONOUS=args.synchronous
+        )
+        print(json.dumps(asyncio.run(run_bookings(args.bookings, args.concurrency))))
+        return
+
+    print(f"{args.bookings} bookings from {args.concurrency} concurrent clients")
+    print(f"{'synchronous':<12} {'group commit':<13} {'bookings/s':>11} {'p50 ms':>8} "
+          f"{'p99 ms':>8} {'avg batch':>10}  statuses")
+    for synchronous in ("NORMAL", "FULL"):
+        for setting in ("off", "on"):
+            output = subprocess.run(
+                [sys.executable, "-m", "benchmarks.bench_group_commit",
+                 "--group-commit", setting, "--synchronous", synchronous,
+                 "--bookings", str(args.bookings),
+                 "--concurrency", str(args.concurrency)],
+                check=True, capture_output=True, text=True).stdout
+            result = json.loads(output.strip().splitlines()[-1])
+            print(f"{synchronous:<12} {setting:<13} {result['per_second']:>11} "
+                  f"{result['p50_ms']:>8} {result['p99_ms']:>8} "
+                  f"{result['avg_batch']:>10}  {result['statuses']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""
+Retry-storm benchmark for Idempotency-Key replay.
+
+Books --bookings slots, sending every booking --retries extra times at once
+as a client retrying on timeouts would, first without and then with an
+Idempotency-Key, and reports the responses by status, database queries and
+latency. Without a key every retry after the first booking is a 409.
+
+Usage: python -m benchmarks.bench_idempotency [--bookings N] [--retries N]
+"""
+import argparse
+import asyncio
+import re
+from collections import Counter
+
+from benchmarks.common import (
+    Timer, booking_payload, future_slot_ids, percentile, use_temp_database
+)
+
+_QUERIES = re.compile(r'desc="(\d+) queries"')
+
+
+async def storm(client, slot_ids: list[str], retries: int, keyed: bool) -> dict:
+    statuses: Counter = Counter()
+    samples = []
+    queries = 0
+
+    async def attempt(body: dict, headers: dict):
+        nonlocal queries
+        with Timer() as timer:
+            response = await client.post("/api/appointments", json=body, headers=headers)
+        samples.append(timer.elapsed)
+        replayed = response.headers.get("idempotent-replayed") == "true"
+        statuses[f"{response.status_code}{' replayed' if replayed else ''}"] += 1
+        match = _QUERIES.search(response.headers.get("server-timing", ""))
+        queries += int(match.group(1)) if match else 0
+
+    for index, slot_id in enumerate(slot_ids):
+        body = booking_payload(slot_id, "provider-1")
+        headers = {"Idempotency-Key": f"bench-{index}"} if keyed else {}
+        await asyncio.gather(*(attempt(body, headers) for _ in range(retries + 1)))
+    return {
+        "statuses": dict(sorted(statuses.items())),
+        "queries": queries,
+        "p50_ms": round(percentile(samples, 50) * 1000, 2),
+        "p99_ms": round(percentile(samples, 99) * 1000, 2)
+    }
+
+
+async def run(bookings: int, retries: int) -> None:
+    import httpx
+    import main
+
+    await main.startup_event()
+    slot_ids = future_slot_ids("provider-1")
+    transport = httpx.ASGITransport(app=main.app, raise_app_exceptions=False)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        print(f"{bookings} bookings, each sent {retries + 1} times at once")
+        for keyed, slots in ((False, slot_ids[:bookings]),
+                             (True, slot_ids[bookings:2 * bookings])):
+            result = await storm(client, slots, retries, keyed)
+            print(f"{'with key' if keyed else 'no key':<9} queries {result['queries']:>5}  "
+                  f"p50 {result['p50_ms']:>7} ms  p99 {result['p99_ms']:>7} ms  "
+                  f"{result['statuses']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--bookings", type=int, default=50)
+    parser.add_argument("--retries", type=int, default=4)
+    args = parser.parse_args()
+
+    use_temp_database(METRICS_ENABLED="true", SERVER_TIMING_ENABLED="true")
+    asyncio.run(run(args.bookings, args.retries))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,151 @@
+"""
+Bulk import benchmark.
+
+Generates --rows historical appointments for every provider (weekday slots
+going back from yesterday, with one row in a hundred invalid or a duplicate)
+and imports them through POST /api/appointments/import, as NDJSON and as
+CSV, each into a fresh database. For comparison it books --baseline future
+slots one request at a time through POST /api/appointments. Reports rows
+per second for each.
+
+Usage: python -m benchmarks.bench_import [--rows N] [--baseline N]
+"""
+import argparse
+import asyncio
+import csv
+import io
+import json
+import subprocess
+import sys
+from datetime import datetime, timedelta
+
+from benchmarks.common import Timer, booking_payload, future_slot_ids, use_temp_database
+
+COLUMNS = ("provider_id", "start_time", "patient_first_name", "patient_last_name",
+           "patient_email", "patient_phone", "reason")
+
+
+def legacy_rows(provider_ids: list[str], count: int) -> list[dict]:
+    """count rows spread over the providers' past weekday slots"""
+    from slots import SLOT_OFFSETS
+    from utils import get_local_now
+
+    rows = []
+    day = get_local_now().date()
+    while len(rows) < count:
+        day -= timedelta(days=1)
+        if day.weekday() >= 5:
+            continue
+        for provider_id in provider_ids:
+            for minutes in SLOT_OFFSETS:
+                start = datetime.combine(day, datetime.min.time()) + timedelta(minutes=minutes)
+                rows.append({
+                    "provider_id": provider_id,
+                    "start_time": start.isoformat(),
+                    "patient_first_name": "Legacy",
+                    "patient_last_name": "Patient",
+                    "patient_email": f"patient{len(rows)}@example.com",
+                    "patient_phone": "555-555-0100",
+                    "reason": "Imported visit"
+                })
+    rows = rows[:count]
+    for index in range(0, count, 100):
+        # A duplicate of the previous row, or a bad email
+        if index % 200 == 0 and index:
+            rows[index] = dict(rows[index - 1])
+        else:
+            rows[index]["patient_email"] = "not-an-email"
+    return rows
+
+
+def encode(rows: list[dict], fmt: str) -> bytes:
+    if fmt == "ndjson":
+        return "".join(json.dumps(row) + "\n" for row in rows).encode()
+    out = io.StringIO()
+    writer = csv.DictWriter(out, fieldnames=COLUMNS)
+    writer.writeheader()
+    writer.writerows(rows)
+    return out.getvalue().encode()
+
+
+async def run_import(rows: int, fmt: str) -> dict:
+    import httpx
+    import main
+    from provider_registry import provider_registry
+
+    await main.startup_event()
+    provider_ids = sorted(p["id"] for p in provider_registry.all())
+    body = encode(legacy_rows(provider_ids, rows), fmt)
+    media_type = "text/csv" if fmt == "csv" else "application/x-ndjson"
+
+    transport = httpx.ASGITransport(app=main.app, raise_app_exceptions=False)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+        with Timer() as timer:
+            response = await client.post("/api/appointments/import", content=body,
+                                         headers={"content-type": media_type})
+    report = response.json()
+    return {
+        "rows": report["received"],
+        "imported": report["imported"],
+        "failed": report["failed"],
+        "per_second": round(report["received"] / timer.elapsed, 1)
+    }
+
+
+async def run_baseline(rows: int) -> dict:
+    import httpx
+    import main
+    from provider_registry import provider_registry
+
+    await main.startup_event()
+    slots = [(slot_id, provider["id"])
+             for provider in sorted(provider_registry.all(), key=lambda p: p["id"])
+             for slot_id in future_slot_ids(provider["id"], weeks=8)][:rows]
+
+    imported = 0
+    transport = httpx.ASGITransport(app=main.app, raise_app_exceptions=False)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        with Timer() as timer:
+            for slot_id, provider_id in slots:
+                response = await client.post(
+                    "/api/appointments", json=booking_payload(slot_id, provider_id))
+                imported += response.status_code == 201
+    return {
+        "rows": len(slots),
+        "imported": imported,
+        "failed": len(slots) - imported,
+        "per_second": round(len(slots) / timer.elapsed, 1)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=20000)
+    parser.add_argument("--baseline", type=int, default=500)
+    parser.add_argument("--path", choices=("ndjson", "csv", "single"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.path:
+        use_temp_database()
+        if args.path == "single":
+            result = asyncio.run(run_baseline(args.baseline))
+        else:
+            result = asyncio.run(run_import(args.rows, args.path))
+        print(json.dumps(result))
+        return
+
+    print(f"{'path':<26} {'rows':>7} {'imported':>9} {'failed':>7} {'rows/s':>9}")
+    for path, label in (("single", "POST /api/appointments"),
+                        ("ndjson", "import, NDJSON"),
+                        ("csv", "import, CSV")):
+        output = subprocess.run(
+            [sys.executable, "-m", "benchmarks.bench_import", "--path", path,
+             "--rows", str(args.rows), "--baseline", str(args.baseline)],
+            check=True, capture_output=True, text=True).stdout
+        result = json.loads(output.strip().splitlines()[-1])
+        print(f"{label:<26} {result['rows']:>7} {result['imported']:>9} "
+              f"{result['failed']:>7} {result['per_second']:>9}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+"""
+Next-available search benchmark.
+
+Books a provider solid for the next --days days, then finds their first
+opening two ways with the availability cache disabled: paging through
+/api/availability a week at a time, as a client without the search would,
+and a single /api/availability/next call. Runs with the slots table on and
+off, each in its own process.
+
+Usage: python -m benchmarks.bench_next_available [--days N] [--repeat N]
+"""
+import argparse
+import asyncio
+import json
+import subprocess
+import sys
+from datetime import timedelta
+
+from benchmarks.common import Timer, booking_payload, percentile, use_temp_database
+
+PROVIDER = "provider-1"
+
+
+async def run_search(days: int, repeat: int) -> dict:
+    import httpx
+    import main
+    from slots import build_slot_grid
+    from utils import get_local_now
+
+    await main.startup_event()
+    today = get_local_now().date()
+    transport = httpx.ASGITransport(app=main.app, raise_app_exceptions=False)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        grid = build_slot_grid(today + timedelta(days=1), today + timedelta(days=days))
+        for slot_id in grid.slot_ids(PROVIDER):
+            response = await client.post("/api/appointments",
+                                         json=booking_payload(slot_id, PROVIDER))
+            response.raise_for_status()
+
+        async def paged() -> str:
+            start = today
+            while True:
+                end = start + timedelta(days=7)
+                response = await client.get("/api/availability", params={
+                    "provider_id": PROVIDER, "start_date": start.isoformat(),
+                    "end_date": end.isoformat()})
+                for slot in response.json()["slots"]:
+                    if slot["available"]:
+                        return slot["start_time"]
+                start = end
+
+        async def search() -> str:
+            response = await client.get("/api/availability/next",
+                                        params={"provider_id": PROVIDER, "limit": 1})
+            return response.json()["slots"][0]["start_time"]
+
+        result = {}
+        for name, find in (("paged", paged), ("next", search)):
+            samples = []
+            for _ in range(repeat):
+                with Timer() as timer:
+                    first = await find()
+                samples.append(timer.elapsed)
+            result[name] = {"p50_ms": round(percentile(samples, 50) * 1000, 2),
+                            "first": first}
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--days", type=int, default=60)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--slot-table", choices=("on", "off"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.slot_table:
+        use_temp_database(
+            SLOT_TABLE_ENABLED="true" if args.slot_table == "on" else "false",
+            AVAILABILITY_CACHE_TTL="0",
+            AVAILABILITY_COALESCING="false"
+        )
+        print(json.dumps(asyncio.run(run_search(args.days, args.repeat))))
+        return
+
+    print(f"{PROVIDER} fully booked for {args.days} days, cache disabled")
+    print(f"{'slot table':<11} {'paged ms':>9} {'next ms':>8}  first opening")
+    for setting in ("off", "on"):
+        output = subprocess.run(
+            [sys.executable, "-m", "benchmarks.bench_next_available",
+             "--slot-table", setting, "--days", str(args.days),
+             "--repeat", str(args.repeat)],
+            check=True, capture_output=True, text=True).stdout
+        result = json.loads(output.strip().splitlines()[-1])
+        if result["paged"]["first"] != result["next"]["first"]:
+            print(f"{setting:<11} mismatch: {result}")
+            sys.exit(1)
+        print(f"{setting:<11} {result['paged']['p50_ms']:>9} "
+              f"{result['next']['p50_ms']:>8}  {result['next']['first']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""
+Availability serialization benchmark.
+
+Serializes a 3-month availability response both ways and reports bytes per
+second:
+- models: TimeSlot/AvailabilityResponse models, re-validated against the
+  response_model and run through jsonable_encoder and JSONResponse, the
+  path FastAPI takes when a handler returns models;
+- fast: the plain dicts from availability_payload rendered by
+  FastJSONResponse, which the handlers now return directly.
+
+Usage: python -m benchmarks.bench_serialization [--repeat N]
+"""
+import argparse
+import timeit
+from datetime import timedelta
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from pydantic import TypeAdapter
+
+from availability import availability_payload
+from models import AppointmentProvider, AvailabilityResponse, TimeSlot
+from responses import FastJSONResponse, orjson
+from slots import day_grid
+from utils import get_local_now
+
+PROVIDER = {"id": "provider-1", "name": "Dr. Sarah Chen",
+            "specialty": "Family Medicine"}
+DAYS = 91
+
+
+def model_response(day_entries, after_ms: int) -> bytes:
+    payload = availability_payload(PROVIDER, day_entries, after_ms)
+    response = AvailabilityResponse(
+        provider=AppointmentProvider(**payload["provider"]),
+        slots=[TimeSlot(**slot) for slot in payload["slots"]]
+    )
+    validated = TypeAdapter(AvailabilityResponse).validate_python(
+        response, from_attributes=True)
+    return JSONResponse(jsonable_encoder(validated)).body
+
+
+def fast_response(day_entries, after_ms: int) -> bytes:
+    return FastJSONResponse(
+        availability_payload(PROVIDER, day_entries, after_ms)).body
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    start_day = get_local_now().date() + timedelta(days=1)
+    # Every third slot booked so both values of "available" appear
+    day_entries = [
+        (day_grid(start_day + timedelta(days=offset)), 0b01001001001001)
+        for offset in range(DAYS)
+    ]
+    slots = sum(len(grid) for grid, _ in day_entries)
+    print(f"{DAYS} days, {slots} slots, "
+          f"encoder: {'orjson' if orjson is not None else 'json'}")
+    print(f"{'path':>8} {'bytes':>9} {'ms':>9} {'MB/s':>9}")
+
+    for name, fn in (("models", model_response), ("fast", fast_response)):
+        body = fn(day_entries, 0)
+        seconds = min(timeit.repeat(lambda: fn(day_entries, 0),
+                                    number=1, repeat=args.repeat))
+        print(f"{name:>8} {len(body):>9} {seconds * 1000:>9.2f} "
+              f"{len(body) / seconds / 1e6:>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
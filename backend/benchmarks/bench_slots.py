@@ -0,0 +1,83 @@
+"""
+Slot generation benchmark.
+
+Compares the per-slot datetime loop that get_availability used to run with
+the template-based grid in slots.py on 1, 4 and 52 week ranges, after
+checking that both produce the same slots.
+
+Usage: python -m benchmarks.bench_slots [--repeat N]
+"""
+import argparse
+import timeit
+from datetime import datetime, timedelta
+
+from slots import build_slot_grid, day_grid
+from utils import TZ, format_iso8601, localize
+
+PROVIDER_ID = "provider-1"
+WEEKS = (1, 4, 52)
+
+
+def legacy_slots(start: datetime, end: datetime, now: datetime) -> list[tuple]:
+    """The original nested loop from main.get_availability"""
+    slots = []
+    current_date = start
+    while current_date <= end:
+        if current_date.weekday() < 5:
+            for hour in range(9, 17):
+                for minute in [0, 30]:
+                    if hour == 12:
+                        continue
+                    slot_start = current_date.replace(
+                        hour=hour, minute=minute, second=0, microsecond=0)
+                    slot_end = slot_start + timedelta(minutes=30)
+                    if slot_start > now:
+                        slot_id = f"slot-{PROVIDER_ID}-{int(slot_start.timestamp() * 1000)}"
+                        slots.append((slot_id, format_iso8601(slot_start),
+                                      format_iso8601(slot_end)))
+        current_date += timedelta(days=1)
+    return slots
+
+
+def grid_slots(start: datetime, end: datetime, now: datetime) -> list[tuple]:
+    grid = build_slot_grid(start.date(), end.date(),
+                           after_ms=int(now.timestamp() * 1000))
+    return list(zip(grid.slot_ids(PROVIDER_ID), grid.start_times, grid.end_times))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+
+    today = datetime.now(TZ).replace(tzinfo=None, hour=0, minute=0,
+                                     second=0, microsecond=0)
+    start = localize(today)
+    now = start
+
+    print(f"{'weeks':>6} {'slots':>7} {'loop ms':>10} {'cold ms':>10} "
+          f"{'warm ms':>10} {'speedup':>8}")
+    for weeks in WEEKS:
+        end = localize(today + timedelta(weeks=weeks))
+        assert grid_slots(start, end, now) == legacy_slots(start, end, now), \
+            f"grid differs from the loop over {weeks} weeks"
+
+        loop_s = min(timeit.repeat(lambda: legacy_slots(start, end, now),
+                                   number=1, repeat=args.repeat))
+
+        def cold():
+            day_grid.cache_clear()
+            grid_slots(start, end, now)
+
+        cold_s = min(timeit.repeat(cold, number=1, repeat=args.repeat))
+        warm_s = min(timeit.repeat(lambda: grid_slots(start, end, now),
+                                   number=1, repeat=args.repeat))
+        count = len(grid_slots(start, end, now))
+
+        print(f"{weeks:>6} {count:>7} {loop_s * 1000:>10.3f} "
+              f"{cold_s * 1000:>10.3f} {warm_s * 1000:>10.3f} "
+              f"{loop_s / warm_s:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,142 @@
+"""
+SQLite read throughput under concurrent booking writes.
+
+Runs reader threads issuing booked-slot range queries while writer threads
+insert appointments, once with SQLite's defaults (rollback journal,
+synchronous=FULL) and once with the tuned profile from settings (WAL,
+synchronous=NORMAL, busy_timeout, mmap and cache size). Each profile runs in
+its own process because settings are read at import time.
+
+Usage: python -m benchmarks.bench_sqlite_concurrency [--seconds N] [--readers N] [--writers N]
+"""
+import argparse
+import json
+import subprocess
+import sys
+import threading
+import time
+from datetime import timedelta
+
+from benchmarks.common import use_temp_database
+
+PROFILES = {
+    "default": {
+        "SQLITE_JOURNAL_MODE": "DELETE",
+        "SQLITE_SYNCHRONOUS": "FULL",
+        "SQLITE_BUSY_TIMEOUT_MS": "5000",
+        "SQLITE_MMAP_SIZE": "0",
+        "SQLITE_CACHE_SIZE": "-2000"
+    },
+    # Tuned values come from config.Settings defaults
+    "tuned": {}
+}
+
+
+def run_profile(seconds: float, readers: int, writers: int) -> dict:
+    from sqlalchemy.exc import OperationalError
+
+    from __init__db import seed_providers
+    from database import SessionLocal, init_db
+    from repository import commit, create_appointment, get_booked_slots
+    from utils import get_local_now, to_utc
+
+    init_db()
+    seed_providers()
+
+    today = get_local_now().date()
+    start_date = today.isoformat()
+    end_date = (today + timedelta(days=14)).isoformat()
+    stop = threading.Event()
+    counts = {"reads": 0, "writes": 0, "errors": 0}
+    lock = threading.Lock()
+    sequence = iter(range(10 ** 9))
+
+    def reader():
+        while not stop.is_set():
+            db = SessionLocal()
+            try:
+                get_booked_slots(db, "provider-1", start_date, end_date)
+                with lock:
+                    counts["reads"] += 1
+            except OperationalError:
+                with lock:
+                    counts["errors"] += 1
+            finally:
+                db.close()
+
+    def writer():
+        while not stop.is_set():
+            with lock:
+                n = next(sequence)
+            start = get_local_now().replace(second=0, microsecond=0) + \
+                timedelta(minutes=30 * (n + 1))
+            db = SessionLocal()
+            try:
+                create_appointment(db, {
+                    "id": f"appointment-bench-{n}",
+                    "reference_number": f"REF-BENCH-{n}",
+                    "slot_id": f"slot-provider-1-bench-{n}",
+                    "provider_id": "provider-1",
+                    "patient_first_name": "Bench",
+                    "patient_last_name": "Mark",
+                    "patient_email": "bench@example.com",
+                    "patient_phone": "555-555-5555",
+                    "reason": "Benchmark visit",
+                    "start_time": to_utc(start).isoformat(),
+                    "end_time": to_utc(start + timedelta(minutes=30)).isoformat(),
+                    "status": "confirmed",
+                    "created_at": to_utc(get_local_now()).isoformat()
+                })
+                commit(db)
+                with lock:
+                    counts["writes"] += 1
+            except OperationalError:
+                with lock:
+                    counts["errors"] += 1
+            finally:
+                db.close()
+
+    threads = [threading.Thread(target=reader) for _ in range(readers)] + \
+        [threading.Thread(target=writer) for _ in range(writers)]
+    for thread in threads:
+        thread.start()
+    time.sleep(seconds)
+    stop.set()
+    for thread in threads:
+        thread.join()
+
+    return {
+        "reads_per_s": round(counts["reads"] / seconds, 1),
+        "writes_per_s": round(counts["writes"] / seconds, 1),
+        "errors": counts["errors"]
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--seconds", type=float, default=5.0)
+    parser.add_argument("--readers", type=int, default=4)
+    parser.add_argument("--writers", type=int, default=2)
+    parser.add_argument("--profile", choices=PROFILES, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.profile:
+        use_temp_database(**PROFILES[args.profile])
+        print(json.dumps(run_profile(args.seconds, args.readers, args.writers)))
+        return
+
+    print(f"{'profile':<8} {'reads/s':>10} {'writes/s':>10} {'errors':>7}")
+    for profile in PROFILES:
+        output = subprocess.run(
+            [sys.executable, "-m", "benchmarks.bench_sqlite_concurrency",
+             "--profile", profile, "--seconds", str(args.seconds),
+             "--readers", str(args.readers), "--writers", str(args.writers)],
+            check=True, capture_output=True, text=True
+        ).stdout
+        result = json.loads(output.strip().splitlines()[-1])
+        print(f"{profile:<8} {result['reads_per_s']:>10} "
+              f"{result['writes_per_s']:>10} {result['errors']:>7}")
+
+
+if __name__ == "__main__":
+    main()
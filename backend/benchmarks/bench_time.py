@@ -0,0 +1,74 @@
+"""
+Time conversion microbenchmark.
+
+Measures the per-call cost of formatting a stored naive UTC datetime as local
+ISO8601: the pytz localize/astimezone path the mappers used to run, a plain
+zoneinfo astimezone, and the cached-offset utils.format_utc. Before timing,
+format_utc is checked against zoneinfo every 15 minutes across the DST
+transitions of the configured timezone.
+
+pytz is no longer a dependency; the legacy column is skipped without it.
+
+Usage: python -m benchmarks.bench_time [--number N]
+"""
+import argparse
+import timeit
+from datetime import datetime, timedelta
+
+from utils import TZ, UTC, format_utc, format_utc_ms, utc_to_ms
+
+try:
+    import pytz
+except ImportError:
+    pytz = None
+
+
+def check_dst_boundaries(year: int) -> int:
+    """Compare format_utc with zoneinfo over a year; returns values checked"""
+    checked = 0
+    value = datetime(year, 1, 1)
+    while value.year == year:
+        expected = value.replace(tzinfo=UTC).astimezone(TZ).isoformat()
+        if format_utc(value) != expected:
+            raise AssertionError(f"{value}: {format_utc(value)} != {expected}")
+        checked += 1
+        value += timedelta(minutes=15)
+    return checked
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--number", type=int, default=200000)
+    args = parser.parse_args()
+
+    year = datetime.now().year
+    checked = sum(check_dst_boundaries(y) for y in (year, year + 1))
+    print(f"DST check: {checked} values over {year}-{year + 1} match zoneinfo")
+
+    cases = {
+        "summer": datetime(year, 7, 15, 14, 30),
+        "winter": datetime(year, 1, 15, 14, 30, 0, 123456),
+    }
+    print(f"{'case':>8} {'pytz ns':>10} {'zoneinfo ns':>12} "
+          f"{'cached ns':>10} {'from ms ns':>11}")
+    for name, value in cases.items():
+        def per_call(fn) -> float:
+            return min(timeit.repeat(fn, number=args.number, repeat=3)) \
+                / args.number * 1e9
+
+        if pytz is not None:
+            pytz_tz = pytz.timezone(str(TZ))
+            legacy = f"{per_call(lambda: pytz.UTC.localize(value).astimezone(pytz_tz).isoformat()):>10.0f}"
+        else:
+            legacy = f"{'n/a':>10}"
+        zoneinfo_ns = per_call(
+            lambda: value.replace(tzinfo=UTC).astimezone(TZ).isoformat())
+        cached_ns = per_call(lambda: format_utc(value))
+        value_ms = utc_to_ms(value)
+        from_ms_ns = per_call(lambda: format_utc_ms(value_ms))
+        print(f"{name:>8} {legacy} {zoneinfo_ns:>12.0f} "
+              f"{cached_ns:>10.0f} {from_ms_ns:>11.0f}")
+
+
+if __name__ == "__main__":
+    main()
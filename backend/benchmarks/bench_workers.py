@@ -0,0 +1,131 @@
+"""
+Multi-worker throughput benchmark.
+
+Starts serve.py with 1, 2, ... N workers on a fresh SQLite database and
+drives /api/availability and /api/providers over HTTP from several client
+processes for a fixed duration, then reports requests per second and the
+scaling relative to one worker. Client processes share the machine with the
+server, so scaling is only meaningful with spare cores.
+
+Usage: python -m benchmarks.bench_workers [--max-workers N] [--seconds S]
+                                          [--clients N] [--concurrency N]
+"""
+import argparse
+import asyncio
+import multiprocessing
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+
+PROVIDERS = ("provider-1", "provider-2")
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def wait_ready(base_url: str, timeout: float = 30.0) -> None:
+    import httpx
+
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            if httpx.get(base_url + "/api/providers").status_code == 200:
+                return
+        except httpx.TransportError:
+            pass
+        time.sleep(0.2)
+    raise RuntimeError("server did not start")
+
+
+async def drive(base_url: str, seconds: float, concurrency: int) -> tuple[int, int]:
+    """Send requests until the deadline; returns (ok, failed)"""
+    import httpx
+
+    today = date.today()
+    ok = failed = 0
+    deadline = time.monotonic() + seconds
+    async with httpx.AsyncClient(base_url=base_url, timeout=30.0) as client:
+        async def worker():
+            nonlocal ok, failed
+            while time.monotonic() < deadline:
+                if random.random() < 0.1:
+                    response = await client.get("/api/providers")
+                else:
+                    start = today + timedelta(days=random.randint(1, 60))
+                    response = await client.get("/api/availability", params={
+                        "provider_id": random.choice(PROVIDERS),
+                        "start_date": start.isoformat(),
+                        "end_date": (start + timedelta(days=6)).isoformat()
+                    })
+                if response.status_code == 200:
+                    ok += 1
+                else:
+                    failed += 1
+
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return ok, failed
+
+
+def client_process(args: tuple) -> tuple[int, int]:
+    base_url, seconds, concurrency = args
+    return asyncio.run(drive(base_url, seconds, concurrency))
+
+
+def run(workers: int, seconds: float, clients: int, concurrency: int) -> dict:
+    port = free_port()
+    base_url = f"http://127.0.0.1:{port}"
+    directory = tempfile.mkdtemp(prefix="bench-workers-")
+    env = dict(os.environ, DATABASE_URL=f"sqlite:///{directory}/appointments.db")
+    server = subprocess.Popen(
+        [sys.executable, "serve.py", "--host", "127.0.0.1", "--port", str(port),
+         "--workers", str(workers)],
+        env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        wait_ready(base_url)
+        # Warm every worker's caches before measuring
+        client_process((base_url, 1.0, concurrency))
+        with multiprocessing.Pool(clients) as pool:
+            started = time.perf_counter()
+            results = pool.map(client_process,
+                               [(base_url, seconds, concurrency)] * clients)
+            elapsed = time.perf_counter() - started
+    finally:
+        server.terminate()
+        server.wait(timeout=30)
+    ok = sum(r[0] for r in results)
+    failed = sum(r[1] for r in results)
+    return {"workers": workers, "rps": ok / elapsed, "failed": failed}
+
+
+def main():
+    cpus = os.cpu_count() or 1
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--max-workers", type=int, default=cpus)
+    parser.add_argument("--seconds", type=float, default=10.0)
+    parser.add_argument("--clients", type=int, default=max(1, cpus // 2))
+    parser.add_argument("--concurrency", type=int, default=32)
+    args = parser.parse_args()
+
+    counts = sorted({1, *(n for n in (2, 4, 8, 16, 32) if n < args.max_workers),
+                     args.max_workers})
+    print(f"{cpus} CPUs, {args.clients} client process(es) x "
+          f"{args.concurrency} connections, {args.seconds:.0f}s per run")
+    print(f"{'workers':>8} {'req/s':>10} {'scaling':>8} {'failed':>7}")
+    baseline = None
+    for workers in counts:
+        result = run(workers, args.seconds, args.clients, args.concurrency)
+        baseline = baseline or result["rps"]
+        print(f"{workers:>8} {result['rps']:>10.1f} "
+              f"{result['rps'] / baseline:>7.2f}x {result['failed']:>7}")
+
+
+if __name__ == "__main__":
+    main()
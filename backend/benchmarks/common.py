@@ -0,0 +1,79 @@
+"""
+Shared helpers for the benchmark scripts.
+"""
+import os
+import random
+import tempfile
+import time
+from datetime import timedelta
+from typing import Any, Dict
+
+
+def use_temp_database(**overrides: str) -> str:
+    """
+    Point the app at a fresh SQLite file and apply settings overrides.
+
+    Must run before any app module is imported, since settings are read at
+    import time. Returns the database path.
+    """
+    path = os.path.join(tempfile.mkdtemp(prefix="bench-"), "appointments.db")
+    os.environ["DATABASE_URL"] = f"sqlite:///{path}"
+    os.environ.update(overrides)
+    return path
+
+
+def percentile(samples: list[float], pct: float) -> float:
+    """Nearest-rank percentile of samples"""
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def summarize(samples: list[float], elapsed: float) -> Dict[str, Any]:
+    """Throughput and latency percentiles (ms) for a list of durations (s)"""
+    return {
+        "requests": len(samples),
+        "rps": round(len(samples) / elapsed, 1) if elapsed else 0.0,
+        "p50_ms": round(percentile(samples, 50) * 1000, 2),
+        "p95_ms": round(percentile(samples, 95) * 1000, 2),
+        "p99_ms": round(percentile(samples, 99) * 1000, 2)
+    }
+
+
+def future_slot_ids(provider_id: str, weeks: int = 4) -> list[str]:
+    """Slot IDs of every future working slot over the next few weeks"""
+    from slots import build_slot_grid
+    from utils import get_local_now
+
+    now = get_local_now()
+    grid = build_slot_grid(now.date() + timedelta(days=1),
+                           now.date() + timedelta(weeks=weeks))
+    return grid.slot_ids(provider_id)
+
+
+def booking_payload(slot_id: str, provider_id: str) -> Dict[str, Any]:
+    """A valid booking request body for a slot"""
+    return {
+        "slot_id": slot_id,
+        "provider_id": provider_id,
+        "reason": "Benchmark visit",
+        "patient": {
+            "first_name": "Bench",
+            "last_name": "Mark",
+            "email": "bench@example.com",
+            "phone": f"555-555-{random.randint(0, 9999):04d}"
+        }
+    }
+
+
+class Timer:
+    """Context manager measuring wall time in seconds"""
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.elapsed = time.perf_counter() - self.start
@@ -0,0 +1,81 @@
+"""
+Booking contention check.
+
+Fires many concurrent bookings at one slot through the ASGI app and checks
+that exactly one gets a 201 and every other request gets a 409. Runs once
+per database mode, each in its own process.
+
+Usage: python -m benchmarks.contention_booking [--requests N]
+"""
+import argparse
+import asyncio
+import json
+import subprocess
+import sys
+from collections import Counter
+
+from benchmarks.common import (
+    Timer,
+    booking_payload,
+    future_slot_ids,
+    use_temp_database
+)
+
+
+async def run_contention(requests: int) -> dict:
+    import httpx
+    import main
+
+    await main.startup_event()
+
+    slot_id = future_slot_ids("provider-1")[0]
+    transport = httpx.ASGITransport(app=main.app, raise_app_exceptions=False)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        with Timer() as timer:
+            responses = await asyncio.gather(*(
+                client.post("/api/appointments",
+                            json=booking_payload(slot_id, "provider-1"))
+                for _ in range(requests)
+            ))
+
+    statuses = Counter(response.status_code for response in responses)
+    return {
+        "statuses": {str(code): count for code, count in sorted(statuses.items())},
+        "elapsed_ms": round(timer.elapsed * 1000, 1)
+    }
+
+
+def check_mode(mode: str, requests: int) -> dict:
+    """run_contention in a fresh process with DATABASE_ASYNC set for mode"""
+    output = subprocess.run(
+        [sys.executable, "-m", "benchmarks.contention_booking",
+         "--mode", mode, "--requests", str(requests)],
+        check=True, capture_output=True, text=True
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--requests", type=int, default=300)
+    parser.add_argument("--mode", choices=("sync", "async"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.mode:
+        use_temp_database(DATABASE_ASYNC="true" if args.mode == "async" else "false")
+        print(json.dumps(asyncio.run(run_contention(args.requests))))
+        return
+
+    failed = False
+    for mode in ("sync", "async"):
+        result = check_mode(mode, args.requests)
+        statuses = result["statuses"]
+        ok = statuses == {"201": 1, "409": args.requests - 1}
+        failed = failed or not ok
+        print(f"{mode:<6} {'ok' if ok else 'FAILED':<7} {statuses} "
+              f"in {result['elapsed_ms']} ms")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
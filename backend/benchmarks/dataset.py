@@ -0,0 +1,119 @@
+"""
+Synthetic dataset for the benchmark suite.
+
+Seeds a SQLite database with many providers and appointments spread over
+the working-hours grid from a year in the past to a quarter ahead, so
+availability, schedule and booking queries run against realistic table
+sizes. Rows are generated deterministically from a seed and inserted with
+executemany in chunks.
+
+Usage: python -m benchmarks.dataset PATH [--providers N] [--appointments N]
+"""
+import argparse
+import os
+import random
+import time
+from datetime import datetime, timedelta, timezone
+
+SPECIALTIES = (
+    "Family Medicine", "Internal Medicine", "Pediatrics", "Cardiology",
+    "Dermatology", "Psychiatry", "Orthopedics", "Neurology"
+)
+REASONS = ("Annual checkup", "Follow-up visit", "Prescription renewal",
+           "Lab results review", "New symptoms")
+FIRST_NAMES = ("Ann", "Ben", "Chloe", "David", "Emma", "Farid", "Grace", "Hugo")
+LAST_NAMES = ("Lee", "Martin", "Nguyen", "Okafor", "Patel", "Roy", "Singh", "Tremblay")
+
+PAST_DAYS = 365
+FUTURE_DAYS = 90
+CHUNK = 20000
+
+
+def provider_id(index: int) -> str:
+    return f"provider-{index + 1}"
+
+
+def seed_database(providers: int, appointments: int, seed: int = 7) -> None:
+    """
+    Create the schema and insert the providers and appointments. Uses the
+    database configured in settings, which must be empty.
+    """
+    from sqlalchemy import insert
+
+    from database import SessionLocal, init_db
+    from db_models import AppointmentDB, ProviderDB
+    from slots import build_slot_grid
+    from utils import get_local_now
+
+    rng = random.Random(seed)
+    init_db()
+    today = get_local_now().date()
+    grid = build_slot_grid(today - timedelta(days=PAST_DAYS),
+                           today + timedelta(days=FUTURE_DAYS))
+    epoch = datetime(1970, 1, 1)
+    starts = [epoch + timedelta(milliseconds=ms) for ms in grid.start_ms]
+    per_provider = min(len(starts), -(-appointments // providers))
+    created_at = datetime.now(timezone.utc).replace(tzinfo=None)
+
+    db = SessionLocal()
+    try:
+        db.execute(insert(ProviderDB), [{
+            "id": provider_id(i),
+            "name": f"Dr. {rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}",
+            "specialty": SPECIALTIES[i % len(SPECIALTIES)],
+            "bio": "Synthetic provider for benchmarking."
+        } for i in range(providers)])
+
+        rows = []
+        count = 0
+        for i in range(providers):
+            if count >= appointments:
+                break
+            for start in sorted(rng.sample(starts, min(per_provider, appointments - count))):
+                first = rng.choice(FIRST_NAMES)
+                last = rng.choice(LAST_NAMES)
+                rows.append({
+                    "id": f"seed-{count:09d}",
+                    "reference_number": f"SEED-{count:09d}",
+                    "slot_id": f"slot-{provider_id(i)}-{(start - epoch) // timedelta(milliseconds=1)}",
+                    "provider_id": provider_id(i),
+                    "patient_first_name": first,
+                    "patient_last_name": last,
+                    "patient_email": f"{first}.{last}{count}@example.com".lower(),
+                    "patient_phone": f"555-555-{count % 10000:04d}",
+                    "reason": rng.choice(REASONS),
+                    "start_time": start,
+                    "end_time": start + timedelta(minutes=30),
+                    "status": "confirmed",
+                    "created_at": created_at
+                })
+                count += 1
+                if len(rows) == CHUNK:
+                    db.execute(insert(AppointmentDB), rows)
+                    rows = []
+        if rows:
+            db.execute(insert(AppointmentDB), rows)
+        db.commit()
+    finally:
+        db.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("path", help="SQLite file to create")
+    parser.add_argument("--providers", type=int, default=2000)
+    parser.add_argument("--appointments", type=int, default=1000000)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    if os.path.exists(args.path):
+        parser.error(f"{args.path} already exists")
+    os.environ["DATABASE_URL"] = f"sqlite:///{os.path.abspath(args.path)}"
+    started = time.perf_counter()
+    seed_database(args.providers, args.appointments, args.seed)
+    print(f"Seeded {args.providers} providers and {args.appointments} "
+          f"appointments in {time.perf_counter() - started:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
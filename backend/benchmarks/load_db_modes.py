@@ -0,0 +1,115 @@
+"""
+Load test for the sync and async database modes.
+
+Drives concurrent availability and booking traffic through the ASGI app
+in-process and reports p50/p95/p99 latency per endpoint for
+DATABASE_ASYNC=false and DATABASE_ASYNC=true. Each mode runs in its own
+process because settings are read at import time.
+
+Usage: python -m benchmarks.load_db_modes [--requests N] [--concurrency N]
+"""
+import argparse
+import asyncio
+import json
+import random
+import subprocess
+import sys
+from collections import defaultdict
+from datetime import timedelta
+
+from benchmarks.common import (
+    Timer,
+    booking_payload,
+    future_slot_ids,
+    summarize,
+    use_temp_database
+)
+
+PROVIDERS = ("provider-1", "provider-2")
+BOOKING_RATIO = 0.2
+
+
+async def run_load(requests: int, concurrency: int) -> dict:
+    import httpx
+    import main
+    from utils import get_local_now
+
+    await main.startup_event()
+
+    today = get_local_now().date()
+    params = {
+        "start_date": (today + timedelta(days=1)).isoformat(),
+        "end_date": (today + timedelta(days=14)).isoformat()
+    }
+    slot_ids = {p: future_slot_ids(p) for p in PROVIDERS}
+    samples = defaultdict(list)
+    statuses = defaultdict(int)
+    queue: asyncio.Queue = asyncio.Queue()
+    for _ in range(requests):
+        queue.put_nowait(random.random() < BOOKING_RATIO)
+
+    transport = httpx.ASGITransport(app=main.app, raise_app_exceptions=False)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        async def worker():
+            while not queue.empty():
+                is_booking = queue.get_nowait()
+                provider_id = random.choice(PROVIDERS)
+                with Timer() as timer:
+                    if is_booking:
+                        slot_id = random.choice(slot_ids[provider_id])
+                        response = await client.post(
+                            "/api/appointments",
+                            json=booking_payload(slot_id, provider_id))
+                    else:
+                        response = await client.get(
+                            "/api/availability",
+                            params={"provider_id": provider_id, **params})
+                name = "book" if is_booking else "availability"
+                samples[name].append(timer.elapsed)
+                statuses[f"{name} {response.status_code}"] += 1
+
+        with Timer() as total:
+            await asyncio.gather(*(worker() for _ in range(concurrency)))
+
+    return {
+        "endpoints": {name: summarize(s, total.elapsed) for name, s in samples.items()},
+        "overall": summarize([x for s in samples.values() for x in s], total.elapsed),
+        "statuses": dict(statuses)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--mode", choices=("sync", "async"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.mode:
+        use_temp_database(
+            DATABASE_ASYNC="true" if args.mode == "async" else "false",
+            # Measure the database path, not the availability cache
+            AVAILABILITY_CACHE_TTL="0"
+        )
+        result = asyncio.run(run_load(args.requests, args.concurrency))
+        print(json.dumps(result))
+        return
+
+    print(f"{'mode':<6} {'endpoint':<13} {'rps':>8} {'p50 ms':>9} "
+          f"{'p95 ms':>9} {'p99 ms':>9}")
+    for mode in ("sync", "async"):
+        output = subprocess.run(
+            [sys.executable, "-m", "benchmarks.load_db_modes", "--mode", mode,
+             "--requests", str(args.requests),
+             "--concurrency", str(args.concurrency)],
+            check=True, capture_output=True, text=True
+        ).stdout
+        result = json.loads(output.strip().splitlines()[-1])
+        rows = {**result["endpoints"], "overall": result["overall"]}
+        for name, stats in rows.items():
+            print(f"{mode:<6} {name:<13} {stats['rps']:>8} {stats['p50_ms']:>9} "
+                  f"{stats['p95_ms']:>9} {stats['p99_ms']:>9}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,257 @@
+"""
+Benchmark suite: mixed traffic against a seeded database.
+
+Seeds (or reuses) a SQLite database from benchmarks.dataset, then drives a
+mix of availability browsing, booking and schedule viewing against the app,
+either in-process through httpx's ASGI transport or over HTTP against a
+local uvicorn. Reports throughput, p50/p95/p99 latency and database queries
+per request for each endpoint. Query counts are read from the Server-Timing
+header, so the app runs with METRICS_ENABLED and SERVER_TIMING_ENABLED.
+
+Results are written as JSON (with the git commit) and can be compared with
+an earlier run; --compare exits 1 when an endpoint's p95 regressed by more
+than --tolerance.
+
+Usage: python -m benchmarks.suite [--target asgi|uvicorn] [--db PATH]
+           [--providers N] [--appointments N] [--requests N]
+           [--concurrency N] [--output FILE] [--compare FILE]
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import re
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from datetime import date, datetime, timedelta, timezone
+
+from benchmarks.common import Timer, booking_payload, summarize
+
+# Share of each request type in the traffic mix
+MIX = (("availability", 0.6), ("schedule", 0.25), ("book", 0.15))
+
+_QUERIES = re.compile(r'db;dur=[\d.]+;desc="(\d+) queries"')
+
+
+def app_environment(db_path: str) -> dict:
+    return {
+        "DATABASE_URL": f"sqlite:///{os.path.abspath(db_path)}",
+        "DB_INIT_ON_STARTUP": "false",
+        "METRICS_ENABLED": "true",
+        "SERVER_TIMING_ENABLED": "true"
+    }
+
+
+def prepare_database(path: str, providers: int, appointments: int) -> None:
+    """Seed path in a subprocess unless it already exists"""
+    if os.path.exists(path):
+        return
+    print(f"Seeding {providers} providers and {appointments} appointments...")
+    subprocess.run([sys.executable, "-m", "benchmarks.dataset", path,
+                    "--providers", str(providers),
+                    "--appointments", str(appointments)], check=True)
+
+
+def pick_request(providers: int, today: date) -> tuple[str, str, dict]:
+    """(kind, method+path, request kwargs) for one request of the mix"""
+    kind = random.choices([k for k, _ in MIX], [w for _, w in MIX])[0]
+    provider_id = f"provider-{random.randint(1, providers)}"
+    if kind == "availability":
+        start = today + timedelta(days=random.randint(1, 60))
+        return kind, "GET /api/availability", {"params": {
+            "provider_id": provider_id,
+            "start_date": start.isoformat(),
+            "end_date": (start + timedelta(days=6)).isoformat()
+        }}
+    if kind == "schedule":
+        start = today - timedelta(days=random.randint(0, 300))
+        return kind, f"GET /api/providers/{provider_id}/appointments", {"params": {
+            "start_date": start.isoformat(),
+            "end_date": (start + timedelta(days=30)).isoformat()
+        }}
+    day = today + timedelta(days=random.randint(1, 60))
+    while day.weekday() >= 5:
+        day += timedelta(days=1)
+    from slots import day_grid
+    slot_id = random.choice(day_grid(day).slot_ids(provider_id))
+    return kind, "POST /api/appointments", {
+        "json": booking_payload(slot_id, provider_id)}
+
+
+async def drive(client, providers: int, requests: int, concurrency: int) -> dict:
+    today = date.today()
+    samples = defaultdict(list)
+    queries = defaultdict(list)
+    statuses = defaultdict(lambda: defaultdict(int))
+    remaining = requests
+
+    async def worker():
+        nonlocal remaining
+        while remaining > 0:
+            remaining -= 1
+            kind, route, kwargs = pick_request(providers, today)
+            method, path = route.split(" ", 1)
+            with Timer() as timer:
+                response = await client.request(method, path, **kwargs)
+            samples[kind].append(timer.elapsed)
+            statuses[kind][response.status_code] += 1
+            match = _QUERIES.search(response.headers.get("server-timing", ""))
+            queries[kind].append(int(match.group(1)) if match else 0)
+
+    with Timer() as total:
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+
+    endpoints = {}
+    for kind, kind_samples in samples.items():
+        stats = summarize(kind_samples, total.elapsed)
+        stats["queries_per_request"] = round(
+            sum(queries[kind]) / len(queries[kind]), 2)
+        stats["statuses"] = {str(code): n for code, n in sorted(statuses[kind].items())}
+        endpoints[kind] = stats
+    return {
+        "endpoints": endpoints,
+        "overall": summarize([x for s in samples.values() for x in s], total.elapsed)
+    }
+
+
+async def run_asgi(providers: int, requests: int, concurrency: int) -> dict:
+    import httpx
+    import main
+
+    await main.startup_event()
+    transport = httpx.ASGITransport(app=main.app, raise_app_exceptions=False)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench",
+                                 timeout=60.0) as client:
+        await drive(client, providers, min(200, requests), concurrency)  # warm-up
+        return await drive(client, providers, requests, concurrency)
+
+
+async def run_http(base_url: str, providers: int, requests: int, concurrency: int) -> dict:
+    import httpx
+
+    limits = httpx.Limits(max_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base_url, timeout=60.0, limits=limits) as client:
+        await drive(client, providers, min(200, requests), concurrency)  # warm-up
+        return await drive(client, providers, requests, concurrency)
+
+
+def start_uvicorn(env: dict) -> tuple[subprocess.Popen, str]:
+    import httpx
+
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--host", "127.0.0.1",
+         "--port", str(port), "--log-level", "warning"],
+        env=dict(os.environ, **env), stdout=subprocess.DEVNULL)
+    base_url = f"http://127.0.0.1:{port}"
+    deadline = time.monotonic() + 60
+    while time.monotonic() < deadline:
+        try:
+            if httpx.get(base_url + "/api/providers").status_code == 200:
+                return server, base_url
+        except httpx.TransportError:
+            time.sleep(0.1)
+    server.terminate()
+    raise RuntimeError("uvicorn did not start")
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"],
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def print_results(result: dict) -> None:
+    print(f"{'endpoint':<13} {'rps':>8} {'p50 ms':>8} {'p95 ms':>8} "
+          f"{'p99 ms':>8} {'queries':>8}  statuses")
+    for name, stats in {**result["endpoints"], "overall": result["overall"]}.items():
+        print(f"{name:<13} {stats['rps']:>8} {stats['p50_ms']:>8} "
+              f"{stats['p95_ms']:>8} {stats['p99_ms']:>8} "
+              f"{stats.get('queries_per_request', ''):>8}  "
+              f"{stats.get('statuses', '')}")
+
+
+def compare(result: dict, baseline: dict, tolerance: float) -> bool:
+    """Print p95/rps changes against baseline; False when p95 regressed"""
+    ok = True
+    print(f"\nvs {baseline['commit']} ({baseline['target']}):")
+    if baseline["target"] != result["target"] or baseline["params"] != result["params"]:
+        print("warning: target or parameters differ from the baseline run")
+    for name, stats in result["endpoints"].items():
+        before = baseline["endpoints"].get(name)
+        if before is None:
+            continue
+        p95_change = stats["p95_ms"] / before["p95_ms"] - 1 if before["p95_ms"] else 0.0
+        rps_change = stats["rps"] / before["rps"] - 1 if before["rps"] else 0.0
+        regressed = p95_change > tolerance
+        ok = ok and not regressed
+        print(f"{name:<13} p95 {p95_change:+.1%}  rps {rps_change:+.1%}"
+              f"{'  REGRESSION' if regressed else ''}")
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--target", choices=("asgi", "uvicorn"), default="asgi")
+    parser.add_argument("--db", default=os.path.join(tempfile.gettempdir(),
+                                                     "appointments-bench.db"),
+                        help="seeded database, created if missing and reused")
+    parser.add_argument("--providers", type=int, default=2000)
+    parser.add_argument("--appointments", type=int, default=1000000)
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--output", help="write results to this JSON file")
+    parser.add_argument("--compare", help="earlier results JSON to compare with")
+    parser.add_argument("--tolerance", type=float, default=0.10,
+                        help="allowed p95 increase for --compare (0.10 = 10%%)")
+    args = parser.parse_args()
+
+    prepare_database(args.db, args.providers, args.appointments)
+    # Bookings from earlier runs stay in the database; run on a copy
+    run_dir = tempfile.mkdtemp(prefix="bench-suite-")
+    run_db = os.path.join(run_dir, "appointments.db")
+    subprocess.run(["cp", args.db, run_db], check=True)
+    env = app_environment(run_db)
+
+    if args.target == "asgi":
+        os.environ.update(env)
+        result = asyncio.run(run_asgi(args.providers, args.requests, args.concurrency))
+    else:
+        server, base_url = start_uvicorn(env)
+        try:
+            result = asyncio.run(run_http(base_url, args.providers,
+                                          args.requests, args.concurrency))
+        finally:
+            server.terminate()
+            server.wait(timeout=30)
+
+    result.update(
+        commit=git_commit(),
+        target=args.target,
+        timestamp=datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        params={k: getattr(args, k) for k in
+                ("providers", "appointments", "requests", "concurrency")}
+    )
+    print_results(result)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(result, f, indent=2)
+        print(f"\nWrote {args.output}")
+    if args.compare:
+        with open(args.compare) as f:
+            if not compare(result, json.load(f), args.tolerance):
+                sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
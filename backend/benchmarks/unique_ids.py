@@ -0,0 +1,150 @@
+"""
+Identifier uniqueness check under concurrency.
+
+1. Mints ULIDs from many threads at once and checks they are unique and
+   strictly increasing within each thread.
+2. Draws reference-number sequence values from several processes (each with
+   several threads) sharing one SQLite database, with a small block size to
+   force frequent block reservations, and checks no value repeats.
+3. Fires concurrent bookings at distinct slots through the ASGI app and
+   checks every one succeeds with a unique ID and reference number.
+
+Exits 1 on any failure.
+
+Usage: python -m benchmarks.unique_ids [--threads N] [--processes N]
+                                       [--bookings N]
+"""
+import argparse
+import asyncio
+import json
+import multiprocessing
+import subprocess
+import sys
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks.common import Timer, booking_payload, future_slot_ids, use_temp_database
+
+PER_THREAD = 20000
+PER_PROCESS_THREAD = 500
+BLOCK_SIZE = 50
+
+
+def check_ulids(threads: int) -> list[str]:
+    from ids import new_ulid
+
+    def mint(_):
+        return [new_ulid() for _ in range(PER_THREAD)]
+
+    with ThreadPoolExecutor(threads) as pool, Timer() as timer:
+        batches = list(pool.map(mint, range(threads)))
+    errors = []
+    minted = [ulid for batch in batches for ulid in batch]
+    if len(set(minted)) != len(minted):
+        errors.append(f"{len(minted) - len(set(minted))} duplicate ULIDs")
+    if any(batch != sorted(batch) or len(set(batch)) != len(batch) for batch in batches):
+        errors.append("ULIDs not strictly increasing within a thread")
+    print(f"ULIDs: {len(minted)} from {threads} threads in "
+          f"{timer.elapsed * 1000:.0f} ms ({len(minted) / timer.elapsed:,.0f}/s)")
+    return errors
+
+
+def create_schema(database_url: str) -> None:
+    import os
+    os.environ["DATABASE_URL"] = database_url
+    import db_models  # noqa: F401 (registers the tables for init_db)
+    from database import init_db
+
+    init_db()
+
+
+def draw_sequence(args: tuple) -> list[int]:
+    database_url, threads = args
+    import os
+    os.environ["DATABASE_URL"] = database_url
+    from ids import BlockSequence, REFERENCE_SEQUENCE
+
+    sequence = BlockSequence(REFERENCE_SEQUENCE, BLOCK_SIZE)
+    with ThreadPoolExecutor(threads) as pool:
+        batches = pool.map(lambda _: [sequence.next_value() for _ in range(PER_PROCESS_THREAD)],
+                           range(threads))
+    return [value for batch in batches for value in batch]
+
+
+def check_sequence(processes: int, threads: int) -> list[str]:
+    import os
+    import tempfile
+
+    url = "sqlite:///" + os.path.join(tempfile.mkdtemp(prefix="bench-ids-"), "ids.db")
+    with multiprocessing.get_context("spawn").Pool(processes) as pool:
+        pool.apply(create_schema, (url,))
+        with Timer() as timer:
+            results = pool.map(draw_sequence, [(url, threads)] * processes)
+    values = [value for batch in results for value in batch]
+    print(f"Reference sequence: {len(values)} values from {processes} processes x "
+          f"{threads} threads, blocks of {BLOCK_SIZE}, in {timer.elapsed * 1000:.0f} ms")
+    duplicates = len(values) - len(set(values))
+    return [f"{duplicates} duplicate sequence values"] if duplicates else []
+
+
+async def run_bookings(bookings: int) -> dict:
+    import httpx
+    import main
+
+    await main.startup_event()
+    slot_ids = future_slot_ids("provider-1", weeks=max(4, bookings // 50 + 2))[:bookings]
+    transport = httpx.ASGITransport(app=main.app, raise_app_exceptions=False)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        responses = await asyncio.gather(*(
+            client.post("/api/appointments", json=booking_payload(slot_id, "provider-1"))
+            for slot_id in slot_ids
+        ))
+    created = [r.json() for r in responses if r.status_code == 201]
+    return {
+        "statuses": dict(Counter(r.status_code for r in responses)),
+        "ids": [a["id"] for a in created],
+        "references": [a["reference_number"] for a in created]
+    }
+
+
+def check_bookings(bookings: int) -> list[str]:
+    output = subprocess.run(
+        [sys.executable, "-m", "benchmarks.unique_ids", "--bookings-only",
+         "--bookings", str(bookings)],
+        check=True, capture_output=True, text=True).stdout
+    result = json.loads(output.strip().splitlines()[-1])
+    print(f"Bookings: {bookings} concurrent, statuses {result['statuses']}")
+    errors = []
+    if result["statuses"] != {"201": bookings}:
+        errors.append(f"bookings did not all succeed: {result['statuses']}")
+    for field in ("ids", "references"):
+        if len(set(result[field])) != len(result[field]):
+            errors.append(f"duplicate {field}")
+    return errors
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--threads", type=int, default=16)
+    parser.add_argument("--processes", type=int, default=4)
+    parser.add_argument("--bookings", type=int, default=300)
+    parser.add_argument("--bookings-only", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.bookings_only:
+        use_temp_database()
+        print(json.dumps(asyncio.run(run_bookings(args.bookings))))
+        return
+
+    errors = check_ulids(args.threads)
+    errors += check_sequence(args.processes, max(1, args.threads // 4))
+    errors += check_bookings(args.bookings)
+    for error in errors:
+        print(f"FAIL: {error}")
+    if errors:
+        sys.exit(1)
+    print("OK")
+
+
+if __name__ == "__main__":
+    main()
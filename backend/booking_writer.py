@@ -0,0 +1,183 @@
+"""
+Group commit for bookings.
+
+Every booking normally commits its own transaction, so on SQLite booking
+throughput is bounded by one commit (and, with synchronous=FULL, one fsync)
+per booking, and concurrent writers queue on the database lock. With
+BOOKING_GROUP_COMMIT enabled, handlers hand their inserts to a single writer
+task instead. It takes everything queued, waiting up to
+BOOKING_BATCH_WINDOW_MS for more, and writes the batch in one transaction
+on its own connection.
+
+Each booking in a batch runs in a savepoint, so a slot conflict, a taken
+Idempotency-Key or an unexpected error only affects that booking: every
+request gets its own result. SQLite transactions here start with BEGIN
+IMMEDIATE, which takes the write lock up front and makes pysqlite honour
+the savepoints.
+"""
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+from sqlalchemy import event
+from sqlalchemy.orm import sessionmaker
+
+import repository
+from config import settings
+from database import create_db_engine, is_sqlite
+from idempotency import key_in_use, new_record
+
+# (created appointment or None on a slot conflict, idempotency record or None)
+BookingResult = tuple[Optional[Dict[str, Any]], Optional[Dict[str, Any]]]
+
+
+class _KeyInUse(Exception):
+    pass
+
+
+def _writer_engine():
+    """Engine for the writer's connection"""
+    engine = create_db_engine(settings.DATABASE_URL)
+    if is_sqlite(settings.DATABASE_URL):
+        @event.listens_for(engine, "connect")
+        def _no_implicit_begin(dbapi_connection, connection_record):
+            dbapi_connection.isolation_level = None
+
+        @event.listens_for(engine, "begin")
+        def _begin_immediate(connection):
+            connection.exec_driver_sql("BEGIN IMMEDIATE")
+    return engine
+
+
+class BookingWrite:
+    """A queued booking and the future its handler awaits"""
+
+    __slots__ = ("appointment_data", "idempotency", "render", "future")
+
+    def __init__(self, appointment_data: Dict[str, Any], idempotency: Optional[tuple[str, str]],
+                 render: Callable[[Dict[str, Any]], bytes], future: asyncio.Future):
+        self.appointment_data = appointment_data
+        self.idempotency = idempotency
+        self.render = render
+        self.future = future
+
+
+class BookingWriter:
+    """Single writer task committing queued bookings in batches"""
+
+    def __init__(self, window_ms: float, max_batch: int):
+        self.window = window_ms / 1000
+        self.max_batch = max_batch
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+        self._session_factory: Optional[sessionmaker] = None
+        # One thread, so batches never overlap
+        self._executor = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="booking-writer")
+        self.batches = 0
+        self.bookings = 0
+        self.conflicts = 0
+        self.largest_batch = 0
+
+    @property
+    def enabled(self) -> bool:
+        return settings.BOOKING_GROUP_COMMIT
+
+    async def submit(self, appointment_data: Dict[str, Any], idempotency: Optional[tuple[str, str]],
+                     render: Callable[[Dict[str, Any]], bytes]) -> BookingResult:
+        """
+        Queue a booking and wait for its batch to commit. render builds the
+        response body stored for an idempotency key; raises the idempotency
+        ConflictError if another request holds the key.
+        """
+        loop = asyncio.get_running_loop()
+        if self._task is None or self._task.done():
+            self._queue = asyncio.Queue()
+            self._task = loop.create_task(self._run())
+        future = loop.create_future()
+        self._queue.put_nowait(BookingWrite(appointment_data, idempotency, render, future))
+        return await future
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            deadline = loop.time() + self.window
+            while len(batch) < self.max_batch:
+                if self._queue.empty():
+                    remaining = deadline - loop.time()
+                    if remaining <= 0:
+                        break
+                    try:
+                        batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+                    except asyncio.TimeoutError:
+                        break
+                else:
+                    batch.append(self._queue.get_nowait())
+
+            try:
+                outcomes = await loop.run_in_executor(self._executor, self._write, batch)
+            except Exception as e:
+                outcomes = [e] * len(batch)
+            for write, outcome in zip(batch, outcomes):
+                if write.future.done():
+                    continue
+                if isinstance(outcome, Exception):
+                    write.future.set_exception(outcome)
+                else:
+                    write.future.set_result(outcome)
+
+    def _write(self, batch: list[BookingWrite]) -> list[Any]:
+        """Insert a batch in one transaction; one outcome per booking"""
+        if self._session_factory is None:
+            self._session_factory = sessionmaker(
+                bind=_writer_engine(), autoflush=False, expire_on_commit=False)
+        outcomes: list[Any] = []
+        with self._session_factory() as db:
+            with db.begin():
+                for write in batch:
+                    savepoint = db.begin_nested()
+                    try:
+                        outcomes.append(self._book(db, write))
+                        savepoint.commit()
+                    except _KeyInUse:
+                        savepoint.rollback()
+                        outcomes.append(key_in_use(write.idempotency[0]))
+                    except Exception as e:
+                        savepoint.rollback()
+                        outcomes.append(e)
+
+        self.batches += 1
+        self.bookings += len(batch)
+        self.largest_batch = max(self.largest_batch, len(batch))
+        return outcomes
+
+    def _book(self, db, write: BookingWrite) -> BookingResult:
+        created = repository.create_appointment(db, write.appointment_data)
+        if created is None:
+            self.conflicts += 1
+            return None, None
+        if write.idempotency is None:
+            return created, None
+        key, fingerprint = write.idempotency
+        record, now, purge = new_record(fingerprint, 201, write.render(created))
+        if not repository.save_idempotency_record(db, {"key": key, **record}, now, purge):
+            raise _KeyInUse()
+        return created, record
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "enabled": self.enabled,
+            "queued": self._queue.qsize() if self._queue is not None else 0,
+            "batches": self.batches,
+            "bookings": self.bookings,
+            "conflicts": self.conflicts,
+            "avg_batch": round(self.bookings / self.batches, 2) if self.batches else 0.0,
+            "largest_batch": self.largest_batch
+        }
+
+
+booking_writer = BookingWriter(
+    window_ms=settings.BOOKING_BATCH_WINDOW_MS,
+    max_batch=settings.BOOKING_BATCH_SIZE
+)
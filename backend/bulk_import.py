@@ -0,0 +1,299 @@
+"""
+Bulk appointment import, for onboarding a clinic from a legacy system.
+
+Rows come as NDJSON or CSV, posted to /api/appointments/import or read from
+a file on the command line:
+
+    python bulk_import.py appointments.csv [--dry-run]
+
+POST /api/appointments validates, looks up the provider and commits once per
+booking. Here rows are handled IMPORT_CHUNK_SIZE at a time: providers come
+from a map loaded once, each provider's booked start times are loaded once
+and conflicts with them (uq_provider_start_time) or with earlier rows are
+found in memory, and a chunk's valid rows are inserted with one executemany
+and committed together. Rows that fail are reported by row number (line
+number for CSV) while the rest are imported. The booking window rules do
+not apply, since imports include past appointments; cancelled ones must be
+in the past.
+"""
+import argparse
+import codecs
+import csv
+import sys
+import time
+from datetime import date, datetime, timedelta
+from typing import Any, AsyncIterator, Callable, Dict, Iterable, Iterator, Optional
+
+from anyio import from_thread
+from pydantic import ValidationError
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+import repository
+from availability import invalidate_day
+from config import settings
+from database import SessionLocal
+from ids import new_appointment_id, reference_numbers
+from models import ImportAppointmentRow
+from slots import SLOT_MINUTES
+from streaming import NDJSON_MEDIA_TYPE
+from utils import UTC, from_utc, get_local_now, to_utc, utc_to_ms
+
+CSV_MEDIA_TYPE = "text/csv"
+FORMATS = ("csv", "ndjson")
+
+
+def format_for_media_type(content_type: str) -> Optional[str]:
+    """Import format for a request's Content-Type, or None if unsupported"""
+    media_type = content_type.split(";")[0].strip().lower()
+    if media_type == CSV_MEDIA_TYPE:
+        return "csv"
+    if media_type in (NDJSON_MEDIA_TYPE, "application/jsonl"):
+        return "ndjson"
+    return None
+
+
+def read_rows(lines: Iterable[str], fmt: str) -> Iterator[tuple[int, Any]]:
+    """(row number, raw row) pairs: a dict for CSV, the JSON text for NDJSON"""
+    if fmt == "csv":
+        reader = csv.DictReader(lines)
+        for row in reader:
+            yield reader.line_num, row
+        return
+    for number, line in enumerate(lines, 1):
+        if line.strip():
+            yield number, line
+
+
+def _describe(error: ValidationError) -> str:
+    # ("patient", "email") reads as the CSV column patient_email
+    return "; ".join(
+        f"{'_'.join(str(part) for part in e['loc'])}: {e['msg']}" if e["loc"] else e["msg"]
+        for e in error.errors(include_url=False))
+
+
+class BulkImporter:
+    """Imports appointment rows in chunks on one session"""
+
+    def __init__(self, db: Session, dry_run: bool = False, chunk_size: Optional[int] = None):
+        self.db = db
+        self.dry_run = dry_run
+        self.chunk_size = chunk_size or settings.IMPORT_CHUNK_SIZE
+        self.providers = {p["id"]: p for p in repository.get_providers(db)}
+        # Booked start times (naive UTC) per provider, including imported rows
+        self._booked: Dict[str, set[datetime]] = {}
+        self._references: set[str] = set()
+        self.received = 0
+        self.imported = 0
+        self.failed = 0
+        self.errors: list[Dict[str, Any]] = []
+        self._started = time.perf_counter()
+
+    def run(self, rows: Iterable[tuple[int, Any]],
+            on_chunk: Optional[Callable[["BulkImporter"], None]] = None) -> Dict[str, Any]:
+        """Import every row and return the report"""
+        chunk: list[tuple[int, Any]] = []
+        for row in rows:
+            chunk.append(row)
+            if len(chunk) == self.chunk_size:
+                self.import_chunk(chunk)
+                chunk = []
+                if on_chunk:
+                    on_chunk(self)
+        if chunk:
+            self.import_chunk(chunk)
+            if on_chunk:
+                on_chunk(self)
+        return self.report()
+
+    def import_chunk(self, chunk: list[tuple[int, Any]]) -> None:
+        self.received += len(chunk)
+        self._now = datetime.now(UTC).replace(tzinfo=None)
+        accepted = [(number, values) for number, raw in chunk
+                    if (values := self._validate(number, raw)) is not None]
+        accepted = self._check_references(accepted)
+        if not accepted or self.dry_run:
+            self.imported += len(accepted)
+            return
+
+        for _, values in accepted:
+            if values["reference_number"] is None:
+                label = from_utc(values["start_time"]).strftime("%Y%m%d")
+                values["reference_number"] = f"REF-{label}-{reference_numbers.next_value():06d}"
+        try:
+            repository.insert_appointments(self.db, [values for _, values in accepted])
+            self.db.commit()
+        except IntegrityError:
+            # A booking made since the start times were loaded took a slot
+            self.db.rollback()
+            accepted = self._insert_each(accepted)
+        self.imported += len(accepted)
+        self._invalidate(accepted)
+
+    def _fail(self, number: int, error: str) -> None:
+        self.failed += 1
+        if len(self.errors) < settings.IMPORT_MAX_ERRORS:
+            self.errors.append({"row": number, "error": error})
+
+    def _validate(self, number: int, raw: Any) -> Optional[Dict[str, Any]]:
+        """Column values for a valid, conflict-free row, else None"""
+        try:
+            if isinstance(raw, str):
+                row = ImportAppointmentRow.model_validate_json(raw)
+            else:
+                row = ImportAppointmentRow.model_validate(raw)
+        except ValidationError as e:
+            self._fail(number, _describe(e))
+            return None
+
+        if row.provider_id not in self.providers:
+            self._fail(number, f"Provider not found: {row.provider_id}")
+            return None
+        start_time = to_utc(row.start_time)
+        end_time = to_utc(row.end_time) if row.end_time else start_time + timedelta(minutes=SLOT_MINUTES)
+        if end_time <= start_time:
+            self._fail(number, "end_time must be after start_time")
+            return None
+        start_time = start_time.replace(tzinfo=None)
+        if row.status != "confirmed" and start_time > self._now:
+            # It would hold the slot (uq_provider_start_time) while availability
+            # shows it free, so the slot could never be booked
+            self._fail(number, "Only past appointments can be imported as cancelled")
+            return None
+        booked = self._booked.get(row.provider_id)
+        if booked is None:
+            booked = self._booked[row.provider_id] = repository.get_appointment_start_times(
+                self.db, row.provider_id)
+        if start_time in booked:
+            self._fail(number, "Provider already has an appointment at this time")
+            return None
+        booked.add(start_time)
+
+        return {
+            "id": new_appointment_id(),
+            "reference_number": row.reference_number,
+            "slot_id": f"slot-{row.provider_id}-{utc_to_ms(start_time)}",
+            "provider_id": row.provider_id,
+            "patient_first_name": row.patient.first_name,
+            "patient_last_name": row.patient.last_name,
+            "patient_email": row.patient.email,
+            "patient_phone": row.patient.phone,
+            "reason": row.reason,
+            "start_time": start_time,
+            "end_time": end_time.replace(tzinfo=None),
+            "status": row.status,
+            "created_at": self._now
+        }
+
+    def _check_references(self, accepted: list[tuple[int, Dict[str, Any]]]) -> list[tuple[int, Dict[str, Any]]]:
+        """Drop rows whose legacy reference number is already in use"""
+        supplied = [values["reference_number"] for _, values in accepted
+                    if values["reference_number"] is not None]
+        if not supplied:
+            return accepted
+        taken = self._references | repository.find_reference_numbers(self.db, supplied)
+        kept = []
+        for number, values in accepted:
+            reference = values["reference_number"]
+            if reference is not None:
+                if reference in taken:
+                    self._fail(number, f"Reference number already in use: {reference}")
+                    self._booked[values["provider_id"]].discard(values["start_time"])
+                    continue
+                taken.add(reference)
+                self._references.add(reference)
+            kept.append((number, values))
+        return kept
+
+    def _insert_each(self, accepted: list[tuple[int, Dict[str, Any]]]) -> list[tuple[int, Dict[str, Any]]]:
+        """Insert and commit rows one at a time, failing only those that conflict"""
+        inserted = []
+        for number, values in accepted:
+            try:
+                repository.insert_appointments(self.db, [values])
+                self.db.commit()
+            except IntegrityError:
+                self.db.rollback()
+                self._fail(number, "Conflicts with an existing appointment")
+                continue
+            inserted.append((number, values))
+        return inserted
+
+    def _invalidate(self, inserted: list[tuple[int, Dict[str, Any]]]) -> None:
+        """Drop cached availability for the upcoming days the rows booked"""
+        today = get_local_now().date()
+        days: set[tuple[str, date]] = set()
+        for _, values in inserted:
+            day = from_utc(values["start_time"]).date()
+            if day >= today:
+                days.add((values["provider_id"], day))
+        for provider_id, day in days:
+            invalidate_day(provider_id, day)
+
+    def report(self) -> Dict[str, Any]:
+        elapsed = time.perf_counter() - self._started
+        return {
+            "received": self.received,
+            "imported": self.imported,
+            "failed": self.failed,
+            "dry_run": self.dry_run,
+            "errors": sorted(self.errors, key=lambda error: error["row"]),
+            "elapsed_ms": round(elapsed * 1000, 1),
+            "rows_per_second": round(self.received / elapsed, 1) if elapsed else 0.0
+        }
+
+
+def _body_lines(chunks: AsyncIterator[bytes]) -> Iterator[str]:
+    """Lines of a request body, pulled from the event loop by a worker thread"""
+    decoder = codecs.getincrementaldecoder("utf-8")()
+    pending = ""
+    while True:
+        try:
+            chunk = from_thread.run(chunks.__anext__)
+        except StopAsyncIteration:
+            break
+        *lines, pending = (pending + decoder.decode(chunk)).split("\n")
+        for line in lines:
+            yield line + "\n"
+    pending += decoder.decode(b"", final=True)
+    if pending:
+        yield pending
+
+
+def import_body(chunks: AsyncIterator[bytes], fmt: str, dry_run: bool = False) -> Dict[str, Any]:
+    """
+    Import a streamed request body and return the report. Runs in a worker
+    thread (run_in_threadpool), reading the body as it arrives.
+    """
+    with SessionLocal() as db:
+        return BulkImporter(db, dry_run).run(read_rows(_body_lines(chunks), fmt))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Import appointments from a CSV or NDJSON file")
+    parser.add_argument("path")
+    parser.add_argument("--format", choices=FORMATS,
+                        help="csv or ndjson (default: from the file extension)")
+    parser.add_argument("--chunk-size", type=int, default=settings.IMPORT_CHUNK_SIZE)
+    parser.add_argument("--dry-run", action="store_true",
+                        help="validate and check for conflicts without inserting")
+    args = parser.parse_args()
+    fmt = args.format or ("csv" if args.path.lower().endswith(".csv") else "ndjson")
+
+    def progress(importer: BulkImporter) -> None:
+        print(f"{importer.received} rows: {importer.imported} imported, "
+              f"{importer.failed} failed", file=sys.stderr)
+
+    with open(args.path, newline="", encoding="utf-8") as f, SessionLocal() as db:
+        report = BulkImporter(db, args.dry_run, args.chunk_size).run(read_rows(f, fmt), progress)
+
+    for error in report["errors"]:
+        print(f"row {error['row']}: {error['error']}")
+    verb = "would be imported" if args.dry_run else "imported"
+    print(f"{report['imported']} of {report['received']} rows {verb}, {report['failed']} failed "
+          f"in {report['elapsed_ms'] / 1000:.2f}s ({report['rows_per_second']} rows/s)")
+    sys.exit(1 if report["failed"] else 0)
+
+
+if __name__ == "__main__":
+    main()
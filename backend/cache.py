@@ -0,0 +1,122 @@
+"""
+In-process caches.
+"""
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional
+
+from config import settings
+
+
+class LRUCache:
+    """
+    Thread-safe LRU cache with per-entry TTL and hit/miss counters.
+
+    Entries are evicted when the cache grows past maxsize (least recently
+    used first) or when they are older than ttl seconds.
+
+    Every invalidation bumps the key's generation. A caller that loads a
+    value takes generation(key) first and stores it with set_if_current(),
+    so a value read before an invalidation never overwrites it.
+    """
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries: "OrderedDict[Hashable, tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+        self.stale_sets = 0
+        # Bumped by clear(); generations are (epoch, per-key count)
+        self._epoch = 0
+        self._generations: Dict[Hashable, int] = {}
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Return the cached value for key, or None on a miss"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                self.evictions += 1
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: Hashable, value: Any) -> None:
+        """Store value under key, evicting the oldest entries if full"""
+        with self._lock:
+            self._store(key, value)
+
+    def _store(self, key: Hashable, value: Any) -> None:
+        self._entries[key] = (time.monotonic() + self.ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def generation(self, key: Hashable) -> tuple[int, int]:
+        """Token that changes whenever key is invalidated"""
+        with self._lock:
+            return self._epoch, self._generations.get(key, 0)
+
+    def set_if_current(self, key: Hashable, value: Any, generation: tuple[int, int]) -> bool:
+        """set() unless key was invalidated since generation was taken"""
+        with self._lock:
+            if (self._epoch, self._generations.get(key, 0)) != generation:
+                self.stale_sets += 1
+                return False
+            self._store(key, value)
+            return True
+
+    def invalidate(self, key: Hashable) -> None:
+        """Drop a single entry"""
+        with self._lock:
+            self._generations[key] = self._generations.get(key, 0) + 1
+            if self._entries.pop(key, None) is not None:
+                self.invalidations += 1
+
+    def clear(self) -> None:
+        """Drop every entry"""
+        with self._lock:
+            self._entries.clear()
+            self._generations.clear()
+            self._epoch += 1
+
+    def stats(self) -> Dict[str, Any]:
+        """Counters for monitoring the hit rate"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+                "ttl_seconds": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+                "stale_sets": self.stale_sets
+            }
+
+
+# Booked-slot bitmaps keyed by (provider_id, local date)
+availability_cache = LRUCache(
+    maxsize=settings.AVAILABILITY_CACHE_SIZE,
+    ttl=settings.AVAILABILITY_CACHE_TTL
+)
+
+# Stored booking responses keyed by Idempotency-Key
+idempotency_cache = LRUCache(
+    maxsize=settings.IDEMPOTENCY_CACHE_SIZE,
+    ttl=settings.IDEMPOTENCY_TTL
+)
@@ -0,0 +1,278 @@
+"""
+Booking change feed, served as server-sent events.
+
+book_appointment publishes a slot-taken and an appointment-created event once
+the booking commits. Calendars and booking pages subscribe to one provider's
+events at /api/events instead of re-polling availability and schedules, and
+an idle subscriber costs a queue and a keepalive comment now and then.
+Appointment events carry patient details, so they are only sent on the
+schedule feed; the public slots feed that booking pages use has slot-taken
+alone.
+
+Every event has an increasing ID. A reconnecting client sends the last one
+it saw (Last-Event-ID) and the events it missed are replayed from a bounded
+log; if they have already left the log it gets a reset event and refetches.
+Each subscriber's queue is bounded: one that falls FEED_SUBSCRIBER_BUFFER
+events behind is disconnected and resumes from its cursor, rather than
+buffering without limit.
+
+In a single process the log is kept in memory. With SHARED_CACHE_PATH set
+it is the shared SQLite file instead: every worker with subscribers tails
+it, so IDs are global and a client can resume on any worker. Either way IDs
+start from the time the log was created, in microseconds, so a cursor from
+an earlier log (before a restart) is older than the log and gets a reset. Reads and writes of the shared file run in the threadpool,
+and subscribing holds the pump's lock so no event lands between a
+subscriber's replay and its registration.
+"""
+import asyncio
+import time
+from collections import deque
+from typing import Any, AsyncIterator, Dict, Optional
+
+from fastapi.concurrency import run_in_threadpool
+
+from config import settings
+from responses import dumps
+from shared_cache import FEED_BATCH, SharedCache, shared_cache
+
+SSE_MEDIA_TYPE = "text/event-stream"
+
+# Event names
+SLOT_TAKEN = "slot-taken"
+APPOINTMENT_CREATED = "appointment-created"
+# Sent on connect: carries the current ID so a reconnect resumes from it
+READY = "ready"
+# The cursor cannot be resumed: refetch, then carry on from this event's ID
+RESET = "reset"
+
+# Events sent on each feed kind
+FEEDS = {
+    "slots": frozenset({SLOT_TAKEN}),
+    "schedule": frozenset({SLOT_TAKEN, APPOINTMENT_CREATED})
+}
+
+# Reconnect delay suggested to clients, in milliseconds
+RETRY_MS = 3000
+
+# (id, provider_id, name, JSON data)
+Event = tuple[int, str, str, bytes]
+
+
+def sse_message(event_id: int, name: str, data: bytes) -> bytes:
+    return b"id: %d\nevent: %s\ndata: %s\n\n" % (event_id, name.encode(), data)
+
+
+class Subscription:
+    """One client's bounded queue of pending events for a provider"""
+
+    __slots__ = ("provider_id", "names", "queue", "last_id", "lagged")
+
+    def __init__(self, provider_id: str, names: frozenset[str], last_id: int):
+        self.provider_id = provider_id
+        self.names = names
+        self.queue: "asyncio.Queue[Event]" = asyncio.Queue(
+            maxsize=settings.FEED_SUBSCRIBER_BUFFER)
+        self.last_id = last_id
+        self.lagged = False
+
+    def offer(self, event: Event) -> bool:
+        """Queue an event; False once the subscriber has fallen behind"""
+        if event[0] <= self.last_id or event[2] not in self.names:
+            return True
+        if self.queue.full():
+            self.lagged = True
+            return False
+        self.queue.put_nowait(event)
+        self.last_id = event[0]
+        return True
+
+
+class ChangeFeed:
+    """Event log with per-provider fan-out to subscribers"""
+
+    def __init__(self, store: Optional[SharedCache] = None):
+        self.store = store
+        self._log: "deque[Event]" = deque(maxlen=settings.FEED_RETENTION)
+        self._next_id = time.time_ns() // 1000
+        # Events from here on are still in the log
+        self._first_id = self._next_id
+        self._subscribers: dict[str, set[Subscription]] = {}
+        self._pump: Optional[asyncio.Task] = None
+        self._wake = asyncio.Event()
+        self._pump_lock = asyncio.Lock()
+        self._last_seq = 0
+        self.published = 0
+        self.delivered = 0
+        self.lagged = 0
+        self.resets = 0
+
+    async def publish(self, provider_id: str, events: list[tuple[str, Dict[str, Any]]]) -> None:
+        """Append (name, data) events for a provider and notify subscribers"""
+        encoded = [(name, dumps(data)) for name, data in events]
+        self.published += len(encoded)
+        if self.store is not None:
+            # Delivered by the pump, in log order with other workers' events
+            await run_in_threadpool(self.store.append_events, provider_id, encoded)
+            self._wake.set()
+            return
+        for name, data in encoded:
+            if len(self._log) == self._log.maxlen:
+                self._first_id = self._log[0][0] + 1
+            event = (self._next_id, provider_id, name, data)
+            self._next_id += 1
+            self._log.append(event)
+            self._fan_out(event)
+
+    def _fan_out(self, event: Event) -> None:
+        subscribers = self._subscribers.get(event[1])
+        if not subscribers:
+            return
+        for subscription in list(subscribers):
+            if subscription.offer(event):
+                self.delivered += 1
+            else:
+                self.lagged += 1
+                self.unsubscribe(subscription)
+
+    async def _bounds(self) -> tuple[int, int]:
+        """(oldest event still in the log, newest event) IDs"""
+        if self.store is not None:
+            oldest, newest = await run_in_threadpool(self.store.event_bounds)
+            return oldest or newest + 1, newest
+        return self._first_id, self._next_id - 1
+
+    async def _replay(self, provider_id: str, after: int) -> list[Event]:
+        if self.store is None:
+            return [event for event in self._log
+                    if event[0] > after and event[1] == provider_id]
+        events: list[Event] = []
+        while True:
+            batch = await run_in_threadpool(self.store.events_after, after, provider_id)
+            events.extend(batch)
+            if len(batch) < FEED_BATCH:
+                return events
+            after = batch[-1][0]
+
+    async def subscribe(self, provider_id: str, last_event_id: Optional[int],
+                        kind: str = "slots") -> tuple[Subscription, list[bytes]]:
+        """
+        Register a subscriber to a feed kind (see FEEDS) and return it with
+        the messages to send first: the replay after last_event_id, or a
+        ready or reset event.
+        """
+        async with self._pump_lock:
+            return await self._subscribe(provider_id, last_event_id, FEEDS[kind])
+
+    async def _subscribe(self, provider_id: str, last_event_id: Optional[int],
+                         names: frozenset[str]) -> tuple[Subscription, list[bytes]]:
+        oldest, newest = await self._bounds()
+        if last_event_id is not None and oldest - 1 <= last_event_id <= newest:
+            replay = [event for event in await self._replay(provider_id, last_event_id)
+                      if event[2] in names]
+            messages = [sse_message(event[0], event[2], event[3]) for event in replay]
+            start = replay[-1][0] if replay else last_event_id
+        else:
+            name = READY if last_event_id is None else RESET
+            if name == RESET:
+                self.resets += 1
+            messages = [sse_message(newest, name, dumps({"provider_id": provider_id}))]
+            start = newest
+
+        subscription = Subscription(provider_id, names, start)
+        self._subscribers.setdefault(provider_id, set()).add(subscription)
+        if self.store is not None and self._pump is None:
+            # Earlier events went to subscribers that have since left
+            self._last_seq = start
+            self._pump = asyncio.get_running_loop().create_task(self._run_pump())
+        return subscription, messages
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        subscribers = self._subscribers.get(subscription.provider_id)
+        if subscribers is not None:
+            subscribers.discard(subscription)
+            if not subscribers:
+                del self._subscribers[subscription.provider_id]
+
+    async def _run_pump(self) -> None:
+        """Tail the shared log while this worker has subscribers"""
+        self._wake = asyncio.Event()
+        try:
+            while self._subscribers:
+                self._wake.clear()
+                async with self._pump_lock:
+                    while True:
+                        batch = await run_in_threadpool(self.store.events_after, self._last_seq)
+                        for event in batch:
+                            self._fan_out(event)
+                        if batch:
+                            self._last_seq = batch[-1][0]
+                        if len(batch) < FEED_BATCH:
+                            break
+                try:
+                    await asyncio.wait_for(
+                        self._wake.wait(), settings.SHARED_CACHE_POLL_SECONDS)
+                except asyncio.TimeoutError:
+                    pass
+        finally:
+            self._pump = None
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "subscribers": sum(len(s) for s in self._subscribers.values()),
+            "providers": len(self._subscribers),
+            "published": self.published,
+            "delivered": self.delivered,
+            "lagged": self.lagged,
+            "resets": self.resets,
+            "shared": self.store is not None
+        }
+
+
+feed = ChangeFeed(shared_cache)
+
+
+async def publish_booking(appointment: Dict[str, Any]) -> None:
+    """Announce a committed booking on its provider's feed"""
+    await feed.publish(appointment["provider_id"], [
+        (SLOT_TAKEN, {
+            "provider_id": appointment["provider_id"],
+            "slot_id": appointment["slot_id"],
+            "start_time": appointment["start_time"],
+            "end_time": appointment["end_time"]
+        }),
+        (APPOINTMENT_CREATED, {
+            "provider_id": appointment["provider_id"],
+            # Same shape as a provider schedule entry
+            "appointment": {
+                "id": appointment["id"],
+                "patient_name": f"{appointment['patient_first_name']} {appointment['patient_last_name']}",
+                "patient_email": appointment["patient_email"],
+                "start_time": appointment["start_time"],
+                "end_time": appointment["end_time"],
+                "reason": appointment["reason"],
+                "status": appointment["status"]
+            }
+        })
+    ])
+
+
+async def event_stream(provider_id: str, last_event_id: Optional[int],
+                       kind: str = "slots") -> AsyncIterator[bytes]:
+    """SSE body for one subscriber: catch-up messages, then live events"""
+    subscription, messages = await feed.subscribe(provider_id, last_event_id, kind)
+    try:
+        yield b"retry: %d\n\n" % RETRY_MS + b"".join(messages)
+        while not subscription.lagged:
+            try:
+                event = await asyncio.wait_for(
+                    subscription.queue.get(), settings.FEED_HEARTBEAT_SECONDS)
+            except asyncio.TimeoutError:
+                yield b": keepalive\n\n"
+                continue
+            chunk = [sse_message(event[0], event[2], event[3])]
+            while not subscription.queue.empty():
+                event = subscription.queue.get_nowait()
+                chunk.append(sse_message(event[0], event[2], event[3]))
+            yield b"".join(chunk)
+    finally:
+        feed.unsubscribe(subscription)
@@ -16,6 +16,25 @@ class Settings(BaseSettings):
 
     # Database
     DATABASE_URL: str = "sqlite:///./appointments.db"
+    # Use the async (AsyncSession) repository; false runs the sync one in a threadpool
+    DATABASE_ASYNC: bool = True
+
+    # Connection pool (file SQLite and server databases)
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: float = 30.0
+    DB_POOL_RECYCLE: int = 1800  # seconds, -1 disables
+    DB_POOL_PRE_PING: bool = True
+    # Create tables and seed on app startup; disable when the schema is
+    # managed by __init__db.py (serve.py does this for its workers)
+    DB_INIT_ON_STARTUP: bool = True
+
+    # SQLite pragmas applied on every new connection
+    SQLITE_JOURNAL_MODE: str = "WAL"
+    SQLITE_SYNCHRONOUS: str = "NORMAL"
+    SQLITE_BUSY_TIMEOUT_MS: int = 5000
+    SQLITE_MMAP_SIZE: int = 268435456  # bytes
+    SQLITE_CACHE_SIZE: int = -64000  # negative values are KiB
 
     # Application
     APP_ENV: str = "development"  # development, production, test
@@ -25,6 +44,50 @@ class Settings(BaseSettings):
     # Timezone
     TIMEZONE: str = "America/Toronto"
 
+    # Materialized slots table (rolling horizon maintained by a background job)
+    SLOT_TABLE_ENABLED: bool = False
+    SLOT_HORIZON_DAYS: int = 90
+    SLOT_REFRESH_SECONDS: int = 3600
+
+    # Availability cache (entries are provider-days, TTL in seconds)
+    AVAILABILITY_CACHE_SIZE: int = 4096
+    AVAILABILITY_CACHE_TTL: int = 300
+    # Share one computation between identical concurrent availability requests
+    AVAILABILITY_COALESCING: bool = True
+
+    # Idempotency-Key replay for bookings: how long a stored response is
+    # replayed, and how many are kept in memory in front of the database
+    IDEMPOTENCY_TTL: int = 86400
+    IDEMPOTENCY_CACHE_SIZE: int = 10000
+
+    # Group commit: bookings are queued to one writer task per process that
+    # commits up to BOOKING_BATCH_SIZE of them per transaction, waiting at
+    # most BOOKING_BATCH_WINDOW_MS for more to arrive
+    BOOKING_GROUP_COMMIT: bool = False
+    BOOKING_BATCH_WINDOW_MS: float = 2.0
+    BOOKING_BATCH_SIZE: int = 100
+
+    # Bulk import (bulk_import.py): rows per transaction, and how many
+    # per-row errors a report lists
+    IMPORT_CHUNK_SIZE: int = 1000
+    IMPORT_MAX_ERRORS: int = 1000
+
+    # Multi-worker mode (serve.py): worker count (0 = CPU count) and the
+    # SQLite file workers share for cache invalidation; unset = single process
+    WEB_CONCURRENCY: int = 0
+    SHARED_CACHE_PATH: str = ""
+    SHARED_CACHE_POLL_SECONDS: float = 0.05
+
+    # Change feed (/api/events): events queued per subscriber before it is
+    # disconnected, events kept for Last-Event-ID resume, keepalive interval
+    FEED_SUBSCRIBER_BUFFER: int = 256
+    FEED_RETENTION: int = 10000
+    FEED_HEARTBEAT_SECONDS: float = 15.0
+
+    # Instrumentation: /metrics (Prometheus) and the Server-Timing header
+    METRICS_ENABLED: bool = False
+    SERVER_TIMING_ENABLED: bool = False
+
     # CORS - can be JSON string or comma-separated string
     CORS_ORIGINS: Union[str, list[str]] = ["http://localhost:3000"]
 
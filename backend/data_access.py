@@ -0,0 +1,97 @@
+"""
+Data access entry points for the API handlers.
+
+With DATABASE_ASYNC enabled the handlers await the AsyncSession-based
+functions in async_repository.py. Otherwise the synchronous functions in
+repository.py run in the threadpool, so a slow query never blocks the event
+loop. Both paths expose the same awaitable signatures.
+
+Every function takes the request's session from the get_session dependency
+as its first argument, so a request uses one connection and one transaction.
+"""
+import asyncio
+from contextlib import asynccontextmanager
+from functools import wraps
+from fastapi.concurrency import iterate_in_threadpool, run_in_threadpool
+from config import settings
+from database import get_async_db, get_async_sessionmaker, get_db
+import repository
+import async_repository
+
+
+# Sessions open at once in sync mode. Holding a session ties up a pooled
+# connection across several threadpool calls, so without this bound threadpool
+# workers can all block on pool checkout while the requests holding
+# connections wait for a free worker.
+_sync_session_slots = asyncio.Semaphore(
+    settings.DB_POOL_SIZE + settings.DB_MAX_OVERFLOW)
+
+
+async def _get_threaded_db():
+    """get_db for sync mode, bounded by the connection pool capacity"""
+    async with _sync_session_slots:
+        sessions = get_db()
+        db = next(sessions)
+        try:
+            yield db
+        finally:
+            # Runs get_db's cleanup, which closes the session
+            await run_in_threadpool(sessions.close)
+
+
+async def stream_provider_appointments(provider_id: str, start_date: str, end_date: str):
+    """
+    Yield batches of a provider's appointments for a streaming response.
+
+    The stream outlives the handler, so it owns its session rather than
+    using the request's.
+    """
+    if settings.DATABASE_ASYNC:
+        async with get_async_sessionmaker()() as db:
+            async for batch in async_repository.iter_provider_appointments(
+                    db, provider_id, start_date, end_date):
+                yield batch
+        return
+
+    async with asynccontextmanager(_get_threaded_db)() as db:
+        async for batch in iterate_in_threadpool(repository.iter_provider_appointments(
+                db, provider_id, start_date, end_date)):
+            yield batch
+
+
+def _in_threadpool(func):
+    """Wrap a blocking repository function as an awaitable"""
+    @wraps(func)
+    async def wrapper(*args, **kwargs):
+        return await run_in_threadpool(func, *args, **kwargs)
+    return wrapper
+
+
+if settings.DATABASE_ASYNC:
+    get_session = get_async_db
+    commit = async_repository.commit
+    rollback = async_repository.rollback
+    get_providers = async_repository.get_providers
+    find_providers = async_repository.find_providers
+    get_provider_by_id = async_repository.get_provider_by_id
+    create_appointment = async_repository.create_appointment
+    get_booked_bitmaps = async_repository.get_booked_bitmaps
+    get_booked_bitmaps_by_provider = async_repository.get_booked_bitmaps_by_provider
+    get_open_slot_starts = async_repository.get_open_slot_starts
+    get_provider_appointments = async_repository.get_provider_appointments
+    get_idempotency_record = async_repository.get_idempotency_record
+    save_idempotency_record = async_repository.save_idempotency_record
+else:
+    get_session = _get_threaded_db
+    commit = _in_threadpool(repository.commit)
+    rollback = _in_threadpool(repository.rollback)
+    get_providers = _in_threadpool(repository.get_providers)
+    find_providers = _in_threadpool(repository.find_providers)
+    get_provider_by_id = _in_threadpool(repository.get_provider_by_id)
+    create_appointment = _in_threadpool(repository.create_appointment)
+    get_booked_bitmaps = _in_threadpool(repository.get_booked_bitmaps)
+    get_booked_bitmaps_by_provider = _in_threadpool(repository.get_booked_bitmaps_by_provider)
+    get_open_slot_starts = _in_threadpool(repository.get_open_slot_starts)
+    get_provider_appointments = _in_threadpool(repository.get_provider_appointments)
+    get_idempotency_record = _in_threadpool(repository.get_idempotency_record)
+    save_idempotency_record = _in_threadpool(repository.save_idempotency_record)
@@ -1,24 +1,131 @@
-from sqlalchemy import create_engine
-from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+import os
+from functools import lru_cache
+from sqlalchemy import create_engine, event
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import declarative_base, sessionmaker
 from config import settings
+from metrics import instrument_engine
+
+def is_sqlite(url: str) -> bool:
+    return url.split(":", 1)[0].split("+")[0] == "sqlite"
+
+
+def dialect_insert(table):
+    """INSERT construct with ON CONFLICT support for the configured database"""
+    # Imported here so only the configured dialect is loaded
+    if is_sqlite(settings.DATABASE_URL):
+        from sqlalchemy.dialects.sqlite import insert
+    else:
+        from sqlalchemy.dialects.postgresql import insert
+    return insert(table)
+
+
+def engine_options(url: str) -> dict:
+    """
+    Engine keyword arguments for a database URL, driven by settings.
+
+    In-memory SQLite uses a single-connection pool, so pool sizing only
+    applies to file databases and server databases.
+    """
+    if is_sqlite(url):
+        options = {"connect_args": {"check_same_thread": False}}
+        if ":memory:" in url or url.rstrip("/").endswith("sqlite:"):
+            return options
+    else:
+        options = {}
+
+    options.update(
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_timeout=settings.DB_POOL_TIMEOUT,
+        pool_recycle=settings.DB_POOL_RECYCLE,
+        pool_pre_ping=settings.DB_POOL_PRE_PING
+    )
+    return options
+
+
+def sqlite_pragmas() -> list[str]:
+    """PRAGMA statements applied to every new SQLite connection"""
+    return [
+        f"journal_mode={settings.SQLITE_JOURNAL_MODE}",
+        f"synchronous={settings.SQLITE_SYNCHRONOUS}",
+        f"busy_timeout={settings.SQLITE_BUSY_TIMEOUT_MS}",
+        f"mmap_size={settings.SQLITE_MMAP_SIZE}",
+        f"cache_size={settings.SQLITE_CACHE_SIZE}"
+    ]
+
+
+def _apply_sqlite_pragmas(dbapi_connection, connection_record):
+    cursor = dbapi_connection.cursor()
+    try:
+        for pragma in sqlite_pragmas():
+            cursor.execute(f"PRAGMA {pragma}")
+    finally:
+        cursor.close()
+
+
+def create_db_engine(url: str):
+    """Create a sync engine with pool settings and the SQLite pragma profile"""
+    db_engine = create_engine(url, **engine_options(url))
+    if is_sqlite(url):
+        event.listen(db_engine, "connect", _apply_sqlite_pragmas)
+    instrument_engine(db_engine)
+    return db_engine
+
 
 # Create engine using config
-engine = create_engine(
-    settings.DATABASE_URL,
-    connect_args={
-        "check_same_thread": False} if "sqlite" in settings.DATABASE_URL else {}
-)
+engine = create_db_engine(settings.DATABASE_URL)
 
 # Create session factory
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+
+def async_database_url(url: str) -> str:
+    """
+    Map a sync DATABASE_URL to its async driver:
+    aiosqlite for SQLite and asyncpg for PostgreSQL.
+    """
+    scheme, sep, rest = url.partition("://")
+    driver = scheme.split("+")[0]
+    if driver == "sqlite":
+        return f"sqlite+aiosqlite{sep}{rest}"
+    if driver in ("postgresql", "postgres"):
+        return f"postgresql+asyncpg{sep}{rest}"
+    return url
+
+
+# Async engine and session factory, used when DATABASE_ASYNC is enabled.
+# Created on first use so the async driver is only required in async mode.
+@lru_cache(maxsize=None)
+def get_async_engine():
+    """Get the async engine"""
+    url = async_database_url(settings.DATABASE_URL)
+    async_engine = create_async_engine(url, **engine_options(url))
+    if is_sqlite(url):
+        event.listen(async_engine.sync_engine, "connect", _apply_sqlite_pragmas)
+    instrument_engine(async_engine.sync_engine)
+    return async_engine
+
+
+@lru_cache(maxsize=None)
+def get_async_sessionmaker():
+    """Get the async session factory"""
+    return async_sessionmaker(
+        get_async_engine(), autoflush=False, expire_on_commit=False)
+
+
 # Base class for models
 Base = declarative_base()
 
 
 def get_db():
-    """Dependency to get database session"""
+    """
+    Dependency providing one session per request.
+
+    The session checks out a single connection and runs every repository
+    call of the request in one transaction; handlers that write commit it
+    explicitly, anything left uncommitted is rolled back on close.
+    """
     db = SessionLocal()
     try:
         yield db
@@ -26,6 +133,18 @@ def get_db():
         db.close()
 
 
+async def get_async_db():
+    """Async counterpart of get_db"""
+    async with get_async_sessionmaker()() as db:
+        yield db
+
+
 def init_db():
     """Initialize database - create all tables"""
+    # Ensure database directory exists (for SQLite)
+    db_path = settings.DATABASE_URL.replace("sqlite:///", "")
+    if is_sqlite(settings.DATABASE_URL) and db_path and db_path != ":memory:":
+        db_dir = os.path.dirname(db_path)
+        if db_dir and not os.path.exists(db_dir):
+            os.makedirs(db_dir, exist_ok=True)
     Base.metadata.create_all(bind=engine)
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, DateTime, Boolean, Text, UniqueConstraint, Index
+from sqlalchemy import BigInteger, Column, String, DateTime, Boolean, Index, Integer, LargeBinary, Text, UniqueConstraint
 from sqlalchemy.sql import func
 from database import Base
 from datetime import datetime
@@ -17,24 +17,68 @@ class ProviderDB(Base):
 class AppointmentDB(Base):
     __tablename__ = "appointments"
     __table_args__ = (
-        # Unique constraint to prevent double-booking
+        # Unique constraint to prevent double-booking. Its composite
+        # (provider_id, start_time) index also serves every per-provider
+        # range scan and the schedule's keyset pagination, so the columns
+        # carry no single-column indexes of their own.
         UniqueConstraint('provider_id', 'start_time',
                          name='uq_provider_start_time'),
-        # Explicit indexes
-        Index('idx_provider_id', 'provider_id'),
-        Index('idx_start_time', 'start_time'),
     )
 
     id = Column(String, primary_key=True, index=True)
     reference_number = Column(String, unique=True, nullable=False, index=True)
     slot_id = Column(String, nullable=False, index=True)
-    provider_id = Column(String, nullable=False, index=True)
+    provider_id = Column(String, nullable=False)
     patient_first_name = Column(String, nullable=False)
     patient_last_name = Column(String, nullable=False)
     patient_email = Column(String, nullable=False)
     patient_phone = Column(String, nullable=False)
     reason = Column(Text, nullable=False)
-    start_time = Column(DateTime, nullable=False, index=True)
+    start_time = Column(DateTime, nullable=False)
     end_time = Column(DateTime, nullable=False)
     status = Column(String, default="confirmed", nullable=False)
     created_at = Column(DateTime, server_default=func.now(), nullable=False)
+
+
+class SlotDB(Base):
+    """
+    Materialized availability: one row per provider slot over a rolling
+    horizon, kept in step with appointments (see slot_table.py).
+    """
+    __tablename__ = "slots"
+    __table_args__ = (
+        # Free-slot index: the next open slots of a provider are the first
+        # entries after a start time, however many booked slots precede them
+        Index("ix_slots_provider_state_start", "provider_id", "state", "start_time"),
+    )
+
+    # The primary key index serves per-provider range scans
+    provider_id = Column(String, primary_key=True)
+    start_time = Column(DateTime, primary_key=True)  # naive UTC
+    state = Column(String, nullable=False, default="open")  # open, booked
+
+
+class IdBlockDB(Base):
+    """
+    Block allocator state for sequential identifiers: each process reserves
+    a block of values at a time (see ids.py).
+    """
+    __tablename__ = "id_blocks"
+
+    name = Column(String, primary_key=True)
+    next_value = Column(BigInteger, nullable=False)
+
+
+class IdempotencyKeyDB(Base):
+    """
+    Stored booking responses, replayed to retries that send the same
+    Idempotency-Key (see idempotency.py).
+    """
+    __tablename__ = "idempotency_keys"
+
+    key = Column(String, primary_key=True)
+    # SHA-256 of the request body the key was first used with
+    fingerprint = Column(String, nullable=False)
+    status_code = Column(Integer, nullable=False)
+    response = Column(LargeBinary, nullable=False)
+    expires_at = Column(DateTime, nullable=False, index=True)
@@ -0,0 +1,101 @@
+"""
+Idempotency-Key support for bookings.
+
+Clients that retry POST /api/appointments after a timeout send the same
+Idempotency-Key header with each attempt. The first successful booking's
+response is stored with a fingerprint of its request body: in the database,
+in the booking's own transaction so it exists exactly when the appointment
+does and every worker sees it, and after the commit in an in-process LRU. A
+retry with the same key and body gets the stored response back without
+booking again; reusing a key for a different body is rejected.
+
+Concurrent duplicates within a worker are coalesced onto the first attempt.
+Across workers the duplicate loses the slot insert and then finds the first
+attempt's record.
+"""
+import hashlib
+from datetime import datetime, timedelta
+from typing import Any, Dict, Optional
+
+from cache import idempotency_cache
+from config import settings
+from data_access import get_idempotency_record, save_idempotency_record
+from errors import ConflictError, UnprocessableEntityError
+from singleflight import SingleFlight
+from utils import UTC
+
+IDEMPOTENCY_HEADER = "Idempotency-Key"
+# Set on responses that were replayed rather than produced by this request
+REPLAYED_HEADER = "Idempotent-Replayed"
+
+# Expired records are deleted by one save in this many
+_PURGE_EVERY = 1000
+
+# In-flight bookings by (key, fingerprint)
+booking_flights = SingleFlight()
+
+_saves = 0
+
+
+def request_fingerprint(body: bytes) -> str:
+    return hashlib.sha256(body).hexdigest()
+
+
+def _utc_now() -> datetime:
+    return datetime.now(UTC).replace(tzinfo=None)
+
+
+async def find_response(db, key: str, fingerprint: str) -> Optional[Dict[str, Any]]:
+    """
+    The stored response record for key, or None. Raises if the key was
+    first used with a different request body.
+    """
+    now = _utc_now()
+    record = idempotency_cache.get(key)
+    if record is None or record["expires_at"] <= now:
+        record = await get_idempotency_record(db, key, now)
+        if record is None:
+            return None
+        idempotency_cache.set(key, record)
+    if record["fingerprint"] != fingerprint:
+        raise UnprocessableEntityError(
+            "Idempotency-Key was already used for a different request",
+            details={"idempotency_key": key})
+    return record
+
+
+def new_record(fingerprint: str, status_code: int, response: bytes) -> tuple[Dict[str, Any], datetime, bool]:
+    """
+    A response record expiring IDEMPOTENCY_TTL from now, with the current
+    time and whether this save should also purge expired records.
+    """
+    global _saves
+    _saves += 1
+    now = _utc_now()
+    record = {
+        "fingerprint": fingerprint,
+        "status_code": status_code,
+        "response": response,
+        "expires_at": now + timedelta(seconds=settings.IDEMPOTENCY_TTL)
+    }
+    return record, now, _saves % _PURGE_EVERY == 0
+
+
+async def save_response(db, key: str, fingerprint: str, status_code: int, response: bytes) -> Optional[Dict[str, Any]]:
+    """
+    Add a response record to the session's transaction. Returns it, or None
+    if an unexpired record already holds the key. Call remember() once the
+    transaction commits.
+    """
+    record, now, purge = new_record(fingerprint, status_code, response)
+    saved = await save_idempotency_record(db, {"key": key, **record}, now, purge)
+    return record if saved else None
+
+
+def key_in_use(key: str) -> ConflictError:
+    return ConflictError("Idempotency-Key is in use by another request",
+                         details={"idempotency_key": key})
+
+
+def remember(key: str, record: Dict[str, Any]) -> None:
+    idempotency_cache.set(key, record)
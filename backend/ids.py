@@ -0,0 +1,143 @@
+"""
+Identifier generation.
+
+Appointment IDs are ULIDs: a 48-bit millisecond timestamp followed by 80
+random bits, in Crockford base32, so they sort by creation time and new rows
+land at the end of the primary key index. IDs minted in the same millisecond
+increment the random part, keeping them strictly increasing per process;
+across processes the random bits keep them unique.
+
+Reference numbers come from a database sequence handed out in blocks: each
+process reserves REFERENCE_BLOCK_SIZE values in one short transaction and
+issues them from memory, so they are unique across workers without a
+per-booking query. Imported appointments keep their legacy reference
+numbers, which may happen to match one the sequence issues later; bookings
+that hit one draw another number (see create_booking).
+"""
+import asyncio
+import os
+import threading
+import time
+from typing import Optional
+
+from fastapi.concurrency import run_in_threadpool
+
+_CROCKFORD = "0123456789ABCDEFGHJKMNPQRSTVWXYZ"
+_RANDOM_BITS = 80
+_RANDOM_MAX = (1 << _RANDOM_BITS) - 1
+
+REFERENCE_SEQUENCE = "reference_number"
+REFERENCE_BLOCK_SIZE = 1000
+
+
+def _encode(value: int, length: int) -> str:
+    chars = []
+    for _ in range(length):
+        value, index = divmod(value, 32)
+        chars.append(_CROCKFORD[index])
+    return "".join(reversed(chars))
+
+
+class UlidGenerator:
+    """Monotonic ULIDs; thread-safe"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._last_ms = -1
+        self._last_random = 0
+
+    def new(self) -> str:
+        with self._lock:
+            now_ms = time.time_ns() // 1000000
+            if now_ms <= self._last_ms:
+                # Same (or an earlier, if the clock stepped back) millisecond:
+                # stay on the last timestamp and count up
+                now_ms = self._last_ms
+                self._last_random += 1
+                if self._last_random > _RANDOM_MAX:
+                    now_ms += 1
+                    self._last_random = int.from_bytes(os.urandom(10), "big") >> 1
+            else:
+                # Leave headroom below the maximum for same-millisecond increments
+                self._last_random = int.from_bytes(os.urandom(10), "big") >> 1
+            self._last_ms = now_ms
+            return _encode(now_ms, 10) + _encode(self._last_random, 16)
+
+
+_ulids = UlidGenerator()
+
+
+def new_ulid() -> str:
+    return _ulids.new()
+
+
+def new_appointment_id() -> str:
+    return f"appointment-{new_ulid()}"
+
+
+class BlockSequence:
+    """Values of a database sequence, reserved a block at a time"""
+
+    def __init__(self, name: str, block_size: int):
+        self.name = name
+        self.block_size = block_size
+        self._next = 0
+        self._end = 0
+        self._lock = threading.Lock()
+        self._refill_lock: Optional[asyncio.Lock] = None
+        self.blocks_reserved = 0
+
+    def _take(self) -> Optional[int]:
+        with self._lock:
+            if self._next < self._end:
+                value = self._next
+                self._next += 1
+                return value
+            return None
+
+    def _refill(self) -> None:
+        """Reserve the next block in its own transaction"""
+        from database import SessionLocal
+        from repository import reserve_id_block
+
+        db = SessionLocal()
+        try:
+            start = reserve_id_block(db, self.name, self.block_size)
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+        with self._lock:
+            self._next, self._end = start, start + self.block_size
+            self.blocks_reserved += 1
+
+    def next_value(self) -> int:
+        value = self._take()
+        while value is None:
+            self._refill()
+            value = self._take()
+        return value
+
+    async def next_value_async(self) -> int:
+        """next_value() for the event loop; block reservations run in the threadpool"""
+        value = self._take()
+        if value is not None:
+            return value
+        if self._refill_lock is None:
+            self._refill_lock = asyncio.Lock()
+        async with self._refill_lock:
+            value = self._take()
+            while value is None:
+                await run_in_threadpool(self._refill)
+                value = self._take()
+        return value
+
+
+reference_numbers = BlockSequence(REFERENCE_SEQUENCE, REFERENCE_BLOCK_SIZE)
+
+
+async def new_reference_number(day_label: str) -> str:
+    """Human-readable reference, e.g. REF-20261026-001234"""
+    return f"REF-{day_label}-{await reference_numbers.next_value_async():06d}"
@@ -1,33 +1,76 @@
-from fastapi import FastAPI, Query
+import startup_timing
+from fastapi import Depends, FastAPI, Header, Query, Request, Response
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse, StreamingResponse
 from datetime import datetime, timedelta
-import random
-import pytz
+from typing import Literal, Optional
+
+from sqlalchemy.exc import IntegrityError
 
 from models import (
     Provider,
-    TimeSlot,
     CreateAppointmentRequest,
     Appointment,
     AvailabilityResponse,
+    BulkAvailabilityResponse,
+    NextAvailableResponse,
+    ProviderAppointmentsResponse,
     AppointmentSlot,
-    AppointmentProvider
+    AppointmentProvider,
+    ImportReport
 )
-from repository import (
-    get_providers,
-    get_provider_by_id,
-    check_slot_availability,
+from data_access import (
+    get_session,
+    commit,
+    rollback,
     create_appointment,
-    get_booked_slots,
-    get_provider_appointments
+    get_provider_appointments,
+    stream_provider_appointments
 )
 from config import settings
+from availability import (
+    availability_etag,
+    availability_flights,
+    availability_payload,
+    get_availability_snapshot,
+    get_providers_day_availability,
+    invalidate_day_async,
+    last_changed
+)
+from conditional import is_not_modified, not_modified, validator_headers
+from provider_registry import (
+    ensure_loaded,
+    lookup_provider,
+    provider_registry,
+    search_providers
+)
+from cache import availability_cache, idempotency_cache
+from changefeed import SSE_MEDIA_TYPE, event_stream, publish_booking
+from changefeed import feed as change_feed
+from ids import new_appointment_id, new_reference_number
+from idempotency import (
+    IDEMPOTENCY_HEADER,
+    REPLAYED_HEADER,
+    booking_flights,
+    find_response,
+    key_in_use,
+    remember,
+    request_fingerprint,
+    save_response
+)
+from next_available import find_next_available
+import metrics
+from metrics import span
+from shared_cache import stats as shared_cache_stats
+from responses import FastJSONResponse, dumps
+from streaming import appointment_lines, availability_lines, ndjson_response
 from utils import (
     get_local_now,
     to_utc,
     from_utc,
-    format_iso8601,
-    TZ
+    localize,
+    UTC
 )
 from errors import (
     NotFoundError,
@@ -38,35 +81,62 @@ from errors import (
 from database import init_db
 from db_models import ProviderDB
 from database import SessionLocal
-import os
+from slot_table import refresh_slot_horizon, run_slot_horizon_job
+import repository
+import asyncio
 
 app = FastAPI(title="Healthcare Appointment API", version="1.0.0")
 
+# Upper bound on providers in one bulk availability request
+MAX_BULK_PROVIDERS = 500
+
+# Upper bound on openings returned by the next-available search
+MAX_NEXT_AVAILABLE = 50
+
+# Provider schedule page sizes
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 500
+
+# Reference numbers drawn for one booking before giving up
+REFERENCE_ATTEMPTS = 3
+
 # Initialize database on startup
 @app.on_event("startup")
 async def startup_event():
-    """Initialize database and seed providers if needed"""
-    try:
-        # Ensure database directory exists (for SQLite)
-        db_path = settings.DATABASE_URL.replace("sqlite:///", "")
-        if db_path and db_path != ":memory:":
-            db_dir = os.path.dirname(db_path)
-            if db_dir and not os.path.exists(db_dir):
-                os.makedirs(db_dir, exist_ok=True)
-        
-        # Create tables
-        init_db()
-        
-        # Seed providers if they don't exist
-        db = SessionLocal()
+    """
+    Initialize database and seed providers if needed.
+
+    With DB_INIT_ON_STARTUP=false (serve.py workers, or after running
+    __init__db.py separately) the database is not touched here: the
+    provider directory loads on the first request.
+    """
+    if settings.DB_INIT_ON_STARTUP:
         try:
-            if db.query(ProviderDB).count() == 0:
-                from __init__db import seed_providers
-                seed_providers()
-        finally:
-            db.close()
-    except Exception as e:
-        print(f"Warning: Database initialization error: {e}")
+            # Create tables
+            init_db()
+
+            # Seed providers if they don't exist
+            db = SessionLocal()
+            try:
+                if db.query(ProviderDB).count() == 0:
+                    from __init__db import seed_providers
+                    seed_providers()
+                # Load the provider directory so lookups never wait on it
+                provider_registry.load(repository.get_providers(db))
+            finally:
+                db.close()
+
+            # Materialize the slot horizon before serving
+            if settings.SLOT_TABLE_ENABLED:
+                refresh_slot_horizon()
+        except Exception as e:
+            print(f"Warning: Database initialization error: {e}")
+
+    # Keep extending the slot horizon; the job's first run fills it in lean mode
+    if settings.SLOT_TABLE_ENABLED:
+        app.state.slot_horizon_job = asyncio.create_task(
+            run_slot_horizon_job())
+    startup_timing.mark("startup")
 
 # Configure CORS for Next.js frontend
 app.add_middleware(
@@ -76,6 +146,22 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+app.add_middleware(startup_timing.FirstRequestTimer)
+if metrics.ENABLED:
+    app.add_middleware(metrics.MetricsMiddleware)
+
+
+def parse_date_range(start_date: str, end_date: str) -> tuple[datetime, datetime]:
+    """Parse a YYYY-MM-DD date range in the practice timezone"""
+    try:
+        start = localize(datetime.strptime(start_date, "%Y-%m-%d"))
+        end = localize(datetime.strptime(end_date, "%Y-%m-%d"))
+    except ValueError:
+        raise ValidationError("Invalid date format. Use YYYY-MM-DD")
+
+    if end <= start:
+        raise ValidationError("end_date must be after start_date")
+    return start, end
 
 
 @app.get("/")
@@ -92,23 +178,42 @@ async def root():
 
 
 @app.get("/api/providers", response_model=list[Provider])
-async def list_providers():
+async def list_providers(request: Request, response: Response, db=Depends(get_session)):
     """
     Get all healthcare providers.
+
+    Served from the in-memory provider directory. Supports conditional GET
+    (If-None-Match / If-Modified-Since).
     """
-    providers = get_providers()
-    return providers
+    registry = await ensure_loaded(db)
+    if is_not_modified(request, registry.etag, registry.last_modified):
+        return not_modified(registry.etag, registry.last_modified)
+    response.headers.update(validator_headers(registry.etag, registry.last_modified))
+    return registry.all()
 
 
-@app.get("/api/availability", response_model=AvailabilityResponse)
+@app.get("/api/availability", response_model=AvailabilityResponse,
+         response_class=FastJSONResponse)
 async def get_availability(
+    request: Request,
     provider_id: str = Query(..., description="Provider ID"),
     start_date: str = Query(..., description="Start date (YYYY-MM-DD)"),
-    end_date: str = Query(..., description="End date (YYYY-MM-DD)")
+    end_date: str = Query(..., description="End date (YYYY-MM-DD)"),
+    stream: bool = Query(
+        False, description="Stream slots as NDJSON, one day at a time"),
+    db=Depends(get_session)
 ):
     """
     Get available time slots for a provider within a date range.
 
+    Concurrent identical requests are coalesced: one loads the availability
+    and renders the JSON body, the others reuse it.
+
+    With stream=true the response is NDJSON: a {"provider": ...} line
+    followed by one line per slot.
+
+    Responses carry an ETag and answer a matching If-None-Match with 304.
+
     Business Rules:
     - 30-minute slots
     - 9:00 AM - 5:00 PM
@@ -117,72 +222,129 @@ async def get_availability(
     - Only future slots
     """
     # Validate provider exists
-    provider = get_provider_by_id(provider_id)
+    provider = await lookup_provider(db, provider_id)
     if not provider:
         raise NotFoundError("Provider not found")
 
-    # Parse dates in local timezone
-    try:
-        start = TZ.localize(datetime.strptime(start_date, "%Y-%m-%d"))
-        end = TZ.localize(datetime.strptime(end_date, "%Y-%m-%d"))
-    except ValueError:
-        raise ValidationError("Invalid date format. Use YYYY-MM-DD")
+    start, end = parse_date_range(start_date, end_date)
+
+    # Day grids and booked-slot bitmaps, from the cache where possible and
+    # shared with identical requests in flight
+    with span("availability"):
+        snapshot = await get_availability_snapshot(
+            db, provider_id, start.date(), end.date())
+    day_entries, now_ms = snapshot.day_entries, snapshot.now_ms
+
+    # Validators; If-Modified-Since is not honoured here because slots drop
+    # out of the response as they pass, without any booking change
+    etag = availability_etag(provider_id, day_entries, now_ms,
+                             provider_registry.etag, stream)
+    modified = max(filter(None, (provider_registry.last_modified,
+                                 last_changed(provider_id))), default=None)
+    if is_not_modified(request, etag):
+        return not_modified(etag, modified)
+    headers = validator_headers(etag, modified)
+
+    if stream:
+        return ndjson_response(availability_lines({
+            "id": provider["id"],
+            "name": provider["name"],
+            "specialty": provider["specialty"]
+        }, day_entries, now_ms), headers)
+
+    return Response(snapshot.body(provider), media_type="application/json",
+                    headers=headers)
+
+
+@app.get("/api/availability/bulk", response_model=BulkAvailabilityResponse,
+         response_class=FastJSONResponse)
+async def get_bulk_availability(
+    provider_ids: Optional[list[str]] = Query(
+        None, description="Provider IDs (repeat the parameter)"),
+    specialty: Optional[str] = Query(None, description="Provider specialty"),
+    start_date: str = Query(..., description="Start date (YYYY-MM-DD)"),
+    end_date: str = Query(..., description="End date (YYYY-MM-DD)"),
+    db=Depends(get_session)
+):
+    """
+    Get available time slots for several providers within a date range.
 
-    if end <= start:
-        raise ValidationError("end_date must be after start_date")
+    Providers are selected by ID, by specialty, or both. Booked slots for all
+    of them are loaded with a single grouped query; the business rules are
+    the same as for /api/availability.
+    """
+    if not provider_ids and not specialty:
+        raise ValidationError("Provide provider_ids or specialty")
+    if provider_ids and len(provider_ids) > MAX_BULK_PROVIDERS:
+        raise ValidationError(
+            f"At most {MAX_BULK_PROVIDERS} providers per request")
+
+    start, end = parse_date_range(start_date, end_date)
+
+    providers = await search_providers(db, provider_ids or None, specialty)
+    if provider_ids:
+        missing = sorted(set(provider_ids) - {p["id"] for p in providers})
+        if missing:
+            raise NotFoundError("Provider not found", details={
+                                "provider_ids": missing})
+    if len(providers) > MAX_BULK_PROVIDERS:
+        raise ValidationError(
+            f"At most {MAX_BULK_PROVIDERS} providers per request")
+
+    with span("availability"):
+        availability = await get_providers_day_availability(
+            db, [p["id"] for p in providers], start.date(), end.date())
+    now_ms = int(get_local_now().timestamp() * 1000)
+
+    return FastJSONResponse({"providers": [
+        availability_payload(provider, availability[provider["id"]], now_ms)
+        for provider in providers
+    ]})
+
+
+@app.get("/api/availability/next", response_model=NextAvailableResponse,
+         response_class=FastJSONResponse)
+async def get_next_available(
+    provider_id: Optional[str] = Query(None, description="Provider ID"),
+    specialty: Optional[str] = Query(None, description="Provider specialty"),
+    limit: int = Query(5, ge=1, le=MAX_NEXT_AVAILABLE,
+                       description="Number of openings to return"),
+    db=Depends(get_session)
+):
+    """
+    Get the earliest open slots from now for one provider, or across every
+    provider of a specialty, in start time order.
 
-    # Get booked slots
-    booked_slots = get_booked_slots(provider_id, start_date, end_date)
-
-    # Generate time slots in local timezone
-    slots = []
-    current_date = start
-    now = get_local_now()
-
-    while current_date <= end:
-        # Skip weekends (0 = Monday, 6 = Sunday)
-        if current_date.weekday() < 5:  # Monday to Friday
-            # Generate slots from 9 AM to 5 PM
-            for hour in range(9, 17):
-                for minute in [0, 30]:
-                    # Skip lunch hour (12:00 PM - 1:00 PM)
-                    if hour == 12:
-                        continue
-
-                    # Create slot start time in local timezone
-                    # Use replace() which preserves timezone awareness
-                    slot_start = current_date.replace(
-                        hour=hour, minute=minute, second=0, microsecond=0)
-                    # Ensure timezone is preserved
-                    if slot_start.tzinfo is None:
-                        slot_start = TZ.localize(slot_start)
-                    slot_end = slot_start + timedelta(minutes=30)
-
-                    # Only include future slots
-                    if slot_start > now:
-                        slot_id = f"slot-{provider_id}-{int(slot_start.timestamp() * 1000)}"
-
-                        slots.append(TimeSlot(
-                            id=slot_id,
-                            start_time=format_iso8601(slot_start),
-                            end_time=format_iso8601(slot_end),
-                            available=slot_id not in booked_slots
-                        ))
-
-        current_date += timedelta(days=1)
-
-    return AvailabilityResponse(
-        provider=AppointmentProvider(
-            id=provider["id"],
-            name=provider["name"],
-            specialty=provider["specialty"]
-        ),
-        slots=slots
-    )
+    Fully booked days are skipped without generating their slots, so the
+    cost does not grow with how far out the first opening is.
+    """
+    if bool(provider_id) == bool(specialty):
+        raise ValidationError("Provide either provider_id or specialty")
+
+    if provider_id:
+        provider = await lookup_provider(db, provider_id)
+        if not provider:
+            raise NotFoundError("Provider not found")
+        provider_ids = [provider_id]
+    else:
+        provider_ids = [p["id"] for p in await search_providers(db, None, specialty)]
+        if not provider_ids:
+            raise NotFoundError("No providers with this specialty",
+                                details={"specialty": specialty})
+
+    with span("next_available"):
+        slots = await find_next_available(db, provider_ids, limit)
+    return FastJSONResponse({"slots": slots})
 
 
 @app.post("/api/appointments", response_model=Appointment, status_code=201)
-async def book_appointment(request: CreateAppointmentRequest):
+async def book_appointment(
+    request: CreateAppointmentRequest,
+    idempotency_key: Optional[str] = Header(
+        None, alias=IDEMPOTENCY_HEADER, min_length=1, max_length=255,
+        description="Retry key: repeats of this request return the first response"),
+    db=Depends(get_session)
+):
     """
     Create a new appointment.
 
@@ -192,9 +354,59 @@ async def book_appointment(request: CreateAppointmentRequest):
     - Patient information is valid
     - Reason for visit is provided
     - Slot is in allowed window (not weekend/lunch)
+
+    With an Idempotency-Key header, the first successful booking's response
+    is kept for IDEMPOTENCY_TTL seconds: repeating the same request with the
+    same key returns it, marked Idempotent-Replayed: true, without booking
+    again. Reusing a key for a different request is rejected with 422.
+    """
+    if idempotency_key is None:
+        return booking_response(await create_booking(db, request))
+
+    fingerprint = request_fingerprint(request.model_dump_json().encode())
+    leader = False
+
+    async def book_once():
+        nonlocal leader
+        leader = True
+        return await book_idempotently(db, request, idempotency_key, fingerprint)
+
+    # Concurrent retries in this worker wait for the first attempt
+    record, replayed = await booking_flights.do(
+        (idempotency_key, fingerprint), book_once)
+    return booking_response(record["response"], replayed or not leader,
+                            record["status_code"])
+
+
+def booking_response(body: bytes, replayed: bool = False, status_code: int = 201) -> Response:
+    headers = {REPLAYED_HEADER: "true"} if replayed else None
+    return Response(body, status_code=status_code,
+                    media_type="application/json", headers=headers)
+
+
+async def book_idempotently(db, request: CreateAppointmentRequest, key: str, fingerprint: str):
+    """The stored response for key, or a new booking's; with whether it was replayed"""
+    record = await find_response(db, key, fingerprint)
+    if record is not None:
+        return record, True
+    try:
+        return await create_booking(db, request, (key, fingerprint)), False
+    except ConflictError:
+        # A retry handled by another worker may have booked it first
+        record = await find_response(db, key, fingerprint)
+        if record is None:
+            raise
+        return record, True
+
+
+async def create_booking(db, request: CreateAppointmentRequest, idempotency: Optional[tuple[str, str]] = None):
+    """
+    Validate and book a slot; returns the JSON response body. With an
+    (idempotency key, fingerprint), returns the stored response record,
+    saved in the booking's transaction.
     """
     # Validate provider exists
-    provider = get_provider_by_id(request.provider_id)
+    provider = await lookup_provider(db, request.provider_id)
     if not provider:
         raise NotFoundError("Provider not found")
 
@@ -208,7 +420,7 @@ async def book_appointment(request: CreateAppointmentRequest):
         # The timestamp is a POSIX timestamp (UTC-based seconds since epoch)
         # Convert to UTC first, then to local timezone
         # This ensures correct timezone conversion
-        start_time_utc = datetime.fromtimestamp(slot_timestamp, tz=pytz.UTC)
+        start_time_utc = datetime.fromtimestamp(slot_timestamp, tz=UTC)
         start_time = from_utc(start_time_utc)
         end_time = start_time + timedelta(minutes=30)
     except (ValueError, IndexError) as e:
@@ -227,21 +439,12 @@ async def book_appointment(request: CreateAppointmentRequest):
     if start_time < get_local_now():
         raise UnprocessableEntityError("Cannot book appointments in the past")
 
-    # Check slot availability
-    is_available = check_slot_availability(
-        request.slot_id, request.provider_id)
-    if not is_available:
-        raise ConflictError("This time slot has already been booked", details={
-                            "slot_id": request.slot_id})
-
-    # Generate reference number
-    date_str = start_time.strftime("%Y%m%d")
-    random_num = str(random.randint(0, 999)).zfill(3)
-    reference_number = f"REF-{date_str}-{random_num}"
+    # Generate reference number; the sequence makes it unique on its own
+    reference_number = await new_reference_number(start_time.strftime("%Y%m%d"))
 
     # Create appointment data
     appointment_data = {
-        "id": f"appointment-{int(get_local_now().timestamp() * 1000)}",
+        "id": new_appointment_id(),
         "reference_number": reference_number,
         "slot_id": request.slot_id,
         "provider_id": request.provider_id,
@@ -256,11 +459,71 @@ async def book_appointment(request: CreateAppointmentRequest):
         "created_at": to_utc(get_local_now()).isoformat()
     }
 
-    # Save appointment
-    created = create_appointment(appointment_data)
+    def render(created) -> bytes:
+        return appointment_body(created, provider, request)
+
+    # Save appointment; the unique (provider, start time) constraint
+    # decides who gets the slot, so there is no separate availability check
+    for attempt in range(REFERENCE_ATTEMPTS):
+        try:
+            if settings.BOOKING_GROUP_COMMIT:
+                from booking_writer import booking_writer
+                with span("group_commit"):
+                    created, record = await booking_writer.submit(appointment_data, idempotency, render)
+            else:
+                created, record = await insert_booking(db, appointment_data, idempotency, render)
+            break
+        except IntegrityError:
+            # Slot conflicts insert nothing, so this is the reference number,
+            # e.g. one taken by an imported appointment: draw another
+            if attempt + 1 == REFERENCE_ATTEMPTS:
+                raise
+            appointment_data["reference_number"] = await new_reference_number(
+                start_time.strftime("%Y%m%d"))
+    # The cached day is stale either way: booked now, or it still showed
+    # this slot as free. Invalidate after the commit so other workers
+    # cannot reload the day before the booking is visible
+    await invalidate_day_async(request.provider_id, start_time.date())
+    if created is None:
+        raise ConflictError("This time slot has already been booked", details={
+                            "slot_id": request.slot_id})
+    await publish_booking(created)
+    if record is not None:
+        remember(idempotency[0], record)
+        return record
+    return render(created)
+
 
-    # Return formatted response
-    return Appointment(
+async def insert_booking(db, appointment_data, idempotency, render):
+    """
+    Insert and commit one booking in the request's session. Returns
+    (created appointment or None if the slot is taken, idempotency record).
+    """
+    with span("insert"):
+        try:
+            created = await create_appointment(db, appointment_data)
+        except IntegrityError:
+            await rollback(db)
+            raise
+    if created is None:
+        return None, None
+
+    record = None
+    if idempotency is not None:
+        record = await save_response(db, *idempotency, 201, render(created))
+        if record is None:
+            # Another booking took the key first; leave its record alone
+            await rollback(db)
+            raise key_in_use(idempotency[0])
+
+    with span("commit"):
+        await commit(db)
+    return created, record
+
+
+def appointment_body(created, provider, request: CreateAppointmentRequest) -> bytes:
+    """JSON body of a booking response"""
+    appointment = Appointment(
         id=created["id"],
         reference_number=created["reference_number"],
         status=created["status"],
@@ -277,18 +540,60 @@ async def book_appointment(request: CreateAppointmentRequest):
         reason=created["reason"],
         created_at=created["created_at"]
     )
+    return dumps(appointment.model_dump())
+
 
+@app.post("/api/appointments/import", response_model=ImportReport,
+          response_class=FastJSONResponse)
+async def import_appointments(
+    request: Request,
+    dry_run: bool = Query(False, description="Validate and check conflicts without inserting")
+):
+    """
+    Bulk-import appointments, e.g. a clinic's history from a legacy system.
+
+    The body is CSV (text/csv, with a header row) or NDJSON
+    (application/x-ndjson), one appointment per row: provider_id,
+    start_time, optional end_time, patient_first_name, patient_last_name,
+    patient_email, patient_phone, reason, optional status and optional
+    reference_number. Rows are streamed, checked and committed in chunks;
+    invalid or conflicting rows are listed in the report by row number and
+    the others are imported. Past times are accepted.
+    """
+    # Loaded on first use: most workers never import
+    from bulk_import import format_for_media_type, import_body
+
+    fmt = format_for_media_type(request.headers.get("content-type", ""))
+    if fmt is None:
+        raise ValidationError("Send rows as text/csv or application/x-ndjson")
+    return FastJSONResponse(await run_in_threadpool(import_body, request.stream(), fmt, dry_run))
 
-@app.get("/api/providers/{provider_id}/appointments")
+
+@app.get("/api/providers/{provider_id}/appointments",
+         response_model=ProviderAppointmentsResponse,
+         response_class=FastJSONResponse)
 async def get_provider_appointments_endpoint(
     provider_id: str,
     start_date: str = Query(..., description="Start date (YYYY-MM-DD)"),
-    end_date: str = Query(..., description="End date (YYYY-MM-DD)")
+    end_date: str = Query(..., description="End date (YYYY-MM-DD)"),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE,
+                       description="Appointments per page"),
+    cursor: Optional[str] = Query(
+        None, description="next_cursor from the previous page"),
+    stream: bool = Query(
+        False, description="Stream appointments as NDJSON in database batches"),
+    db=Depends(get_session, scope="function")
 ):
     """
-    Get all appointments for a provider within a date range.
+    Get a provider's appointments within a date range, ordered by start time.
+
+    Results are paginated: pass the returned next_cursor to get the following
+    page; it is null on the last page. With stream=true the whole range is
+    returned as NDJSON instead: a {"provider_id": ...} line followed by one
+    line per appointment. The stream reads on its own session, so the
+    request's session is released before the response starts.
     """
-    provider = get_provider_by_id(provider_id)
+    provider = await lookup_provider(db, provider_id)
     if not provider:
         raise NotFoundError("Provider not found")
 
@@ -301,14 +606,108 @@ async def get_provider_appointments_endpoint(
     if end <= start:
         raise ValidationError("end_date must be after start_date")
 
-    appointments = get_provider_appointments(provider_id, start_date, end_date)
+    if stream:
+        return ndjson_response(appointment_lines(
+            provider_id,
+            stream_provider_appointments(provider_id, start_date, end_date)))
 
-    return {
+    try:
+        appointments, next_cursor = await get_provider_appointments(
+            db, provider_id, start_date, end_date, limit, cursor)
+    except ValueError:
+        raise ValidationError("Invalid cursor")
+
+    return FastJSONResponse({
         "provider_id": provider_id,
-        "appointments": appointments
+        "appointments": appointments,
+        "next_cursor": next_cursor
+    })
+
+
+@app.get("/api/events")
+async def provider_events(
+    request: Request,
+    provider_id: str = Query(..., description="Provider ID"),
+    last_event_id: Optional[int] = Query(
+        None, description="Resume after this event ID; the Last-Event-ID header takes precedence"),
+    kind: Literal["slots", "schedule"] = Query(
+        "slots", description="slots: slot-taken only; schedule: also appointment-created"),
+    db=Depends(get_session, scope="function")
+):
+    """
+    Stream a provider's booking changes as server-sent events.
+
+    Events: slot-taken (slot_id, start_time, end_time) and, with
+    kind=schedule, appointment-created (a provider schedule entry with the
+    patient's name and email), each with an ID. On
+    connect the stream sends a ready event carrying the current ID; a client
+    reconnecting with Last-Event-ID gets the events it missed, or a reset
+    event if they are no longer retained, after which it should refetch.
+
+    The database session is released before streaming starts, so open
+    streams hold no connections.
+    """
+    provider = await lookup_provider(db, provider_id)
+    if not provider:
+        raise NotFoundError("Provider not found")
+
+    header = request.headers.get("last-event-id")
+    if header:
+        try:
+            last_event_id = int(header)
+        except ValueError:
+            raise ValidationError("Invalid Last-Event-ID")
+
+    return StreamingResponse(
+        event_stream(provider_id, last_event_id, kind),
+        media_type=SSE_MEDIA_TYPE,
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics_endpoint():
+    """
+    Request, query and span histograms in the Prometheus text format.
+    Empty unless METRICS_ENABLED is set.
+    """
+    return PlainTextResponse(metrics.render(),
+                             media_type="text/plain; version=0.0.4")
+
+
+@app.get("/api/startup")
+async def startup_timings():
+    """
+    Cold-start timings of this worker in seconds since its first import.
+    """
+    return {
+        "db_init_on_startup": settings.DB_INIT_ON_STARTUP,
+        "timings": startup_timing.timings
     }
 
 
+@app.get("/api/cache/stats")
+async def cache_stats():
+    """
+    Hit/miss counters for the in-process caches.
+    """
+    from booking_writer import booking_writer
+
+    return {
+        "availability": availability_cache.stats(),
+        "providers": provider_registry.stats(),
+        "availability_coalescing": availability_flights.stats(),
+        "shared": shared_cache_stats(),
+        "change_feed": change_feed.stats(),
+        "group_commit": booking_writer.stats(),
+        "idempotency": {**idempotency_cache.stats(),
+                        "coalescing": booking_flights.stats()}
+    }
+
+
+startup_timing.mark("import")
+
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8000)
@@ -0,0 +1,201 @@
+"""
+Request instrumentation.
+
+When METRICS_ENABLED is set:
+- MetricsMiddleware records a latency histogram per (method, route, status);
+- SQLAlchemy cursor events count queries and their time, per request and in
+  a histogram;
+- span() times named sections (slot generation, serialization, commit) per
+  request and in a histogram.
+
+Everything is exposed at /metrics in the Prometheus text format. With
+SERVER_TIMING_ENABLED the per-request numbers are also sent in a
+Server-Timing header.
+
+When METRICS_ENABLED is off nothing is installed: span() returns a shared
+no-op context manager and no middleware or engine hooks are added.
+"""
+import threading
+import time
+from bisect import bisect_left
+from contextlib import nullcontext
+from contextvars import ContextVar
+from typing import Optional
+
+from sqlalchemy import event
+
+from config import settings
+
+ENABLED = settings.METRICS_ENABLED
+
+# Upper bounds in seconds; the API answers most requests in milliseconds
+BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1,
+           0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 25, 50, 100)
+
+_NOOP = nullcontext()
+
+
+class Histogram:
+    """Cumulative-bucket histogram keyed by a tuple of label values"""
+
+    def __init__(self, name: str, help_text: str, label_names: tuple[str, ...] = (),
+                 buckets: tuple = BUCKETS):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = label_names
+        self.buckets = buckets
+        self._series: dict[tuple, list] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, labels: tuple = ()) -> None:
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                # Bucket counts (+Inf last), sum
+                series = self._series[labels] = [[0] * (len(self.buckets) + 1), 0.0]
+            series[0][bisect_left(self.buckets, value)] += 1
+            series[1] += value
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.help_text}",
+                 f"# TYPE {self.name} histogram"]
+        with self._lock:
+            series = sorted(self._series.items())
+        for labels, (counts, total) in series:
+            pairs = [f'{name}="{value}"' for name, value in zip(self.label_names, labels)]
+            cumulative = 0
+            for bound, count in zip((*self.buckets, "+Inf"), counts):
+                cumulative += count
+                le = ",".join(pairs + [f'le="{bound}"'])
+                lines.append(f"{self.name}_bucket{{{le}}} {cumulative}")
+            suffix = "{" + ",".join(pairs) + "}" if pairs else ""
+            lines.append(f"{self.name}_sum{suffix} {total:g}")
+            lines.append(f"{self.name}_count{suffix} {cumulative}")
+        return lines
+
+
+request_seconds = Histogram(
+    "http_request_duration_seconds", "HTTP request latency",
+    ("method", "route", "status"))
+request_queries = Histogram(
+    "http_request_db_queries", "Database queries per HTTP request",
+    ("route",), COUNT_BUCKETS)
+query_seconds = Histogram(
+    "db_query_duration_seconds", "Database query latency")
+span_seconds = Histogram(
+    "span_duration_seconds", "Time spent in instrumented sections",
+    ("span",))
+
+# Per-request totals: span name -> [seconds, count]
+_request_spans: ContextVar[Optional[dict]] = ContextVar("request_spans", default=None)
+
+
+def _record(name: str, seconds: float) -> None:
+    spans = _request_spans.get()
+    if spans is not None:
+        entry = spans.get(name)
+        if entry is None:
+            spans[name] = [seconds, 1]
+        else:
+            entry[0] += seconds
+            entry[1] += 1
+
+
+class _Span:
+    __slots__ = ("name", "started")
+
+    def __init__(self, name: str):
+        self.name = name
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        seconds = time.perf_counter() - self.started
+        span_seconds.observe(seconds, (self.name,))
+        _record(self.name, seconds)
+
+
+def span(name: str):
+    """Time a section of a request; a no-op when metrics are disabled"""
+    if not ENABLED:
+        return _NOOP
+    return _Span(name)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    seconds = time.perf_counter() - conn.info["query_started"].pop()
+    query_seconds.observe(seconds)
+    _record("db", seconds)
+
+
+def instrument_engine(sync_engine) -> None:
+    """Count and time queries on an engine (the sync_engine of async engines)"""
+    if ENABLED:
+        event.listen(sync_engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(sync_engine, "after_cursor_execute", _after_cursor_execute)
+
+
+def server_timing(spans: dict, total: float) -> str:
+    """Server-Timing header value, durations in milliseconds"""
+    parts = []
+    for name, (seconds, count) in spans.items():
+        part = f"{name};dur={seconds * 1000:.2f}"
+        if name == "db":
+            part += f';desc="{count} queries"'
+        parts.append(part)
+    parts.append(f"total;dur={total * 1000:.2f}")
+    return ", ".join(parts)
+
+
+class MetricsMiddleware:
+    """ASGI middleware recording request latency and per-request spans"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"] == "/metrics":
+            await self.app(scope, receive, send)
+            return
+
+        spans: dict = {}
+        token = _request_spans.set(spans)
+        started = time.perf_counter()
+        status = 500
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                if settings.SERVER_TIMING_ENABLED:
+                    value = server_timing(spans, time.perf_counter() - started)
+                    message["headers"] = [
+                        *message.get("headers", []),
+                        (b"server-timing", value.encode("latin-1"))
+                    ]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _request_spans.reset(token)
+            route = scope.get("route")
+            route_path = getattr(route, "path", "unmatched")
+            request_seconds.observe(time.perf_counter() - started,
+                                    (scope["method"], route_path, str(status)))
+            request_queries.observe(spans.get("db", (0, 0))[1], (route_path,))
+
+
+def render() -> str:
+    """All metrics in the Prometheus text exposition format"""
+    lines = []
+    for histogram in (request_seconds, request_queries, query_seconds, span_seconds):
+        lines.extend(histogram.render())
+    return "\n".join(lines) + "\n"
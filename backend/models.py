@@ -1,5 +1,5 @@
-from pydantic import BaseModel, Field, field_validator
-from typing import Optional
+from pydantic import BaseModel, Field, field_validator, model_validator
+from typing import Literal, Optional
 from datetime import datetime
 import re
 
@@ -81,6 +81,10 @@ class AvailabilityResponse(BaseModel):
     slots: list[TimeSlot]
 
 
+class BulkAvailabilityResponse(BaseModel):
+    providers: list[AvailabilityResponse]
+
+
 class ProviderAppointment(BaseModel):
     id: str
     patient_name: str
@@ -94,4 +98,58 @@ class ProviderAppointment(BaseModel):
 class ProviderAppointmentsResponse(BaseModel):
     provider_id: str
     appointments: list[ProviderAppointment]
+    next_cursor: Optional[str] = None
+
+
+class NextAvailableSlot(BaseModel):
+    id: str
+    provider_id: str
+    start_time: str
+    end_time: str
 
+
+class NextAvailableResponse(BaseModel):
+    slots: list[NextAvailableSlot]
+
+
+class ImportAppointmentRow(BaseModel):
+    """
+    One appointment to import. Patient fields may be flat (patient_email,
+    as CSV columns) or nested under patient; naive times are practice-local
+    and end_time defaults to one slot after start_time.
+    """
+    provider_id: str
+    start_time: datetime
+    end_time: Optional[datetime] = None
+    patient: PatientInfo
+    reason: str = Field(..., min_length=1, max_length=500)
+    status: Literal["confirmed", "cancelled"] = "confirmed"
+    reference_number: Optional[str] = Field(None, min_length=1, max_length=50)
+
+    @model_validator(mode="before")
+    @classmethod
+    def nest_patient(cls, data):
+        if not isinstance(data, dict):
+            return data
+        # Empty CSV cells mean "not given"
+        data = {k: v for k, v in data.items() if k is not None and v not in ("", None)}
+        if "patient" not in data:
+            data["patient"] = {field: data.pop(f"patient_{field}")
+                               for field in PatientInfo.model_fields
+                               if f"patient_{field}" in data}
+        return data
+
+
+class ImportRowError(BaseModel):
+    row: int
+    error: str
+
+
+class ImportReport(BaseModel):
+    received: int
+    imported: int
+    failed: int
+    dry_run: bool
+    errors: list[ImportRowError]
+    elapsed_ms: float
+    rows_per_second: float
@@ -0,0 +1,101 @@
+"""
+Next available slot search.
+
+Finds the earliest open slots for one provider or a group of providers
+without building availability week by week:
+
+- while the materialized slots table covers the dates, the open slots come
+  straight from its (provider_id, state, start_time) index, so the cost does
+  not depend on how many booked slots precede them;
+- beyond it (or with the table disabled) the per-day booked bitmaps are
+  scanned a window at a time through the availability cache. Fully booked
+  days and weekends are skipped on the bitmap alone, and only the free slots
+  of the days that have some are built.
+"""
+from datetime import date, datetime, timedelta
+from typing import Any, Dict
+
+from availability import get_providers_day_availability
+from data_access import get_open_slot_starts
+from repository import local_range_to_utc
+from slot_table import horizon
+from slots import SlotGrid, day_grid, slot_position, utc_to_ms
+from utils import get_local_now
+
+# How far ahead the search looks, and the days loaded per bitmap query
+MAX_HORIZON_DAYS = 365
+SCAN_WINDOW_DAYS = 28
+
+_EPOCH = datetime(1970, 1, 1)
+
+
+def free_slot_indexes(grid: SlotGrid, booked: int):
+    """Grid indexes of the free slots of a day, in order"""
+    free = ((1 << len(grid)) - 1) & ~booked
+    while free:
+        lowest = free & -free
+        yield lowest.bit_length() - 1
+        free ^= lowest
+
+
+def _slot(provider_id: str, grid: SlotGrid, index: int) -> Dict[str, Any]:
+    return {
+        "id": f"slot-{provider_id}-{grid.start_ms[index]}",
+        "provider_id": provider_id,
+        "start_time": grid.start_times[index],
+        "end_time": grid.end_times[index]
+    }
+
+
+async def _from_slot_index(db, provider_ids: list[str], now_ms: int, last_day: date, limit: int) -> list[Dict[str, Any]]:
+    after_utc = _EPOCH + timedelta(milliseconds=now_ms)
+    _, before_utc = local_range_to_utc(last_day.isoformat(), last_day.isoformat())
+    slots = []
+    for provider_id, start_time in await get_open_slot_starts(
+            db, provider_ids, after_utc, before_utc, limit):
+        position = slot_position(utc_to_ms(start_time))
+        if position is not None:
+            day, index = position
+            slots.append(_slot(provider_id, day_grid(day), index))
+    return slots
+
+
+async def find_next_available(db, provider_ids: list[str], limit: int,
+                              horizon_days: int = MAX_HORIZON_DAYS) -> list[Dict[str, Any]]:
+    """
+    The first limit open slots after now across provider_ids, in start
+    time order (ties by provider ID), looking at most horizon_days ahead.
+    """
+    now_ms = int(get_local_now().timestamp() * 1000)
+    day = get_local_now().date()
+    last_day = day + timedelta(days=horizon_days)
+    slots: list[Dict[str, Any]] = []
+
+    covered = horizon()
+    if covered is not None and covered[0] <= day:
+        index_last_day = min(covered[1], last_day)
+        slots = await _from_slot_index(db, provider_ids, now_ms, index_last_day, limit)
+        if len(slots) == limit:
+            return slots
+        day = index_last_day + timedelta(days=1)
+
+    ordered_ids = sorted(provider_ids)
+    while day <= last_day and len(slots) < limit:
+        window_end = min(day + timedelta(days=SCAN_WINDOW_DAYS - 1), last_day)
+        availability = await get_providers_day_availability(
+            db, ordered_ids, day, window_end)
+        for offset in range((window_end - day).days + 1):
+            candidates = []
+            for provider_id in ordered_ids:
+                grid, booked = availability[provider_id][offset]
+                for index in free_slot_indexes(grid, booked):
+                    if grid.start_ms[index] > now_ms:
+                        candidates.append((grid.start_ms[index], provider_id, grid, index))
+            if candidates:
+                candidates.sort(key=lambda c: (c[0], c[1]))
+                slots.extend(_slot(provider_id, grid, index)
+                             for _, provider_id, grid, index in candidates)
+                if len(slots) >= limit:
+                    return slots[:limit]
+        day = window_end + timedelta(days=1)
+    return slots
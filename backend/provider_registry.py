@@ -0,0 +1,149 @@
+"""
+In-memory provider directory.
+
+Provider data almost never changes after seeding, so the full directory is
+loaded once and provider lookups are served from memory. Writers bump the
+version with invalidate(); the next request reloads the directory through
+its session. IDs missing from the directory fall back to a database lookup,
+so a provider added without a version bump is still found, and joins the
+directory (changing its ETag).
+
+invalidate_providers() also tells the other workers through the shared
+cache file. Without SHARED_CACHE_PATH it only reaches its own process, so a
+server started separately (e.g. before running __init__db.py) keeps its
+directory until it restarts; providers it has not seen are still found
+through the fallback lookup.
+"""
+import hashlib
+import json
+import threading
+from datetime import datetime, timezone
+from typing import Any, Dict, Optional
+
+import shared_cache
+from data_access import find_providers, get_provider_by_id, get_providers
+
+
+class ProviderRegistry:
+    """Snapshot of the providers table with a version for change detection"""
+
+    def __init__(self):
+        self._providers: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+        self.version = 0
+        self.loaded_version = -1
+        self.loads = 0
+        self.fallback_lookups = 0
+        self.last_modified: Optional[datetime] = None
+        self.etag = ""
+
+    @property
+    def stale(self) -> bool:
+        return self.loaded_version != self.version
+
+    def load(self, providers: list[Dict[str, Any]], version: Optional[int] = None) -> None:
+        """Replace the snapshot; version defaults to the current version"""
+        with self._lock:
+            self._providers = {p["id"]: p for p in providers}
+            self.loaded_version = self.version if version is None else version
+            self.loads += 1
+            self._update_validators()
+
+    def _update_validators(self) -> None:
+        """Recompute the ETag from the directory; bump Last-Modified if it changed"""
+        body = json.dumps(sorted(self._providers.values(), key=lambda p: p["id"]),
+                          sort_keys=True, separators=(",", ":"))
+        etag = f'W/"providers-{hashlib.blake2b(body.encode(), digest_size=10).hexdigest()}"'
+        if self.etag != etag:
+            self.etag = etag
+            self.last_modified = datetime.now(timezone.utc).replace(microsecond=0)
+
+    def invalidate(self) -> None:
+        """Bump the version so the next request reloads the directory"""
+        with self._lock:
+            self.version += 1
+
+    def get(self, provider_id: str) -> Optional[Dict[str, Any]]:
+        return self._providers.get(provider_id)
+
+    def add(self, provider: Dict[str, Any]) -> None:
+        with self._lock:
+            self._providers = {**self._providers, provider["id"]: provider}
+            self._update_validators()
+
+    def all(self) -> list[Dict[str, Any]]:
+        return list(self._providers.values())
+
+    def find(self, provider_ids: Optional[list[str]] = None, specialty: Optional[str] = None) -> list[Dict[str, Any]]:
+        """Providers matching a list of IDs and/or a specialty, ordered by ID"""
+        providers = self._providers
+        if provider_ids is not None:
+            matches = [providers[i] for i in set(provider_ids) if i in providers]
+        else:
+            matches = list(providers.values())
+        if specialty is not None:
+            matches = [p for p in matches if p["specialty"] == specialty]
+        return sorted(matches, key=lambda p: p["id"])
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "size": len(self._providers),
+            "version": self.version,
+            "loaded_version": self.loaded_version,
+            "loads": self.loads,
+            "fallback_lookups": self.fallback_lookups,
+            "last_modified": self.last_modified.isoformat() if self.last_modified else None
+        }
+
+
+provider_registry = ProviderRegistry()
+
+
+def invalidate_providers() -> None:
+    """Make this and every other worker reload the provider directory"""
+    provider_registry.invalidate()
+    shared_cache.publish(shared_cache.PROVIDERS_CHANGED)
+
+
+def _on_shared_event(kind: str, provider_id: Optional[str], day) -> None:
+    if kind == shared_cache.PROVIDERS_CHANGED:
+        provider_registry.invalidate()
+
+
+shared_cache.subscribe(_on_shared_event)
+
+
+async def ensure_loaded(db) -> ProviderRegistry:
+    """Reload the directory through db if its version was bumped"""
+    await shared_cache.poll()
+    if provider_registry.stale:
+        version = provider_registry.version
+        provider_registry.load(await get_providers(db), version)
+    return provider_registry
+
+
+async def lookup_provider(db, provider_id: str) -> Optional[Dict[str, Any]]:
+    """Get a provider from the directory, falling back to the database"""
+    registry = await ensure_loaded(db)
+    provider = registry.get(provider_id)
+    if provider is None:
+        registry.fallback_lookups += 1
+        provider = await get_provider_by_id(db, provider_id)
+        if provider is not None:
+            registry.add(provider)
+    return provider
+
+
+async def search_providers(db, provider_ids: Optional[list[str]] = None, specialty: Optional[str] = None) -> list[Dict[str, Any]]:
+    """Find providers by IDs and/or specialty, falling back to the database for unknown IDs"""
+    registry = await ensure_loaded(db)
+    providers = registry.find(provider_ids, specialty)
+    if provider_ids is not None:
+        known = {p["id"] for p in registry.find(provider_ids)}
+        unknown = sorted(set(provider_ids) - known)
+        if unknown:
+            registry.fallback_lookups += 1
+            for provider in await find_providers(db, unknown):
+                registry.add(provider)
+            providers = registry.find(provider_ids, specialty)
+    return providers
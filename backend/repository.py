@@ -1,230 +1,476 @@
 from typing import Optional, Dict, Any
-from datetime import datetime
+import base64
+import binascii
+import json
+from datetime import date, datetime
+from sqlalchemy import delete, insert, select, tuple_, update
 from sqlalchemy.orm import Session
-from database import SessionLocal
-from db_models import ProviderDB, AppointmentDB
+from database import dialect_insert
+from db_models import ProviderDB, AppointmentDB, SlotDB, IdBlockDB, IdempotencyKeyDB
 from config import settings
-import pytz
-from utils import format_iso8601
+from slots import booked_bitmaps
+from utils import UTC, format_utc, localize, to_utc
 
-TZ = pytz.timezone(settings.TIMEZONE)
+# States of a row in the materialized slots table
+SLOT_OPEN = "open"
+SLOT_BOOKED = "booked"
 
 
-def get_db_session() -> Session:
-    """Get database session"""
-    return SessionLocal()
+def provider_to_dict(provider: ProviderDB) -> Dict[str, Any]:
+    """Map a provider row to the API representation"""
+    return {
+        "id": provider.id,
+        "name": provider.name,
+        "specialty": provider.specialty,
+        "bio": provider.bio
+    }
 
 
-def get_providers() -> list[Dict[str, Any]]:
+def parse_utc(value: str) -> datetime:
     """
-    Get all providers from the database.
+    Parse an ISO8601 string as naive UTC (the storage format).
+    Handles both "Z" suffix and "+00:00" format.
+    """
+    parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    if parsed.tzinfo is None:
+        return parsed
+    return parsed.astimezone(UTC).replace(tzinfo=None)
+
+
+def local_range_to_utc(start_date: str, end_date: str) -> tuple[datetime, datetime]:
+    """
+    Convert a local YYYY-MM-DD date range (end date inclusive) to naive UTC
+    bounds for comparison against stored datetimes.
+    """
+    start = localize(datetime.strptime(start_date, "%Y-%m-%d"))
+    end = localize(datetime.strptime(end_date, "%Y-%m-%d")
+                   ).replace(hour=23, minute=59, second=59)
+    # SQLAlchemy with SQLite returns naive datetimes, so we compare naive UTC
+    return (
+        to_utc(start).replace(tzinfo=None),
+        to_utc(end).replace(tzinfo=None)
+    )
+
+
+def appointment_values(appointment_data: Dict[str, Any]) -> Dict[str, Any]:
+    """Column values for an appointment row, with datetimes as naive UTC"""
+    return {
+        "id": appointment_data["id"],
+        "reference_number": appointment_data["reference_number"],
+        "slot_id": appointment_data["slot_id"],
+        "provider_id": appointment_data["provider_id"],
+        "patient_first_name": appointment_data["patient_first_name"],
+        "patient_last_name": appointment_data["patient_last_name"],
+        "patient_email": appointment_data["patient_email"],
+        "patient_phone": appointment_data["patient_phone"],
+        "reason": appointment_data["reason"],
+        # Store as naive UTC (SQLite compatibility)
+        "start_time": parse_utc(appointment_data["start_time"]),
+        "end_time": parse_utc(appointment_data["end_time"]),
+        "status": appointment_data["status"],
+        "created_at": parse_utc(appointment_data["created_at"])
+    }
+
+
+def appointment_to_dict(appointment: AppointmentDB) -> Dict[str, Any]:
+    """
+    Map a stored appointment to the format expected by the API, converting
+    from naive UTC (stored) to local timezone for display.
+    """
+    return {
+        "id": appointment.id,
+        "reference_number": appointment.reference_number,
+        "slot_id": appointment.slot_id,
+        "provider_id": appointment.provider_id,
+        "patient_first_name": appointment.patient_first_name,
+        "patient_last_name": appointment.patient_last_name,
+        "patient_email": appointment.patient_email,
+        "patient_phone": appointment.patient_phone,
+        "reason": appointment.reason,
+        # Return as ISO8601 with timezone offset
+        "start_time": format_utc(appointment.start_time),
+        "end_time": format_utc(appointment.end_time),
+        "status": appointment.status,
+        "created_at": format_utc(appointment.created_at)
+    }
+
+
+def provider_appointment_to_dict(appointment) -> Dict[str, Any]:
+    """
+    Map a stored appointment (an AppointmentDB or a row selected with
+    PROVIDER_APPOINTMENT_COLUMNS) to a provider schedule entry.
     """
-    db = get_db_session()
+    return {
+        "id": appointment.id,
+        "patient_name": f"{appointment.patient_first_name} {appointment.patient_last_name}",
+        "patient_email": appointment.patient_email,
+        # Convert from naive UTC (stored) to local timezone for display
+        "start_time": format_utc(appointment.start_time),
+        "end_time": format_utc(appointment.end_time),
+        "reason": appointment.reason,
+        "status": appointment.status
+    }
+
+
+# Statements shared by the sync and async repositories
+
+def providers_query():
+    return select(ProviderDB)
+
+
+def provider_query(provider_id: str):
+    return select(ProviderDB).where(ProviderDB.id == provider_id).limit(1)
+
+
+def insert_appointment_query(values: Dict[str, Any]):
+    """
+    Single-statement booking insert.
+
+    The uq_provider_start_time constraint decides who gets a slot: a
+    conflicting insert does nothing instead of raising, so a rowcount of 0
+    means the slot is already taken.
+    """
+    return dialect_insert(AppointmentDB).values(**values).on_conflict_do_nothing(
+        index_elements=[AppointmentDB.provider_id, AppointmentDB.start_time])
+
+
+def mark_slot_booked_query(provider_id: str, start_time: datetime):
+    """Record a booking in the materialized slots table"""
+    return dialect_insert(SlotDB).values(
+        provider_id=provider_id, start_time=start_time, state=SLOT_BOOKED
+    ).on_conflict_do_update(
+        index_elements=[SlotDB.provider_id, SlotDB.start_time],
+        set_={"state": SLOT_BOOKED})
+
+
+def mark_slots_booked_query():
+    """mark_slot_booked_query for executemany, with per-row parameters"""
+    return dialect_insert(SlotDB).on_conflict_do_update(
+        index_elements=[SlotDB.provider_id, SlotDB.start_time],
+        set_={"state": SLOT_BOOKED})
+
+
+def booked_start_times_query(provider_id: str, start_date: str, end_date: str, from_slots: bool = False):
+    start_utc, end_utc = local_range_to_utc(start_date, end_date)
+    if from_slots:
+        return select(SlotDB.start_time).where(
+            SlotDB.provider_id == provider_id,
+            SlotDB.start_time >= start_utc,
+            SlotDB.start_time <= end_utc,
+            SlotDB.state == SLOT_BOOKED
+        )
+    return select(AppointmentDB.start_time).where(
+        AppointmentDB.provider_id == provider_id,
+        AppointmentDB.start_time >= start_utc,
+        AppointmentDB.start_time <= end_utc,
+        AppointmentDB.status == "confirmed"
+    )
+
+
+def booked_start_times_by_provider_query(provider_ids: list[str], start_date: str, end_date: str, from_slots: bool = False):
+    start_utc, end_utc = local_range_to_utc(start_date, end_date)
+    if from_slots:
+        return select(SlotDB.provider_id, SlotDB.start_time).where(
+            SlotDB.provider_id.in_(provider_ids),
+            SlotDB.start_time >= start_utc,
+            SlotDB.start_time <= end_utc,
+            SlotDB.state == SLOT_BOOKED
+        )
+    return select(AppointmentDB.provider_id, AppointmentDB.start_time).where(
+        AppointmentDB.provider_id.in_(provider_ids),
+        AppointmentDB.start_time >= start_utc,
+        AppointmentDB.start_time <= end_utc,
+        AppointmentDB.status == "confirmed"
+    )
+
+
+def open_slots_query(provider_ids: list[str], after_utc: datetime, before_utc: datetime, limit: int):
+    """Earliest open slots of the providers in the materialized slots table"""
+    return select(SlotDB.provider_id, SlotDB.start_time).where(
+        SlotDB.provider_id.in_(provider_ids),
+        SlotDB.state == SLOT_OPEN,
+        SlotDB.start_time > after_utc,
+        SlotDB.start_time <= before_utc
+    ).order_by(SlotDB.start_time, SlotDB.provider_id).limit(limit)
+
+
+def idempotency_record_query(key: str, now: datetime):
+    return select(
+        IdempotencyKeyDB.fingerprint,
+        IdempotencyKeyDB.status_code,
+        IdempotencyKeyDB.response,
+        IdempotencyKeyDB.expires_at
+    ).where(IdempotencyKeyDB.key == key, IdempotencyKeyDB.expires_at > now)
+
+
+def save_idempotency_record_query(values: Dict[str, Any], now: datetime):
+    """
+    Store a response under its key, taking over the key only if its previous
+    record has expired: a rowcount of 0 means a live record holds the key.
+    """
+    return dialect_insert(IdempotencyKeyDB).values(**values).on_conflict_do_update(
+        index_elements=[IdempotencyKeyDB.key],
+        set_={name: values[name] for name in ("fingerprint", "status_code", "response", "expires_at")},
+        where=IdempotencyKeyDB.expires_at <= now)
+
+
+def purge_idempotency_records_query(now: datetime):
+    return delete(IdempotencyKeyDB).where(IdempotencyKeyDB.expires_at <= now)
+
+
+def idempotency_record_to_dict(row) -> Dict[str, Any]:
+    return {
+        "fingerprint": row.fingerprint,
+        "status_code": row.status_code,
+        "response": row.response,
+        "expires_at": row.expires_at
+    }
+
+
+def group_booked_bitmaps(rows) -> Dict[str, Dict[date, int]]:
+    """Fold (provider_id, start_time) rows into booked-slot bitmaps per provider"""
+    start_times: Dict[str, list[datetime]] = {}
+    for provider_id, start_time in rows:
+        start_times.setdefault(provider_id, []).append(start_time)
+    return {
+        provider_id: booked_bitmaps(times)
+        for provider_id, times in start_times.items()
+    }
+
+
+def providers_filter_query(provider_ids: Optional[list[str]] = None, specialty: Optional[str] = None):
+    query = select(ProviderDB)
+    if provider_ids is not None:
+        query = query.where(ProviderDB.id.in_(provider_ids))
+    if specialty is not None:
+        query = query.where(ProviderDB.specialty == specialty)
+    return query.order_by(ProviderDB.id)
+
+
+# Columns a provider schedule entry is built from
+PROVIDER_APPOINTMENT_COLUMNS = (
+    AppointmentDB.id,
+    AppointmentDB.patient_first_name,
+    AppointmentDB.patient_last_name,
+    AppointmentDB.patient_email,
+    AppointmentDB.start_time,
+    AppointmentDB.end_time,
+    AppointmentDB.reason,
+    AppointmentDB.status
+)
+
+
+def provider_appointments_query(provider_id: str, start_date: str, end_date: str,
+                                after: Optional[tuple[datetime, str]] = None,
+                                limit: Optional[int] = None):
+    """
+    Provider schedule in (start_time, id) order, projected to the returned
+    columns. after is the (start_time, id) keyset of the previous page's last
+    row; the uq_provider_start_time index serves both filter and order.
+    """
+    start_utc, end_utc = local_range_to_utc(start_date, end_date)
+    query = select(*PROVIDER_APPOINTMENT_COLUMNS).where(
+        AppointmentDB.provider_id == provider_id,
+        AppointmentDB.start_time >= start_utc,
+        AppointmentDB.start_time <= end_utc
+    ).order_by(AppointmentDB.start_time, AppointmentDB.id)
+    if after is not None:
+        query = query.where(
+            tuple_(AppointmentDB.start_time, AppointmentDB.id) > tuple_(*after))
+    if limit is not None:
+        query = query.limit(limit)
+    return query
+
+
+def encode_cursor(start_time: datetime, appointment_id: str) -> str:
+    """Opaque page cursor for a (start_time, id) keyset"""
+    raw = json.dumps([start_time.isoformat(), appointment_id])
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, str]:
+    """Decode a page cursor; raises ValueError if it is malformed"""
     try:
-        providers = db.query(ProviderDB).all()
-        return [
-            {
-                "id": p.id,
-                "name": p.name,
-                "specialty": p.specialty,
-                "bio": p.bio
-            }
-            for p in providers
-        ]
-    finally:
-        db.close()
-
-
-def get_provider_by_id(provider_id: str) -> Optional[Dict[str, Any]]:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        start_time, appointment_id = json.loads(raw)
+        return datetime.fromisoformat(start_time), str(appointment_id)
+    except (TypeError, ValueError, binascii.Error) as e:
+        raise ValueError(f"Invalid cursor: {cursor}") from e
+
+
+def page_of_appointments(rows, limit: int) -> tuple[list[Dict[str, Any]], Optional[str]]:
+    """Build a page from limit + 1 fetched rows and the cursor for the next one"""
+    rows = list(rows)
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1].start_time, rows[-1].id)
+    return [provider_appointment_to_dict(row) for row in rows], next_cursor
+
+
+def get_providers(db: Session) -> list[Dict[str, Any]]:
+    """
+    Get all providers from the database.
+    """
+    providers = db.scalars(providers_query()).all()
+    return [provider_to_dict(p) for p in providers]
+
+
+def find_providers(db: Session, provider_ids: Optional[list[str]] = None, specialty: Optional[str] = None) -> list[Dict[str, Any]]:
+    """
+    Get the providers matching a list of IDs and/or a specialty.
+    """
+    providers = db.scalars(providers_filter_query(provider_ids, specialty)).all()
+    return [provider_to_dict(p) for p in providers]
+
+
+def get_provider_by_id(db: Session, provider_id: str) -> Optional[Dict[str, Any]]:
     """
     Get a single provider by ID.
     """
-    db = get_db_session()
-    try:
-        provider = db.query(ProviderDB).filter(
-            ProviderDB.id == provider_id).first()
-        if provider:
-            return {
-                "id": provider.id,
-                "name": provider.name,
-                "specialty": provider.specialty,
-                "bio": provider.bio
-            }
+    provider = db.scalars(provider_query(provider_id)).first()
+    return provider_to_dict(provider) if provider else None
+
+
+def create_appointment(db: Session, appointment_data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """
+    Insert a new appointment in the session's transaction.
+    Stores datetimes in UTC, returns in local timezone for API response,
+    or None if the provider already has an appointment at that time.
+    The caller commits the unit of work.
+    """
+    values = appointment_values(appointment_data)
+    result = db.execute(insert_appointment_query(values))
+    if result.rowcount == 0:
         return None
-    finally:
-        db.close()
+    if settings.SLOT_TABLE_ENABLED:
+        db.execute(mark_slot_booked_query(values["provider_id"], values["start_time"]))
+    return appointment_to_dict(AppointmentDB(**values))
 
 
-def check_slot_availability(slot_id: str, provider_id: str) -> bool:
+def insert_appointments(db: Session, rows: list[Dict[str, Any]]) -> None:
     """
-    Check if a time slot is available for booking.
+    Insert many appointment rows (appointment_values() dicts) with one
+    executemany in the session's transaction. Unlike create_appointment a
+    taken slot raises IntegrityError, so callers check for conflicts first.
+    The caller commits the unit of work.
     """
-    db = get_db_session()
-    try:
-        existing = db.query(AppointmentDB).filter(
-            AppointmentDB.slot_id == slot_id,
-            AppointmentDB.provider_id == provider_id,
-            AppointmentDB.status == "confirmed"
-        ).first()
-        return existing is None
-    finally:
-        db.close()
+    db.execute(insert(AppointmentDB), rows)
+    # Cancelled rows leave their slot open, as in the availability queries
+    booked = [
+        {"provider_id": row["provider_id"], "start_time": row["start_time"], "state": SLOT_BOOKED}
+        for row in rows if row["status"] == "confirmed"
+    ]
+    if settings.SLOT_TABLE_ENABLED and booked:
+        db.execute(mark_slots_booked_query(), booked)
 
 
-def create_appointment(appointment_data: Dict[str, Any]) -> Dict[str, Any]:
+def get_appointment_start_times(db: Session, provider_id: str) -> set[datetime]:
+    """Every booked start time (naive UTC) of a provider"""
+    return set(db.scalars(
+        select(AppointmentDB.start_time).where(AppointmentDB.provider_id == provider_id)))
+
+
+def find_reference_numbers(db: Session, reference_numbers: list[str]) -> set[str]:
+    """Which of these reference numbers are already taken"""
+    if not reference_numbers:
+        return set()
+    return set(db.scalars(select(AppointmentDB.reference_number).where(
+        AppointmentDB.reference_number.in_(reference_numbers))))
+
+
+def reserve_id_block(db: Session, name: str, size: int, start: int = 1) -> int:
     """
-    Create a new appointment in the database.
-    Stores datetimes in UTC, returns in local timezone for API response.
+    Reserve size consecutive values of a named sequence and return the first.
+    The UPDATE locks the row until the caller commits, so concurrent
+    reservations never overlap.
     """
-    db = get_db_session()
-    try:
-        # Parse datetime strings - they come in as UTC ISO8601 strings
-        # Handle both "Z" suffix and "+00:00" format
-        start_time_str = appointment_data["start_time"].replace("Z", "+00:00")
-        end_time_str = appointment_data["end_time"].replace("Z", "+00:00")
-        created_at_str = appointment_data["created_at"].replace("Z", "+00:00")
-
-        # Parse as UTC datetimes
-        start_time = datetime.fromisoformat(start_time_str)
-        if start_time.tzinfo is None:
-            start_time = pytz.UTC.localize(start_time)
-        else:
-            start_time = start_time.astimezone(pytz.UTC)
-
-        end_time = datetime.fromisoformat(end_time_str)
-        if end_time.tzinfo is None:
-            end_time = pytz.UTC.localize(end_time)
-        else:
-            end_time = end_time.astimezone(pytz.UTC)
-
-        created_at = datetime.fromisoformat(created_at_str)
-        if created_at.tzinfo is None:
-            created_at = pytz.UTC.localize(created_at)
-        else:
-            created_at = created_at.astimezone(pytz.UTC)
-
-        appointment = AppointmentDB(
-            id=appointment_data["id"],
-            reference_number=appointment_data["reference_number"],
-            slot_id=appointment_data["slot_id"],
-            provider_id=appointment_data["provider_id"],
-            patient_first_name=appointment_data["patient_first_name"],
-            patient_last_name=appointment_data["patient_last_name"],
-            patient_email=appointment_data["patient_email"],
-            patient_phone=appointment_data["patient_phone"],
-            reason=appointment_data["reason"],
-            # Store as naive UTC (SQLite compatibility)
-            start_time=start_time.replace(tzinfo=None),
-            end_time=end_time.replace(tzinfo=None),
-            status=appointment_data["status"],
-            created_at=created_at.replace(tzinfo=None)
-        )
+    db.execute(dialect_insert(IdBlockDB).values(name=name, next_value=start)
+               .on_conflict_do_nothing(index_elements=[IdBlockDB.name]))
+    db.execute(update(IdBlockDB).where(IdBlockDB.name == name)
+               .values(next_value=IdBlockDB.next_value + size))
+    return db.scalar(select(IdBlockDB.next_value).where(IdBlockDB.name == name)) - size
 
-        db.add(appointment)
-        db.commit()
-        db.refresh(appointment)
 
-        # Return in the format expected by the API
-        # Convert from naive UTC (stored) to local timezone for display
-        start_time_utc = pytz.UTC.localize(appointment.start_time)
-        end_time_utc = pytz.UTC.localize(appointment.end_time)
-        created_at_utc = pytz.UTC.localize(appointment.created_at)
-
-        start_time_local = start_time_utc.astimezone(TZ)
-        end_time_local = end_time_utc.astimezone(TZ)
-        created_at_local = created_at_utc.astimezone(TZ)
-
-        return {
-            "id": appointment.id,
-            "reference_number": appointment.reference_number,
-            "slot_id": appointment.slot_id,
-            "provider_id": appointment.provider_id,
-            "patient_first_name": appointment.patient_first_name,
-            "patient_last_name": appointment.patient_last_name,
-            "patient_email": appointment.patient_email,
-            "patient_phone": appointment.patient_phone,
-            "reason": appointment.reason,
-            # Return as ISO8601 with timezone offset
-            "start_time": format_iso8601(start_time_local),
-            "end_time": format_iso8601(end_time_local),
-            "status": appointment.status,
-            "created_at": format_iso8601(created_at_local)
-        }
-    except Exception as e:
-        db.rollback()
-        raise e
-    finally:
-        db.close()
-
-
-def get_booked_slots(provider_id: str, start_date: str, end_date: str) -> set[str]:
-    """
-    Get all booked slot IDs for a provider within a date range.
-    """
-    db = get_db_session()
-    try:
-        # Parse dates in local timezone
-        start = TZ.localize(datetime.strptime(start_date, "%Y-%m-%d"))
-        end = TZ.localize(datetime.strptime(end_date, "%Y-%m-%d")
-                          ).replace(hour=23, minute=59, second=59)
+def get_idempotency_record(db: Session, key: str, now: datetime) -> Optional[Dict[str, Any]]:
+    """
+    Get the unexpired stored response for an idempotency key.
+    """
+    row = db.execute(idempotency_record_query(key, now)).first()
+    return idempotency_record_to_dict(row) if row else None
+
 
-        # Convert to UTC for database query (database stores in UTC)
-        start_utc = start.astimezone(pytz.UTC)
-        end_utc = end.astimezone(pytz.UTC)
-        # Convert to naive UTC for SQLite comparison (SQLite doesn't handle timezone-aware datetimes well)
-        # SQLAlchemy with SQLite will return naive datetimes, so we compare naive UTC
-        start_utc_naive = start_utc.replace(tzinfo=None)
-        end_utc_naive = end_utc.replace(tzinfo=None)
+def save_idempotency_record(db: Session, values: Dict[str, Any], now: datetime, purge: bool = False) -> bool:
+    """
+    Store a response for an idempotency key in the session's transaction.
+    Returns False if another unexpired record holds the key. With purge,
+    expired records are deleted first.
+    """
+    if purge:
+        db.execute(purge_idempotency_records_query(now))
+    return db.execute(save_idempotency_record_query(values, now)).rowcount == 1
 
-        appointments = db.query(AppointmentDB).filter(
-            AppointmentDB.provider_id == provider_id,
-            AppointmentDB.start_time >= start_utc_naive,
-            AppointmentDB.start_time <= end_utc_naive,
-            AppointmentDB.status == "confirmed"
-        ).all()
 
-        return {apt.slot_id for apt in appointments}
-    finally:
-        db.close()
+def commit(db: Session) -> None:
+    """
+    Commit the session's unit of work.
+    """
+    db.commit()
 
 
-def get_provider_appointments(provider_id: str, start_date: str, end_date: str) -> list[Dict[str, Any]]:
+def rollback(db: Session) -> None:
     """
-    Get all appointments for a provider within a date range.
+    Discard the session's unit of work.
     """
-    db = get_db_session()
-    try:
-        # Parse dates in local timezone
-        start = TZ.localize(datetime.strptime(start_date, "%Y-%m-%d"))
-        end = TZ.localize(datetime.strptime(end_date, "%Y-%m-%d")
-                          ).replace(hour=23, minute=59, second=59)
-
-        # Convert to UTC for database query
-        start_utc = start.astimezone(pytz.UTC)
-        end_utc = end.astimezone(pytz.UTC)
-
-        # Convert to naive UTC for SQLite comparison
-        start_utc_naive = start_utc.replace(tzinfo=None)
-        end_utc_naive = end_utc.replace(tzinfo=None)
-
-        appointments = db.query(AppointmentDB).filter(
-            AppointmentDB.provider_id == provider_id,
-            AppointmentDB.start_time >= start_utc_naive,
-            AppointmentDB.start_time <= end_utc_naive
-        ).all()
-
-        return [
-            {
-                "id": apt.id,
-                "patient_name": f"{apt.patient_first_name} {apt.patient_last_name}",
-                "patient_email": apt.patient_email,
-                # Convert from naive UTC (stored) to local timezone for display
-                "start_time": format_iso8601(pytz.UTC.localize(apt.start_time).astimezone(TZ)),
-                "end_time": format_iso8601(pytz.UTC.localize(apt.end_time).astimezone(TZ)),
-                "reason": apt.reason,
-                "status": apt.status
-            }
-            for apt in appointments
-        ]
-    finally:
-        db.close()
+    db.rollback()
+
+
+def get_booked_bitmaps(db: Session, provider_id: str, start_date: str, end_date: str, from_slots: bool = False) -> Dict[date, int]:
+    """
+    Get a provider's booked-slot bitmaps per local day within a date range.
+    Only start_time is selected, from appointments or, with from_slots, from
+    the materialized slots table.
+    """
+    return booked_bitmaps(db.scalars(
+        booked_start_times_query(provider_id, start_date, end_date, from_slots)))
+
+
+def iter_provider_appointments(db: Session, provider_id: str, start_date: str, end_date: str, batch_size: int = 500):
+    """
+    Yield a provider's appointments within a date range in batches (lists),
+    fetching batch_size rows at a time so memory stays flat for long ranges.
+    """
+    query = provider_appointments_query(provider_id, start_date, end_date) \
+        .execution_options(yield_per=batch_size)
+    for rows in db.execute(query).partitions():
+        yield [provider_appointment_to_dict(apt) for apt in rows]
+
+
+def get_booked_bitmaps_by_provider(db: Session, provider_ids: list[str], start_date: str, end_date: str, from_slots: bool = False) -> Dict[str, Dict[date, int]]:
+    """
+    Get booked-slot bitmaps per provider and local day within a date range,
+    in one query.
+    """
+    return group_booked_bitmaps(db.execute(
+        booked_start_times_by_provider_query(provider_ids, start_date, end_date, from_slots)))
+
+
+def get_open_slot_starts(db: Session, provider_ids: list[str], after_utc: datetime, before_utc: datetime, limit: int) -> list[tuple[str, datetime]]:
+    """
+    Get the earliest open (provider_id, start_time) pairs from the slots
+    table, in start time order.
+    """
+    return [tuple(row) for row in db.execute(
+        open_slots_query(provider_ids, after_utc, before_utc, limit))]
+
+
+def get_provider_appointments(db: Session, provider_id: str, start_date: str, end_date: str,
+                              limit: int, cursor: Optional[str] = None) -> tuple[list[Dict[str, Any]], Optional[str]]:
+    """
+    Get one page of a provider's appointments within a date range.
+    Returns the page and the cursor of the next page (None on the last page).
+    """
+    after = decode_cursor(cursor) if cursor else None
+    rows = db.execute(provider_appointments_query(
+        provider_id, start_date, end_date, after=after, limit=limit + 1))
+    return page_of_appointments(rows, limit)
@@ -0,0 +1,36 @@
+"""
+JSON responses for hot endpoints.
+
+Handlers that build their payload from already-validated data (slot grids,
+stored rows) return a FastJSONResponse directly. Returning a Response skips
+FastAPI's response_model validation and jsonable_encoder pass; the declared
+response_model still documents the schema in OpenAPI.
+
+orjson is used when installed, with the stdlib encoder as a fallback.
+"""
+import json
+from typing import Any
+
+from fastapi.responses import JSONResponse
+
+from metrics import span
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional speedup
+    orjson = None
+
+
+def dumps(content: Any) -> bytes:
+    """Serialize plain dicts, lists, strings, numbers and booleans to JSON"""
+    if orjson is not None:
+        return orjson.dumps(content)
+    return json.dumps(content, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse rendered with orjson when available"""
+
+    def render(self, content: Any) -> bytes:
+        with span("serialize"):
+            return dumps(content)
@@ -1,5 +1,7 @@
 #!/bin/bash
 # Script to run the backend server
+#   ./run.sh         development server with auto-reload
+#   ./run.sh --prod  multi-worker server (see serve.py)
 
 # Activate virtual environment if it exists
 if [ -d "venv" ]; then
@@ -7,5 +9,10 @@ if [ -d "venv" ]; then
 fi
 
 # Run the server
-uvicorn main:app --reload --port 8000
-
+if [ "$1" = "--prod" ]; then
+    shift
+    python serve.py --port 8000 "$@"
+else
+    # Open change feed streams would otherwise hold up every reload
+    uvicorn main:app --reload --port 8000 --timeout-graceful-shutdown 1
+fi
@@ -0,0 +1,78 @@
+"""
+Production launcher: runs the API in several uvicorn worker processes.
+
+The worker count comes from WEB_CONCURRENCY (0 = one per CPU). Each worker
+has its own in-memory caches, so with more than one worker a shared cache
+file is set up (SHARED_CACHE_PATH, created next to the database when unset)
+to keep them coherent.
+
+The database is initialized and seeded once here before the workers start
+(skip with --no-migrate when __init__db.py ran as a separate step), and the
+workers start with DB_INIT_ON_STARTUP=false so they boot without touching
+the database.
+
+Usage: python serve.py [--host HOST] [--port PORT] [--workers N] [--no-migrate]
+"""
+import argparse
+import os
+
+import uvicorn
+
+# Change feed streams never finish on their own: on shutdown they are cut
+# after this long, and clients reconnect and resume from their Last-Event-ID
+GRACEFUL_SHUTDOWN_SECONDS = 5
+
+
+def worker_count(configured: int) -> int:
+    return configured if configured > 0 else (os.cpu_count() or 1)
+
+
+def default_shared_cache_path(database_url: str) -> str:
+    """A file next to a SQLite database, else in the working directory"""
+    directory = "."
+    if database_url.startswith("sqlite:///"):
+        db_path = database_url.replace("sqlite:///", "")
+        if db_path and db_path != ":memory:":
+            directory = os.path.dirname(db_path) or "."
+    return os.path.join(directory, "shared-cache.db")
+
+
+def main():
+    from config import settings
+
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--workers", type=int, default=settings.WEB_CONCURRENCY)
+    parser.add_argument("--no-migrate", action="store_true",
+                        help="skip table creation and seeding")
+    args = parser.parse_args()
+
+    workers = worker_count(args.workers)
+    if workers > 1 and not settings.SHARED_CACHE_PATH:
+        path = default_shared_cache_path(settings.DATABASE_URL)
+        # Start from an empty log and store on every launch
+        for suffix in ("", "-wal", "-shm"):
+            if os.path.exists(path + suffix):
+                os.remove(path + suffix)
+        # Inherited by the worker processes
+        os.environ["SHARED_CACHE_PATH"] = path
+
+    if not args.no_migrate:
+        from __init__db import init_db, seed_providers
+
+        init_db()
+        seed_providers()
+    # Workers boot without touching the database: spawned workers inherit
+    # the environment, a single in-process worker uses settings directly
+    os.environ["DB_INIT_ON_STARTUP"] = "false"
+    settings.DB_INIT_ON_STARTUP = False
+
+    print(f"Starting {workers} worker(s) on {args.host}:{args.port}")
+    uvicorn.run("main:app", host=args.host, port=args.port,
+                workers=workers, proxy_headers=True,
+                timeout_graceful_shutdown=GRACEFUL_SHUTDOWN_SECONDS)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,315 @@
+"""
+Cross-process cache coherence for multi-worker deployments.
+
+Each worker keeps its own in-memory provider directory and availability
+cache. When SHARED_CACHE_PATH is set, workers share a local SQLite file:
+
+- an invalidation log: a worker that changes a provider's bookings (or the
+  provider directory) appends an event, and every other worker applies it to
+  its local caches the next time it polls;
+- a second-level store of booked-slot bitmaps per (provider_id, date), so a
+  worker missing a day can take it from the store instead of the database;
+- the change feed's event log (see changefeed.py), which every worker with
+  subscribers tails so event IDs are the same on all of them.
+
+Polling is throttled to SHARED_CACHE_POLL_SECONDS and is a single indexed
+read when nothing changed. A bitmap is only stored if no invalidation of its
+day was logged after the seq taken (head()) before it was read from the
+database, so a worker that loaded a day just before another worker's
+booking cannot write the old bitmap back over the invalidation.
+
+The SharedCache methods block on SQLite, so the module-level functions that
+handlers await run them in the threadpool; publish() is the blocking form
+for scripts and worker threads. Without SHARED_CACHE_PATH every function
+here is a no-op.
+"""
+import os
+import sqlite3
+import threading
+import time
+from datetime import date
+from typing import Callable, Optional
+
+from fastapi.concurrency import run_in_threadpool
+
+from config import settings
+
+# Event kinds
+DAY_CHANGED = "day"
+PROVIDERS_CHANGED = "providers"
+
+# Log rows kept behind the newest event
+_LOG_RETENTION = 10000
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS invalidations (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    kind TEXT NOT NULL,
+    provider_id TEXT,
+    day TEXT,
+    origin INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS invalidations_day ON invalidations (provider_id, day, seq);
+CREATE TABLE IF NOT EXISTS day_bitmaps (
+    provider_id TEXT NOT NULL,
+    day TEXT NOT NULL,
+    bitmap INTEGER NOT NULL,
+    expires_at REAL NOT NULL,
+    PRIMARY KEY (provider_id, day)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS feed_events (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    provider_id TEXT NOT NULL,
+    name TEXT NOT NULL,
+    data BLOB NOT NULL
+);
+"""
+
+# Feed events returned per read
+FEED_BATCH = 1000
+
+Subscriber = Callable[[str, Optional[str], Optional[date]], None]
+
+
+class SharedCache:
+    """Invalidation log and bitmap store in a SQLite file shared by workers"""
+
+    def __init__(self, path: str, poll_interval: float, ttl: float):
+        self.path = path
+        self.poll_interval = poll_interval
+        self.ttl = ttl
+        self.origin = os.getpid()
+        self._lock = threading.Lock()
+        self._subscribers: list[Subscriber] = []
+        self._next_poll = 0.0
+        self.published = 0
+        self.received = 0
+        self.store_hits = 0
+        self.store_misses = 0
+        self.stale_writes = 0
+
+        self._conn = sqlite3.connect(
+            path, timeout=5.0, isolation_level=None, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+        # Feed event IDs continue from when the log was created, in
+        # microseconds, so a cursor from an earlier log (before serve.py
+        # recreated the file) is older than anything in this one
+        self._conn.execute(
+            "INSERT INTO sqlite_sequence (name, seq) SELECT 'feed_events', ? "
+            "WHERE NOT EXISTS (SELECT 1 FROM sqlite_sequence WHERE name = 'feed_events')",
+            (time.time_ns() // 1000,))
+        # Only events published after this worker started are relevant
+        self.last_seq = self._conn.execute(
+            "SELECT COALESCE(MAX(seq), 0) FROM invalidations").fetchone()[0]
+
+    def subscribe(self, callback: Subscriber) -> None:
+        """Call callback(kind, provider_id, day) for events from other workers"""
+        self._subscribers.append(callback)
+
+    def publish(self, kind: str, provider_id: Optional[str] = None, day: Optional[date] = None) -> None:
+        day_key = day.isoformat() if day is not None else None
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                if kind == DAY_CHANGED:
+                    self._conn.execute(
+                        "DELETE FROM day_bitmaps WHERE provider_id = ? AND day = ?",
+                        (provider_id, day_key))
+                cursor = self._conn.execute(
+                    "INSERT INTO invalidations (kind, provider_id, day, origin) "
+                    "VALUES (?, ?, ?, ?)",
+                    (kind, provider_id, day_key, self.origin))
+                if cursor.lastrowid % 1000 == 0:
+                    self._conn.execute(
+                        "DELETE FROM invalidations WHERE seq <= ?",
+                        (cursor.lastrowid - _LOG_RETENTION,))
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+            self.published += 1
+
+    def poll_due(self) -> bool:
+        return time.monotonic() >= self._next_poll
+
+    def head(self) -> int:
+        """Seq of the newest invalidation"""
+        with self._lock:
+            return self._conn.execute(
+                "SELECT COALESCE(MAX(seq), 0) FROM invalidations").fetchone()[0]
+
+    def poll(self, force: bool = False) -> int:
+        """Apply events from other workers; returns how many were applied"""
+        now = time.monotonic()
+        if not force and now < self._next_poll:
+            return 0
+        with self._lock:
+            self._next_poll = now + self.poll_interval
+            rows = self._conn.execute(
+                "SELECT seq, kind, provider_id, day, origin FROM invalidations "
+                "WHERE seq > ? ORDER BY seq", (self.last_seq,)).fetchall()
+            if rows:
+                self.last_seq = rows[-1][0]
+        applied = 0
+        for _, kind, provider_id, day_key, origin in rows:
+            if origin == self.origin:
+                continue
+            day = date.fromisoformat(day_key) if day_key else None
+            for callback in self._subscribers:
+                callback(kind, provider_id, day)
+            applied += 1
+        self.received += applied
+        return applied
+
+    def get_bitmaps(self, provider_id: str, days: list[date]) -> dict[date, int]:
+        """Stored bitmaps for the given days of a provider"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT day, bitmap FROM day_bitmaps "
+                "WHERE provider_id = ? AND day BETWEEN ? AND ? AND expires_at > ?",
+                (provider_id, days[0].isoformat(), days[-1].isoformat(), time.time())
+            ).fetchall()
+        wanted = set(days)
+        found = {}
+        for day_key, bitmap in rows:
+            day = date.fromisoformat(day_key)
+            if day in wanted:
+                found[day] = bitmap
+        self.store_hits += len(found)
+        self.store_misses += len(wanted) - len(found)
+        return found
+
+    def put_bitmaps(self, entries: dict[tuple[str, date], int], after_seq: int) -> None:
+        """
+        Store bitmaps read from the database after invalidation after_seq,
+        skipping days invalidated since
+        """
+        expires_at = time.time() + self.ttl
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                oldest = self._conn.execute("SELECT MIN(seq) FROM invalidations").fetchone()[0]
+                if oldest is not None and after_seq < oldest - 1:
+                    # The log no longer reaches back to after_seq
+                    self._conn.execute("ROLLBACK")
+                    self.stale_writes += len(entries)
+                    return
+                cursor = self._conn.executemany(
+                    "INSERT OR REPLACE INTO day_bitmaps (provider_id, day, bitmap, expires_at) "
+                    "SELECT ?1, ?2, ?3, ?4 WHERE NOT EXISTS ("
+                    "SELECT 1 FROM invalidations "
+                    "WHERE provider_id = ?1 AND day = ?2 AND seq > ?5 AND kind = ?6)",
+                    [(provider_id, day.isoformat(), bitmap, expires_at, after_seq, DAY_CHANGED)
+                     for (provider_id, day), bitmap in entries.items()])
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+            self.stale_writes += len(entries) - cursor.rowcount
+
+    def append_events(self, provider_id: str, events: list[tuple[str, bytes]]) -> None:
+        """Append change feed events (name, JSON data) for a provider"""
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                cursor = self._conn.executemany(
+                    "INSERT INTO feed_events (provider_id, name, data) VALUES (?, ?, ?)",
+                    [(provider_id, name, data) for name, data in events])
+                last_seq = self._conn.execute(
+                    "SELECT seq FROM sqlite_sequence WHERE name = 'feed_events'"
+                ).fetchone()[0]
+                if last_seq // 1000 != (last_seq - cursor.rowcount) // 1000:
+                    self._conn.execute(
+                        "DELETE FROM feed_events WHERE seq <= ?",
+                        (last_seq - settings.FEED_RETENTION,))
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def events_after(self, seq: int, provider_id: Optional[str] = None) -> list[tuple[int, str, str, bytes]]:
+        """Feed events (seq, provider_id, name, data) after seq, oldest first"""
+        query = "SELECT seq, provider_id, name, data FROM feed_events WHERE seq > ?"
+        params: tuple = (seq,)
+        if provider_id is not None:
+            query += " AND provider_id = ?"
+            params += (provider_id,)
+        with self._lock:
+            return self._conn.execute(
+                query + " ORDER BY seq LIMIT ?", params + (FEED_BATCH,)).fetchall()
+
+    def event_bounds(self) -> tuple[int, int]:
+        """
+        (oldest retained, newest) feed event seq. Before the first event,
+        oldest is 0 and newest the seq the log started from.
+        """
+        with self._lock:
+            oldest = self._conn.execute("SELECT MIN(seq) FROM feed_events").fetchone()[0]
+            newest = self._conn.execute(
+                "SELECT seq FROM sqlite_sequence WHERE name = 'feed_events'").fetchone()[0]
+        return oldest or 0, newest
+
+    def stats(self) -> dict:
+        return {
+            "path": self.path,
+            "origin": self.origin,
+            "last_seq": self.last_seq,
+            "published": self.published,
+            "received": self.received,
+            "store_hits": self.store_hits,
+            "store_misses": self.store_misses,
+            "stale_writes": self.stale_writes
+        }
+
+
+shared_cache: Optional[SharedCache] = None
+if settings.SHARED_CACHE_PATH:
+    shared_cache = SharedCache(
+        settings.SHARED_CACHE_PATH,
+        poll_interval=settings.SHARED_CACHE_POLL_SECONDS,
+        ttl=settings.AVAILABILITY_CACHE_TTL
+    )
+
+
+def subscribe(callback: Subscriber) -> None:
+    if shared_cache is not None:
+        shared_cache.subscribe(callback)
+
+
+def publish(kind: str, provider_id: Optional[str] = None, day: Optional[date] = None) -> None:
+    """Blocking publish, for scripts and worker threads"""
+    if shared_cache is not None:
+        shared_cache.publish(kind, provider_id, day)
+
+
+async def publish_async(kind: str, provider_id: Optional[str] = None, day: Optional[date] = None) -> None:
+    if shared_cache is not None:
+        await run_in_threadpool(shared_cache.publish, kind, provider_id, day)
+
+
+async def poll() -> None:
+    if shared_cache is not None and shared_cache.poll_due():
+        await run_in_threadpool(shared_cache.poll)
+
+
+async def head() -> int:
+    if shared_cache is None:
+        return 0
+    return await run_in_threadpool(shared_cache.head)
+
+
+async def get_bitmaps(provider_id: str, days: list[date]) -> dict[date, int]:
+    if shared_cache is None or not days:
+        return {}
+    return await run_in_threadpool(shared_cache.get_bitmaps, provider_id, days)
+
+
+async def put_bitmaps(entries: dict[tuple[str, date], int], after_seq: int) -> None:
+    if shared_cache is not None and entries:
+        await run_in_threadpool(shared_cache.put_bitmaps, entries, after_seq)
+
+
+def stats() -> Optional[dict]:
+    return shared_cache.stats() if shared_cache is not None else None
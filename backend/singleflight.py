@@ -0,0 +1,63 @@
+"""
+Single-flight coalescing of identical concurrent work.
+
+The first caller for a key (the leader) runs the computation; callers that
+arrive with the same key while it is in flight await the leader's result
+instead of repeating it. The result is shared as is, so it must not be
+mutated by the callers.
+"""
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Hashable
+
+
+class SingleFlight:
+    """Deduplicates concurrent calls per key within one event loop"""
+
+    def __init__(self):
+        self._flights: Dict[Hashable, asyncio.Future] = {}
+        self.leaders = 0
+        self.deduplicated = 0
+        self.fallbacks = 0
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        flight = self._flights.get(key)
+        if flight is not None:
+            self.deduplicated += 1
+            try:
+                # Shielded so a cancelled follower does not cancel the flight
+                return await asyncio.shield(flight)
+            except asyncio.CancelledError:
+                if not flight.cancelled():
+                    raise
+                # The leader's request was cancelled; compute independently
+                self.fallbacks += 1
+                return await fn()
+
+        flight = asyncio.get_running_loop().create_future()
+        self._flights[key] = flight
+        self.leaders += 1
+        try:
+            result = await fn()
+        except asyncio.CancelledError:
+            flight.cancel()
+            raise
+        except BaseException as e:
+            flight.set_exception(e)
+            # Mark retrieved so an unawaited failure is not logged
+            flight.exception()
+            raise
+        else:
+            flight.set_result(result)
+            return result
+        finally:
+            del self._flights[key]
+
+    def stats(self) -> Dict[str, int]:
+        requests = self.leaders + self.deduplicated
+        return {
+            "in_flight": len(self._flights),
+            "leaders": self.leaders,
+            "deduplicated": self.deduplicated,
+            "dedup_rate": round(self.deduplicated / requests, 4) if requests else 0.0,
+            "fallbacks": self.fallbacks
+        }
@@ -0,0 +1,145 @@
+"""
+Materialized availability in the slots table.
+
+A background job keeps one row per provider slot from today to
+SLOT_HORIZON_DAYS ahead. Each run only inserts days past the last open
+slot of each provider (bookings beyond the horizon leave booked rows there,
+so the latest row says nothing about how far the table is filled), and
+inserts skip existing rows, so runs are idempotent and never rewrite rows. Bookings mark their row booked in the
+same transaction as the appointment insert (repository.create_appointment).
+
+While the horizon covers a request, availability reads the booked rows of
+the slots table instead of the appointments table.
+
+Run once from the command line with: python slot_table.py
+"""
+import asyncio
+from datetime import date, datetime, timedelta
+from typing import Optional
+
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import exists, func, select, update
+from sqlalchemy.orm import Session
+
+from config import settings
+from database import SessionLocal, dialect_insert
+from db_models import AppointmentDB, ProviderDB, SlotDB
+from repository import SLOT_BOOKED, SLOT_OPEN, local_range_to_utc
+from slots import day_grid, slot_position, utc_to_ms
+from utils import get_local_now
+
+_EPOCH = datetime(1970, 1, 1)
+
+# Local days materialized for every provider by the last refresh
+_covered: Optional[tuple[date, date]] = None
+
+
+def covers(start_day: date, end_day: date) -> bool:
+    """Whether the slots table is authoritative for these local days"""
+    return (
+        settings.SLOT_TABLE_ENABLED
+        and _covered is not None
+        and _covered[0] <= start_day
+        and end_day <= _covered[1]
+    )
+
+
+def horizon() -> Optional[tuple[date, date]]:
+    """Local days the slots table is authoritative for, if enabled and filled"""
+    return _covered if settings.SLOT_TABLE_ENABLED else None
+
+
+def _slot_rows(provider_id: str, start_day: date, end_day: date) -> list[dict]:
+    rows = []
+    day = start_day
+    while day <= end_day:
+        for start_ms in day_grid(day).start_ms:
+            rows.append({
+                "provider_id": provider_id,
+                "start_time": _EPOCH + timedelta(milliseconds=start_ms),
+                "state": SLOT_OPEN
+            })
+        day += timedelta(days=1)
+    return rows
+
+
+def extend_slot_horizon(db: Session, today: date, horizon_days: int) -> int:
+    """
+    Insert the missing slot rows up to today + horizon_days for every
+    provider and mark the ones already booked. Returns the rows inserted.
+    """
+    end_day = today + timedelta(days=horizon_days)
+    # Open rows only come from this job, so the last one marks how far it
+    # got; days after it are refilled even if a booking already has a row
+    last_slots = dict(db.execute(
+        select(SlotDB.provider_id, func.max(SlotDB.start_time))
+        .where(SlotDB.state == SLOT_OPEN)
+        .group_by(SlotDB.provider_id)
+    ).all())
+
+    insert_slots = dialect_insert(SlotDB).on_conflict_do_nothing(
+        index_elements=[SlotDB.provider_id, SlotDB.start_time])
+    inserted = 0
+    for provider_id in db.scalars(select(ProviderDB.id)).all():
+        start_day = today
+        last_slot = last_slots.get(provider_id)
+        if last_slot is not None:
+            position = slot_position(utc_to_ms(last_slot))
+            if position is not None:
+                start_day = max(today, position[0] + timedelta(days=1))
+        rows = _slot_rows(provider_id, start_day, end_day)
+        if rows:
+            db.execute(insert_slots, rows)
+            inserted += len(rows)
+
+    # Reconcile open rows with appointments, which also catches bookings
+    # committed while the rows above did not exist yet
+    start_utc, _ = local_range_to_utc(today.isoformat(), today.isoformat())
+    db.execute(
+        update(SlotDB)
+        .where(
+            SlotDB.state == SLOT_OPEN,
+            SlotDB.start_time >= start_utc,
+            exists().where(
+                AppointmentDB.provider_id == SlotDB.provider_id,
+                AppointmentDB.start_time == SlotDB.start_time,
+                AppointmentDB.status == "confirmed"
+            )
+        )
+        .values(state=SLOT_BOOKED)
+    )
+    return inserted
+
+
+def refresh_slot_horizon() -> int:
+    """Run one horizon extension in its own transaction"""
+    global _covered
+    today = get_local_now().date()
+    db = SessionLocal()
+    try:
+        inserted = extend_slot_horizon(db, today, settings.SLOT_HORIZON_DAYS)
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+    _covered = (today, today + timedelta(days=settings.SLOT_HORIZON_DAYS))
+    return inserted
+
+
+async def run_slot_horizon_job():
+    """Background task: extend the horizon every SLOT_REFRESH_SECONDS"""
+    while True:
+        try:
+            await run_in_threadpool(refresh_slot_horizon)
+        except Exception as e:
+            print(f"Warning: Slot horizon refresh failed: {e}")
+        await asyncio.sleep(settings.SLOT_REFRESH_SECONDS)
+
+
+if __name__ == "__main__":
+    from database import init_db
+
+    init_db()
+    print(f"Inserted {refresh_slot_horizon()} slot rows")
@@ -0,0 +1,175 @@
+"""
+Slot grid generation.
+
+The practice's working-hours grid is the same for every provider, so it is
+built once per local day from a per-weekday template of minute offsets and
+reused across requests. Start times are kept as UTC epoch milliseconds (the
+value embedded in slot IDs) and the ISO8601 strings are formatted in a batch
+per day instead of slot by slot.
+"""
+from array import array
+from bisect import bisect_right
+from datetime import date, datetime, timedelta
+from functools import lru_cache
+from typing import Iterable, Optional
+
+from utils import format_utc_offset, local_day_offset, utc_to_ms
+
+SLOT_MINUTES = 30
+DAY_START_HOUR = 9
+DAY_END_HOUR = 17
+LUNCH_HOUR = 12
+
+# Minutes from local midnight for every slot of a working day
+SLOT_OFFSETS = tuple(
+    hour * 60 + minute
+    for hour in range(DAY_START_HOUR, DAY_END_HOUR)
+    if hour != LUNCH_HOUR
+    for minute in range(0, 60, SLOT_MINUTES)
+)
+SLOTS_PER_DAY = len(SLOT_OFFSETS)
+
+# Bit index of each slot within a day's booked-slot bitmap
+SLOT_INDEX = {offset: index for index, offset in enumerate(SLOT_OFFSETS)}
+
+# Slot offsets per weekday (0 = Monday); weekends have no slots
+WEEKDAY_TEMPLATE = tuple(
+    SLOT_OFFSETS if weekday < 5 else () for weekday in range(7)
+)
+
+_EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+_ONE_MS = timedelta(milliseconds=1)
+_DAY_MS = 86400000
+
+
+def _clock_label(minutes: int) -> str:
+    return f"{minutes // 60:02d}:{minutes % 60:02d}:00"
+
+
+_START_LABELS = {m: _clock_label(m) for m in SLOT_OFFSETS}
+_END_LABELS = {m: _clock_label(m + SLOT_MINUTES) for m in SLOT_OFFSETS}
+
+
+class SlotGrid:
+    """
+    Parallel arrays describing a run of slots in chronological order.
+
+    start_ms holds UTC epoch milliseconds; start_times and end_times hold the
+    matching ISO8601 strings in the practice timezone.
+    """
+
+    __slots__ = ("start_ms", "start_times", "end_times")
+
+    def __init__(self, start_ms: array, start_times: list[str], end_times: list[str]):
+        self.start_ms = start_ms
+        self.start_times = start_times
+        self.end_times = end_times
+
+    def __len__(self) -> int:
+        return len(self.start_ms)
+
+    def after(self, timestamp_ms: int) -> "SlotGrid":
+        """Return the slots starting strictly after timestamp_ms"""
+        index = bisect_right(self.start_ms, timestamp_ms)
+        if index == 0:
+            return self
+        return SlotGrid(
+            self.start_ms[index:],
+            self.start_times[index:],
+            self.end_times[index:]
+        )
+
+    def slot_ids(self, provider_id: str) -> list[str]:
+        """Build the public slot IDs for a provider"""
+        prefix = f"slot-{provider_id}-"
+        return [prefix + str(ms) for ms in self.start_ms]
+
+
+@lru_cache(maxsize=1024)
+def day_grid(day: date) -> SlotGrid:
+    """
+    Build the slot grid for a single local day.
+
+    The UTC offset is resolved once per day at noon: DST transitions happen
+    overnight, so it is constant across working hours.
+    """
+    offsets = WEEKDAY_TEMPLATE[day.weekday()]
+    if not offsets:
+        return SlotGrid(array("q"), [], [])
+
+    utc_offset = local_day_offset(day)
+    midnight_s = (day.toordinal() - _EPOCH_ORDINAL) * 86400 - \
+        int(utc_offset.total_seconds())
+    prefix = f"{day.isoformat()}T"
+    suffix = format_utc_offset(utc_offset)
+
+    return SlotGrid(
+        array("q", [(midnight_s + m * 60) * 1000 for m in offsets]),
+        [prefix + _START_LABELS[m] + suffix for m in offsets],
+        [prefix + _END_LABELS[m] + suffix for m in offsets]
+    )
+
+
+def build_slot_grid(start_day: date, end_day: date, after_ms: Optional[int] = None) -> SlotGrid:
+    """
+    Build the slot grid for every day from start_day to end_day inclusive.
+
+    When after_ms is given, only slots starting after it are returned.
+    """
+    start_ms = array("q")
+    start_times: list[str] = []
+    end_times: list[str] = []
+
+    day = start_day
+    one_day = timedelta(days=1)
+    while day <= end_day:
+        grid = day_grid(day)
+        start_ms.extend(grid.start_ms)
+        start_times.extend(grid.start_times)
+        end_times.extend(grid.end_times)
+        day += one_day
+
+    grid = SlotGrid(start_ms, start_times, end_times)
+    if after_ms is not None:
+        grid = grid.after(after_ms)
+    return grid
+
+
+def slot_position(start_ms: int) -> Optional[tuple[date, int]]:
+    """
+    Locate a slot start (UTC epoch ms) in the grid as (local date, bit index),
+    or None if it is not on the working-hours grid.
+    """
+    day = date.fromordinal(_EPOCH_ORDINAL + start_ms // _DAY_MS)
+    local_ms = start_ms + local_day_offset(day) // _ONE_MS
+    local_day = date.fromordinal(_EPOCH_ORDINAL + local_ms // _DAY_MS)
+    if local_day != day:
+        day = local_day
+        local_ms = start_ms + local_day_offset(day) // _ONE_MS
+
+    minute_ms = local_ms % _DAY_MS
+    index = SLOT_INDEX.get(minute_ms // 60000)
+    if index is None:
+        return None
+    grid = day_grid(day)
+    if index >= len(grid) or grid.start_ms[index] != start_ms:
+        return None
+    return day, index
+
+
+def booked_bitmaps(start_times: Iterable[datetime]) -> dict[date, int]:
+    """
+    Fold booked start times (naive UTC) into one bitmap per local day:
+    bit i is set when slot i of that day's grid is booked.
+    """
+    bitmaps: dict[date, int] = {}
+    for start_time in start_times:
+        position = slot_position(utc_to_ms(start_time))
+        if position is not None:
+            day, index = position
+            bitmaps[day] = bitmaps.get(day, 0) | 1 << index
+    return bitmaps
+
+
+def is_booked(bitmap: int, index: int) -> bool:
+    return bool(bitmap >> index & 1)
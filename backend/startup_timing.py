@@ -0,0 +1,33 @@
+"""
+Cold-start timings for this process.
+
+Imported first by main.py, so the clock starts before FastAPI, SQLAlchemy
+and the app modules are loaded. Each phase is recorded in seconds since
+then: "import" (app modules loaded), "startup" (startup event finished) and
+"first_request" (first HTTP response sent). GET /api/startup reports them.
+"""
+import time
+
+_started = time.perf_counter()
+
+timings: dict[str, float] = {}
+
+
+def mark(phase: str) -> None:
+    """Record a phase once"""
+    if phase not in timings:
+        timings[phase] = round(time.perf_counter() - _started, 4)
+
+
+class FirstRequestTimer:
+    """ASGI middleware marking "first_request" after the first HTTP response"""
+
+    def __init__(self, app):
+        self.app = app
+        self.pending = True
+
+    async def __call__(self, scope, receive, send):
+        await self.app(scope, receive, send)
+        if self.pending and scope["type"] == "http":
+            self.pending = False
+            mark("first_request")
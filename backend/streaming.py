@@ -0,0 +1,51 @@
+"""
+NDJSON streaming responses for long availability and schedule ranges.
+
+Each line is one JSON object: a header line describing the request, then one
+line per slot or appointment. Lines are produced a day (or a database batch)
+at a time, so neither the full list nor the full JSON body is built in memory.
+"""
+from typing import Any, AsyncIterator, Dict, Iterable, Optional
+
+from fastapi.responses import StreamingResponse
+
+from responses import dumps
+from slots import SlotGrid, is_booked
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+
+def ndjson_line(obj: Any) -> bytes:
+    return dumps(obj) + b"\n"
+
+
+def ndjson_response(lines, headers: Optional[Dict[str, str]] = None) -> StreamingResponse:
+    return StreamingResponse(lines, media_type=NDJSON_MEDIA_TYPE, headers=headers)
+
+
+def availability_lines(provider: Dict[str, Any], day_entries: Iterable[tuple[SlotGrid, int]], after_ms: int):
+    """Header line with the provider, then the future slots day by day"""
+    yield ndjson_line({"provider": provider})
+    for grid, booked in day_entries:
+        chunk = [
+            ndjson_line({
+                "id": slot_id,
+                "start_time": start_time,
+                "end_time": end_time,
+                "available": not is_booked(booked, index)
+            })
+            for index, (slot_ms, slot_id, start_time, end_time) in enumerate(zip(
+                grid.start_ms, grid.slot_ids(provider["id"]),
+                grid.start_times, grid.end_times))
+            if slot_ms > after_ms
+        ]
+        if chunk:
+            yield b"".join(chunk)
+
+
+async def appointment_lines(provider_id: str, batches: AsyncIterator[list[Dict[str, Any]]]):
+    """Header line with the provider ID, then appointments batch by batch"""
+    yield ndjson_line({"provider_id": provider_id})
+    async for batch in batches:
+        if batch:
+            yield b"".join(ndjson_line(appointment) for appointment in batch)
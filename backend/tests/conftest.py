@@ -0,0 +1,34 @@
+"""
+Test setup: point the app at a fresh SQLite file before any app module is
+imported, since settings are read at import time.
+"""
+import os
+import tempfile
+
+os.environ["DATABASE_URL"] = "sqlite:///" + os.path.join(
+    tempfile.mkdtemp(prefix="tests-"), "appointments.db")
+os.environ.pop("SHARED_CACHE_PATH", None)
+
+import pytest  # noqa: E402
+
+
+@pytest.fixture(scope="session")
+def seeded_db():
+    """Create the tables and seed the providers once per test run"""
+    from __init__db import seed_providers
+    from database import init_db
+
+    init_db()
+    seed_providers()
+
+
+@pytest.fixture
+def db(seeded_db):
+    from database import SessionLocal
+
+    session = SessionLocal()
+    try:
+        yield session
+    finally:
+        session.rollback()
+        session.close()
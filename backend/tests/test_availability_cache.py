@@ -0,0 +1,47 @@
+import asyncio
+from datetime import timedelta
+
+import availability
+from cache import LRUCache, availability_cache
+from utils import get_local_now
+
+
+def test_set_if_current_skips_invalidated_keys():
+    cache = LRUCache(maxsize=10, ttl=60)
+    generation = cache.generation("day")
+    cache.invalidate("day")
+    assert not cache.set_if_current("day", 1, generation)
+    assert cache.get("day") is None
+    assert cache.set_if_current("day", 2, cache.generation("day"))
+    assert cache.get("day") == 2
+
+    generation = cache.generation("day")
+    cache.clear()
+    assert not cache.set_if_current("day", 3, generation)
+
+
+def test_booking_during_load_is_not_overwritten(monkeypatch):
+    day = get_local_now().date() + timedelta(days=3)
+
+    async def load_then_book(db, provider_id, start_date, end_date, from_slots):
+        # A booking commits while the query is in flight
+        availability.invalidate_day(provider_id, day)
+        return {}
+
+    async def load_many_then_book(db, provider_ids, start_date, end_date, from_slots):
+        for provider_id in provider_ids:
+            availability.invalidate_day(provider_id, day)
+        return {}
+
+    monkeypatch.setattr(availability, "get_booked_bitmaps", load_then_book)
+    monkeypatch.setattr(availability, "get_booked_bitmaps_by_provider", load_many_then_book)
+    availability_cache.clear()
+
+    entries = asyncio.run(availability.get_day_availability(None, "provider-1", day, day))
+    assert entries[0][1] == 0
+    assert availability_cache.get(("provider-1", day)) is None
+
+    asyncio.run(availability.get_providers_day_availability(
+        None, ["provider-1", "provider-2"], day, day))
+    assert availability_cache.get(("provider-1", day)) is None
+    assert availability_cache.get(("provider-2", day)) is None
@@ -0,0 +1,68 @@
+import asyncio
+from datetime import timedelta
+
+import httpx
+from sqlalchemy import select
+
+from benchmarks.common import booking_payload
+
+from bulk_import import BulkImporter, read_rows
+from db_models import SlotDB
+from repository import SLOT_BOOKED, SLOT_OPEN
+from slot_table import _EPOCH, extend_slot_horizon
+from slots import day_grid
+from utils import get_local_now
+
+HEADER = "provider_id,start_time,patient_first_name,patient_last_name,patient_email,patient_phone,reason,status\n"
+
+
+def _row(start, status):
+    # start is naive UTC, as stored
+    return f"provider-2,{start.isoformat()}Z,Ada,Lovelace,ada@example.com,416-555-0100,Checkup,{status}\n"
+
+
+def test_import_rejects_unknown_status(db):
+    report = BulkImporter(db, dry_run=True).run(read_rows(
+        [HEADER, _row(_EPOCH, "pending")], "csv"))
+    assert report["failed"] == 1
+    assert report["errors"][0]["error"].startswith("status:")
+
+
+def test_past_cancelled_rows_import(db):
+    report = BulkImporter(db, dry_run=True).run(read_rows(
+        [HEADER, _row(_EPOCH, "cancelled")], "csv"))
+    assert report["imported"] == 1
+
+
+def test_future_cancelled_rows_leave_the_slot_bookable(db, monkeypatch):
+    monkeypatch.setattr("repository.settings.SLOT_TABLE_ENABLED", True)
+    day = get_local_now().date() + timedelta(days=20)
+    while len(day_grid(day).start_ms) < 2:
+        day += timedelta(days=1)
+    extend_slot_horizon(db, get_local_now().date(), 25)
+    db.commit()
+    start_ms = day_grid(day).start_ms[-2:]
+    starts = [_EPOCH + timedelta(milliseconds=ms) for ms in start_ms]
+
+    report = BulkImporter(db).run(read_rows(
+        [HEADER, _row(starts[0], "confirmed"), _row(starts[1], "cancelled")], "csv"))
+    assert report["imported"] == 1
+    assert report["errors"] == [
+        {"row": 3, "error": "Only past appointments can be imported as cancelled"}]
+
+    states = dict(db.execute(
+        select(SlotDB.start_time, SlotDB.state)
+        .where(SlotDB.provider_id == "provider-2", SlotDB.start_time.in_(starts))
+    ).all())
+    assert states == {starts[0]: SLOT_BOOKED, starts[1]: SLOT_OPEN}
+
+    import main
+
+    async def book():
+        await main.startup_event()
+        transport = httpx.ASGITransport(app=main.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            return await client.post("/api/appointments", json=booking_payload(
+                f"slot-provider-2-{start_ms[1]}", "provider-2"))
+
+    assert asyncio.run(book()).status_code == 201
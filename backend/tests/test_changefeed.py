@@ -0,0 +1,57 @@
+import asyncio
+import os
+import tempfile
+
+from changefeed import APPOINTMENT_CREATED, RESET, SLOT_TAKEN, ChangeFeed
+from shared_cache import SharedCache
+
+
+def _store() -> str:
+    return os.path.join(tempfile.mkdtemp(prefix="tests-feed-"), "shared.db")
+
+
+def _subscribe(feed: ChangeFeed, last_event_id):
+    async def subscribe():
+        subscription, messages = await feed.subscribe("provider-1", last_event_id)
+        feed.unsubscribe(subscription)
+        return messages
+    return asyncio.run(subscribe())
+
+
+def test_cursor_from_a_recreated_shared_log_gets_reset():
+    path = _store()
+    store = SharedCache(path, poll_interval=0, ttl=60)
+    store.append_events("provider-1", [("slot-taken", b"{}")] * 5)
+    _, last_seen = store.event_bounds()
+    store._conn.close()
+
+    # serve.py deletes the shared file on launch
+    for suffix in ("", "-wal", "-shm"):
+        if os.path.exists(path + suffix):
+            os.remove(path + suffix)
+    restarted = SharedCache(path, poll_interval=0, ttl=60)
+    restarted.append_events("provider-1", [("slot-taken", b"{}")] * 10)
+
+    messages = _subscribe(ChangeFeed(restarted), last_seen)
+    assert len(messages) == 1
+    assert f"event: {RESET}".encode() in messages[0]
+
+
+def test_slots_feed_has_no_appointment_events():
+    async def run():
+        feed = ChangeFeed()
+        _, ready = await feed.subscribe("provider-1", None)
+        slots, _ = await feed.subscribe("provider-1", None)
+        schedule, _ = await feed.subscribe("provider-1", None, "schedule")
+        start = int(ready[0].split(b"\n")[0][4:])
+        await feed.publish("provider-1", [
+            (SLOT_TAKEN, {"slot_id": "slot-1"}),
+            (APPOINTMENT_CREATED, {"appointment": {"patient_email": "a@b.co"}})
+        ])
+        _, replay = await feed.subscribe("provider-1", start)
+        return slots.queue.qsize(), schedule.queue.qsize(), replay
+
+    slots, schedule, replay = asyncio.run(run())
+    assert (slots, schedule) == (1, 2)
+    assert len(replay) == 1
+    assert b"event: " + SLOT_TAKEN.encode() in replay[0]
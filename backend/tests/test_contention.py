@@ -0,0 +1,11 @@
+import pytest
+
+from benchmarks.contention_booking import check_mode
+
+REQUESTS = 300
+
+
+@pytest.mark.parametrize("mode", ["sync", "async"])
+def test_one_booking_wins_a_contended_slot(mode):
+    result = check_mode(mode, REQUESTS)
+    assert result["statuses"] == {"201": 1, "409": REQUESTS - 1}
@@ -0,0 +1,70 @@
+"""
+Time handling around the practice timezone's DST transitions, checked
+against zoneinfo. In 2026 America/Toronto springs forward on March 8 and
+falls back on November 1, both Sundays at 2:00 local time.
+"""
+from datetime import date, datetime, timedelta
+from zoneinfo import ZoneInfo
+
+import pytest
+
+from config import settings
+from slots import SLOT_MINUTES, SLOT_OFFSETS, day_grid, slot_position
+from utils import UTC, format_utc, local_day_offset
+
+TZ = ZoneInfo(settings.TIMEZONE)
+TRANSITIONS = [date(2026, 3, 8), date(2026, 11, 1)]
+# The working days either side of each transition, and the weekend itself
+DAYS = [transition + timedelta(days=shift)
+        for transition in TRANSITIONS for shift in range(-2, 3)]
+
+pytestmark = pytest.mark.skipif(
+    settings.TIMEZONE != "America/Toronto", reason="dates are for America/Toronto")
+
+
+def _utc_ms(local: datetime) -> int:
+    return int(local.replace(tzinfo=TZ).timestamp() * 1000)
+
+
+@pytest.mark.parametrize("day, hours", [
+    (date(2026, 3, 7), -5), (date(2026, 3, 8), -4), (date(2026, 3, 9), -4),
+    (date(2026, 10, 31), -4), (date(2026, 11, 1), -5), (date(2026, 11, 2), -5),
+])
+def test_local_day_offset(day, hours):
+    assert local_day_offset(day) == timedelta(hours=hours)
+
+
+@pytest.mark.parametrize("transition", TRANSITIONS)
+def test_format_utc_across_transition(transition):
+    # Every quarter hour of the UTC days around the transition
+    start = datetime.combine(transition - timedelta(days=1), datetime.min.time())
+    for step in range(3 * 24 * 4):
+        value = start + timedelta(minutes=15 * step)
+        expected = value.replace(tzinfo=UTC).astimezone(TZ).isoformat()
+        assert format_utc(value) == expected, value
+
+
+@pytest.mark.parametrize("day", DAYS)
+def test_day_grid(day):
+    grid = day_grid(day)
+    if day.weekday() >= 5:
+        assert len(grid) == 0
+        return
+    starts = [datetime.combine(day, datetime.min.time()) + timedelta(minutes=m)
+              for m in SLOT_OFFSETS]
+    assert list(grid.start_ms) == [_utc_ms(start) for start in starts]
+    assert grid.start_times == [start.replace(tzinfo=TZ).isoformat() for start in starts]
+    assert grid.end_times == [
+        (start + timedelta(minutes=SLOT_MINUTES)).replace(tzinfo=TZ).isoformat()
+        for start in starts]
+
+
+@pytest.mark.parametrize("day", DAYS)
+def test_slot_position_round_trips(day):
+    grid = day_grid(day)
+    for index, start_ms in enumerate(grid.start_ms):
+        assert slot_position(start_ms) == (day, index)
+        assert slot_position(start_ms + 60000) is None
+    # The local 9:00 of a weekend day is not a slot
+    if not grid:
+        assert slot_position(_utc_ms(datetime.combine(day, datetime.min.time()) + timedelta(hours=9))) is None
@@ -0,0 +1,60 @@
+import asyncio
+import json
+import subprocess
+import sys
+
+import httpx
+
+from benchmarks.common import booking_payload, future_slot_ids
+from benchmarks.unique_ids import check_sequence, check_ulids
+
+BOOKINGS = 200
+
+
+def test_ulids_are_unique_across_threads():
+    assert check_ulids(threads=8) == []
+
+
+def test_reference_sequence_is_unique_across_processes():
+    assert check_sequence(processes=3, threads=4) == []
+
+
+def test_concurrent_bookings_get_unique_ids_and_references():
+    # A fresh interpreter, so the app starts against its own database
+    output = subprocess.run(
+        [sys.executable, "-m", "benchmarks.unique_ids", "--bookings-only",
+         "--bookings", str(BOOKINGS)],
+        check=True, capture_output=True, text=True).stdout
+    result = json.loads(output.strip().splitlines()[-1])
+    assert result["statuses"] == {"201": BOOKINGS}
+    assert len(set(result["ids"])) == BOOKINGS
+    assert len(set(result["references"])) == BOOKINGS
+
+
+def test_booking_retries_a_taken_reference_number(seeded_db, monkeypatch):
+    import main
+
+    slot_ids = future_slot_ids("provider-2")
+    issued = []
+
+    async def taken_first(label: str) -> str:
+        reference = await real(label)
+        issued.append(reference)
+        return first if len(issued) == 1 else reference
+
+    async def book():
+        await main.startup_event()
+        transport = httpx.ASGITransport(app=main.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            taken = await client.post("/api/appointments", json=booking_payload(slot_ids[0], "provider-2"))
+            nonlocal first
+            first = taken.json()["reference_number"]
+            monkeypatch.setattr(main, "new_reference_number", taken_first)
+            return await client.post("/api/appointments", json=booking_payload(slot_ids[1], "provider-2"))
+
+    real = main.new_reference_number
+    first = None
+    response = asyncio.run(book())
+    assert response.status_code == 201
+    assert response.json()["reference_number"] == issued[1]
+    assert response.json()["reference_number"] != first
@@ -0,0 +1,21 @@
+from provider_registry import ProviderRegistry
+
+CHEN = {"id": "provider-1", "name": "Dr. Sarah Chen", "specialty": "Family Medicine", "bio": None}
+KUMAR = {"id": "provider-2", "name": "Dr. James Kumar", "specialty": "Internal Medicine", "bio": None}
+
+
+def test_add_changes_the_etag():
+    registry = ProviderRegistry()
+    registry.load([CHEN])
+    etag = registry.etag
+    registry.add(KUMAR)
+    assert registry.etag != etag
+    assert registry.get("provider-2") == KUMAR
+
+
+def test_etag_depends_on_contents_not_order():
+    first, second = ProviderRegistry(), ProviderRegistry()
+    first.load([CHEN, KUMAR])
+    second.load([KUMAR])
+    second.add(CHEN)
+    assert first.etag == second.etag
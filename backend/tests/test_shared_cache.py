@@ -0,0 +1,34 @@
+import os
+import tempfile
+from datetime import date
+
+from shared_cache import DAY_CHANGED, SharedCache
+
+DAY = date(2030, 1, 7)
+
+
+def _store() -> str:
+    return os.path.join(tempfile.mkdtemp(prefix="tests-shared-"), "shared.db")
+
+
+def test_bitmap_read_before_an_invalidation_is_not_stored():
+    path = _store()
+    loader = SharedCache(path, poll_interval=0, ttl=60)
+    booker = SharedCache(path, poll_interval=0, ttl=60)
+
+    after_seq = loader.head()
+    # Another worker books the day while the loader queries the database
+    booker.publish(DAY_CHANGED, "provider-1", DAY)
+    loader.put_bitmaps({("provider-1", DAY): 0, ("provider-2", DAY): 5}, after_seq)
+
+    assert loader.get_bitmaps("provider-1", [DAY]) == {}
+    assert loader.get_bitmaps("provider-2", [DAY]) == {DAY: 5}
+    assert loader.stale_writes == 1
+
+
+def test_bitmap_read_after_an_invalidation_is_stored():
+    path = _store()
+    cache = SharedCache(path, poll_interval=0, ttl=60)
+    cache.publish(DAY_CHANGED, "provider-1", DAY)
+    cache.put_bitmaps({("provider-1", DAY): 3}, cache.head())
+    assert cache.get_bitmaps("provider-1", [DAY]) == {DAY: 3}
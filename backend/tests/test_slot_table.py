@@ -0,0 +1,49 @@
+from datetime import timedelta
+
+from sqlalchemy import func, select
+
+from db_models import SlotDB
+from repository import local_range_to_utc, mark_slot_booked_query
+from slot_table import _EPOCH, extend_slot_horizon
+from slots import day_grid
+from utils import get_local_now
+
+
+def _grid_rows(start_day, end_day) -> int:
+    days = (end_day - start_day).days + 1
+    return sum(len(day_grid(start_day + timedelta(days=i)).start_ms) for i in range(days))
+
+
+def test_booking_past_horizon_does_not_stop_refills(db):
+    today = get_local_now().date()
+    # Book a slot 45 days out before the table covers it
+    far_day = today + timedelta(days=45)
+    while not day_grid(far_day).start_ms:
+        far_day += timedelta(days=1)
+    far_start = _EPOCH + timedelta(milliseconds=day_grid(far_day).start_ms[0])
+    db.execute(mark_slot_booked_query("provider-1", far_start))
+    db.commit()
+
+    for _ in range(3):
+        extend_slot_horizon(db, today, 30)
+        db.commit()
+
+    # Every slot in the horizon has a row, open or booked by other tests
+    expected = _grid_rows(today, today + timedelta(days=30))
+    start_utc, end_utc = local_range_to_utc(
+        today.isoformat(), (today + timedelta(days=30)).isoformat())
+    counts = dict(db.execute(
+        select(SlotDB.provider_id, func.count())
+        .where(SlotDB.start_time >= start_utc, SlotDB.start_time < end_utc)
+        .group_by(SlotDB.provider_id)
+    ).all())
+    assert counts == {"provider-1": expected, "provider-2": expected}
+
+    # Extending the horizon past the booking fills the rest of that day
+    extend_slot_horizon(db, today, 50)
+    db.commit()
+    far_rows = db.scalar(select(func.count()).where(
+        SlotDB.provider_id == "provider-1",
+        SlotDB.start_time >= far_start,
+        SlotDB.start_time < far_start + timedelta(hours=9)))
+    assert far_rows == len(day_grid(far_day).start_ms)
@@ -0,0 +1,18 @@
+from datetime import datetime
+
+import pytest
+
+from benchmarks.bench_slots import grid_slots, legacy_slots
+from utils import localize
+
+
+@pytest.mark.parametrize("start, end, now", [
+    # A year from a Monday, with now inside the first day's slots
+    (datetime(2026, 1, 5), datetime(2027, 1, 4), datetime(2026, 1, 5, 10, 15)),
+    # Across the spring-forward and fall-back weekends
+    (datetime(2026, 3, 5), datetime(2026, 3, 11), datetime(2026, 3, 1)),
+    (datetime(2026, 10, 29), datetime(2026, 11, 4), datetime(2026, 10, 29, 16, 30)),
+])
+def test_grid_matches_the_per_slot_loop(start, end, now):
+    start, end, now = localize(start), localize(end), localize(now)
+    assert grid_slots(start, end, now) == legacy_slots(start, end, now)
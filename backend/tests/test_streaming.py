@@ -0,0 +1,44 @@
+import json
+import subprocess
+import sys
+import textwrap
+
+STREAMS = 6
+
+# Runs in a fresh interpreter, since DATABASE_ASYNC and the pool size are
+# read at import time
+SCRIPT = textwrap.dedent("""
+    import asyncio
+    import json
+
+    from benchmarks.common import use_temp_database
+
+    use_temp_database(DATABASE_ASYNC="false", DB_POOL_SIZE="3", DB_MAX_OVERFLOW="0")
+
+    import httpx
+    import main
+
+
+    async def run(streams):
+        await main.startup_event()
+        transport = httpx.ASGITransport(app=main.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            responses = await asyncio.wait_for(asyncio.gather(*(
+                client.get("/api/providers/provider-1/appointments", params={
+                    "start_date": "2026-01-01", "end_date": "2026-12-31", "stream": "true"})
+                for _ in range(streams)
+            )), 10)
+        return [response.status_code for response in responses]
+
+
+    print(json.dumps(asyncio.run(run(STREAMS))))
+""")
+
+
+def test_concurrent_schedule_streams_in_sync_mode():
+    # More streams than pooled connections
+    result = subprocess.run(
+        [sys.executable, "-c", SCRIPT.replace("STREAMS", str(STREAMS))],
+        capture_output=True, text=True, timeout=60)
+    assert result.returncode == 0, result.stderr[-2000:]
+    assert json.loads(result.stdout.strip().splitlines()[-1]) == [200] * STREAMS
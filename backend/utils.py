@@ -1,9 +1,74 @@
-from datetime import datetime, timedelta
-import pytz
+"""
+Time conversion helpers for the practice timezone.
+
+Stored datetimes are naive UTC. Converting them for display only needs the
+UTC offset, which changes at most twice a year, so offsets are cached per
+UTC day and the zone rules are only consulted again on the days a DST
+transition happens.
+"""
+from datetime import date, datetime, timedelta, timezone
+from functools import lru_cache
+from zoneinfo import ZoneInfo
+
 from config import settings
 
 # Get timezone
-TZ = pytz.timezone(settings.TIMEZONE)
+TZ = ZoneInfo(settings.TIMEZONE)
+UTC = timezone.utc
+
+_EPOCH = datetime(1970, 1, 1)
+_EPOCH_ORDINAL = _EPOCH.toordinal()
+_ONE_MS = timedelta(milliseconds=1)
+_DAY_MS = 86400000
+
+
+def format_utc_offset(offset: timedelta) -> str:
+    """Format a UTC offset the way datetime.isoformat() does (e.g. -04:00)"""
+    total_minutes = int(offset.total_seconds()) // 60
+    sign = "-" if total_minutes < 0 else "+"
+    hours, minutes = divmod(abs(total_minutes), 60)
+    return f"{sign}{hours:02d}:{minutes:02d}"
+
+
+@lru_cache(maxsize=4096)
+def local_day_offset(day: date) -> timedelta:
+    """UTC offset of the practice timezone at local noon on day"""
+    return TZ.utcoffset(datetime(day.year, day.month, day.day, 12))
+
+
+@lru_cache(maxsize=4096)
+def _utc_day_offsets(ordinal: int) -> tuple[timedelta, str, bool]:
+    """
+    UTC offset in effect at the start of a UTC day, its formatted suffix,
+    and whether it still holds at the end of the day.
+    """
+    start = datetime.fromordinal(ordinal).replace(tzinfo=UTC)
+    offset = start.astimezone(TZ).utcoffset()
+    end_offset = (start + timedelta(days=1)).astimezone(TZ).utcoffset()
+    return offset, format_utc_offset(offset), offset == end_offset
+
+
+def utc_to_ms(value: datetime) -> int:
+    """Convert a stored naive UTC datetime to epoch milliseconds"""
+    return (value - _EPOCH) // _ONE_MS
+
+
+def format_utc(value: datetime) -> str:
+    """Format a stored naive UTC datetime as local ISO8601 with offset"""
+    offset, suffix, constant = _utc_day_offsets(value.toordinal())
+    if not constant:
+        return value.replace(tzinfo=UTC).astimezone(TZ).isoformat()
+    return (value + offset).isoformat() + suffix
+
+
+def format_utc_ms(timestamp_ms: int) -> str:
+    """Format UTC epoch milliseconds as local ISO8601 with offset"""
+    return format_utc(_EPOCH + timedelta(milliseconds=timestamp_ms))
+
+
+def localize(dt: datetime) -> datetime:
+    """Attach the practice timezone to a naive local datetime"""
+    return dt.replace(tzinfo=TZ)
 
 
 def get_local_now() -> datetime:
@@ -14,19 +79,19 @@ def get_local_now() -> datetime:
 def to_utc(dt: datetime) -> datetime:
     """Convert local datetime to UTC"""
     if dt.tzinfo is None:
-        dt = TZ.localize(dt)
-    return dt.astimezone(pytz.UTC)
+        dt = localize(dt)
+    return dt.astimezone(UTC)
 
 
 def from_utc(dt: datetime) -> datetime:
     """Convert UTC datetime to local timezone"""
     if dt.tzinfo is None:
-        dt = pytz.UTC.localize(dt)
+        dt = dt.replace(tzinfo=UTC)
     return dt.astimezone(TZ)
 
 
 def format_iso8601(dt: datetime) -> str:
     """Format datetime as ISO8601 with timezone"""
     if dt.tzinfo is None:
-        dt = TZ.localize(dt)
+        dt = localize(dt)
     return dt.isoformat()
@@ -1,14 +1,16 @@
 "use client";
 
 import { useParams } from "next/navigation";
-import { useQuery } from "@tanstack/react-query";
+import { useInfiniteQuery, useQuery } from "@tanstack/react-query";
 import { Header } from "@/components/Header";
 import { getProviderAppointments, getProviders } from "@/lib/api";
+import { Button } from "@/components/ui/button";
 import { Card } from "@/components/ui/card";
 import { Loader2, Calendar, Users } from "lucide-react";
 import { AppointmentCard } from "@/components/AppointmentCard";
 import { DoctorCalendar } from "@/components/DoctorCalendar";
 import { format, addDays } from "date-fns";
+import { useProviderEvents } from "@/hooks/use-provider-events";
 
 export default function DoctorSchedulePage() {
   const params = useParams();
@@ -22,18 +24,28 @@ export default function DoctorSchedulePage() {
     queryFn: getProviders,
   });
 
+  // The schedule is cursor-paginated: load the first page, then more on request
   const {
     data: appointmentsData,
     isLoading,
     error,
-  } = useQuery({
+    fetchNextPage,
+    hasNextPage,
+    isFetchingNextPage,
+  } = useInfiniteQuery({
     queryKey: ["provider-appointments", providerId, startDate, endDate],
-    queryFn: () =>
-      getProviderAppointments(providerId, startDate, endDate),
+    queryFn: ({ pageParam }) =>
+      getProviderAppointments(providerId, startDate, endDate, pageParam),
+    initialPageParam: null as string | null,
+    getNextPageParam: (lastPage) => lastPage.next_cursor,
   });
 
+  // New bookings arrive from the change feed instead of by refetching
+  useProviderEvents(providerId, "schedule");
+
   const provider = providers?.find((p) => p.id === providerId);
-  const appointments = appointmentsData?.appointments || [];
+  const appointments =
+    appointmentsData?.pages.flatMap((page) => page.appointments) || [];
 
   return (
     <div className="min-h-screen bg-background">
@@ -78,7 +90,8 @@ export default function DoctorSchedulePage() {
               <div className="flex items-center gap-2 mb-4">
                 <Calendar className="w-5 h-5 text-primary" />
                 <h2 className="text-xl font-semibold">
-                  Upcoming Appointments ({appointments.length})
+                  Upcoming Appointments ({appointments.length}
+                  {hasNextPage ? "+" : ""})
                 </h2>
               </div>
 
@@ -98,6 +111,20 @@ export default function DoctorSchedulePage() {
                   ))}
                 </div>
               )}
+
+              {hasNextPage && (
+                <Button
+                  variant="outline"
+                  className="w-full"
+                  onClick={() => fetchNextPage()}
+                  disabled={isFetchingNextPage}
+                >
+                  {isFetchingNextPage && (
+                    <Loader2 className="w-4 h-4 mr-2 animate-spin" />
+                  )}
+                  Load more appointments
+                </Button>
+              )}
             </div>
           </div>
         )}
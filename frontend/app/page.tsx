@@ -20,6 +20,7 @@ import { ArrowLeft, Loader2 } from "lucide-react";
 import { toast } from "sonner";
 import { format, addDays } from "date-fns";
 import { Header } from "@/components/Header";
+import { useProviderEvents } from "@/hooks/use-provider-events";
 
 type BookingStep = "select-provider" | "select-slot" | "patient-info";
 
@@ -45,6 +46,13 @@ export default function HomePage() {
     enabled: !!selectedProvider && step === "select-slot",
   });
 
+  // Slots booked by others turn unavailable while the picker is open; the
+  // slots feed carries no patient details
+  useProviderEvents(
+    step === "select-slot" ? selectedProvider?.id : undefined,
+    "slots"
+  );
+
   const handleProviderSelect = (provider: Provider) => {
     setSelectedProvider(provider);
     setStep("select-slot");
@@ -0,0 +1,96 @@
+import { useEffect } from "react";
+import { InfiniteData, useQueryClient } from "@tanstack/react-query";
+import {
+  AppointmentCreatedEvent,
+  ProviderAppointmentsPage,
+  providerEvents,
+  ProviderEventsKind,
+  SlotTakenEvent,
+  TimeSlot,
+} from "@/lib/api";
+
+// Keeps a provider's cached availability (and, on the "schedule" feed, its
+// schedules) current from the change feed, instead of refetching them to
+// see new bookings.
+export function useProviderEvents(
+  providerId: string | undefined,
+  kind: ProviderEventsKind = "slots"
+) {
+  const queryClient = useQueryClient();
+
+  useEffect(() => {
+    if (!providerId) return;
+    const source = providerEvents(providerId, kind);
+
+    source.addEventListener("slot-taken", (event) => {
+      const { slot_id }: SlotTakenEvent = JSON.parse(event.data);
+      queryClient.setQueriesData<{ slots: TimeSlot[] }>(
+        { queryKey: ["availability", providerId] },
+        (data) =>
+          data && {
+            ...data,
+            slots: data.slots.map((slot) =>
+              slot.id === slot_id ? { ...slot, available: false } : slot
+            ),
+          }
+      );
+    });
+
+    source.addEventListener("appointment-created", (event) => {
+      const { appointment }: AppointmentCreatedEvent = JSON.parse(event.data);
+      const day = appointment.start_time.slice(0, 10);
+      const start = new Date(appointment.start_time).getTime();
+      queryClient.setQueriesData<InfiniteData<ProviderAppointmentsPage>>(
+        {
+          // ["provider-appointments", providerId, startDate, endDate]
+          predicate: ({ queryKey }) =>
+            queryKey[0] === "provider-appointments" &&
+            queryKey[1] === providerId &&
+            day >= (queryKey[2] as string) &&
+            day <= (queryKey[3] as string),
+        },
+        (data) => {
+          if (
+            !data ||
+            data.pages.some((page) =>
+              page.appointments.some((a) => a.id === appointment.id)
+            )
+          ) {
+            return data;
+          }
+          // Add it to the loaded page it falls in; past the last loaded
+          // page, fetching the next one returns it
+          const index = data.pages.findIndex((page) => {
+            const last = page.appointments[page.appointments.length - 1];
+            return (
+              !page.next_cursor ||
+              (last && start <= new Date(last.start_time).getTime())
+            );
+          });
+          if (index === -1) return data;
+          const page = data.pages[index];
+          const pages = [...data.pages];
+          pages[index] = {
+            ...page,
+            appointments: [...page.appointments, appointment].sort(
+              (a, b) =>
+                new Date(a.start_time).getTime() -
+                new Date(b.start_time).getTime()
+            ),
+          };
+          return { ...data, pages };
+        }
+      );
+    });
+
+    // Missed events are no longer available: refetch
+    source.addEventListener("reset", () => {
+      queryClient.invalidateQueries({ queryKey: ["availability", providerId] });
+      queryClient.invalidateQueries({
+        queryKey: ["provider-appointments", providerId],
+      });
+    });
+
+    return () => source.close();
+  }, [providerId, kind, queryClient]);
+}
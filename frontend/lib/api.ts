@@ -82,13 +82,24 @@ export async function createAppointment(
   return response.json();
 }
 
+export interface ProviderAppointmentsPage {
+  provider_id: string;
+  appointments: any[];
+  next_cursor: string | null;
+}
+
+// One page of a provider's schedule; pass the previous page's next_cursor
+// to get the following one.
 export async function getProviderAppointments(
   providerId: string,
   startDate: string,
-  endDate: string
-): Promise<any> {
+  endDate: string,
+  cursor?: string | null
+): Promise<ProviderAppointmentsPage> {
+  const params = new URLSearchParams({ start_date: startDate, end_date: endDate });
+  if (cursor) params.set("cursor", cursor);
   const response = await fetch(
-    `${API_URL}/providers/${providerId}/appointments?start_date=${startDate}&end_date=${endDate}`
+    `${API_URL}/providers/${providerId}/appointments?${params}`
   );
   if (!response.ok) {
     const error = await response.json().catch(() => ({}));
@@ -96,3 +107,38 @@ export async function getProviderAppointments(
   }
   return response.json();
 }
+
+export interface SlotTakenEvent {
+  provider_id: string;
+  slot_id: string;
+  start_time: string;
+  end_time: string;
+}
+
+export interface AppointmentCreatedEvent {
+  provider_id: string;
+  // Same shape as a provider schedule entry
+  appointment: {
+    id: string;
+    patient_name: string;
+    patient_email: string;
+    start_time: string;
+    end_time: string;
+    reason: string;
+    status: string;
+  };
+}
+
+export type ProviderEventsKind = "slots" | "schedule";
+
+// Server-sent booking events for a provider. EventSource reconnects on its
+// own and resumes from the last event it received. The "slots" feed only
+// has slot-taken; "schedule" adds appointment-created, with patient details.
+export function providerEvents(
+  providerId: string,
+  kind: ProviderEventsKind = "slots"
+): EventSource {
+  return new EventSource(
+    `${API_URL}/events?provider_id=${providerId}&kind=${kind}`
+  );
+}